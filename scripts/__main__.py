@@ -0,0 +1,11 @@
+"""Entry point for `python -m scripts` (run from the repository root)"""
+
+import os
+import sys
+
+# The scripts import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from profile_cli import main
+
+sys.exit(main())
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Data-layer scale benchmarks on synthetic catalogs.
+
+For each size a synthetic catalog is sampled from the real one (see
+synthetic_catalog.py) and every stage below is timed, best of --repeat runs,
+then run once more under tracemalloc for its peak Python allocation:
+
+  synthesize   sample the records (generation cost, for reference)
+  serialize    canonical JSON text (catalog_diff.dumps_canonical)
+  load         json.load of that file from disk
+  parse        typed records + validation (profile_records.parse_catalog)
+  rules        recompute derived geometry (geometry_rules.apply_rules)
+  diff         SKU diff against a copy with 1% of prices changed
+  filter       CLI selection: tubes with 1/8"-1/4" walls (profile_cli.select_profiles)
+  index        build the designation autocomplete index
+  lookup       1000 designation searches against that index
+  preprocess   group records by cross-section for the generator (geometry_key)
+
+Throughput is items per second (records, or queries for lookup). The
+per-item cost at each size is compared with the smallest size to expose
+scaling cliffs. Every repeat of a stage is paired with a run of a fixed
+pure-Python calibration loop, and the stage's best time is stored as a
+multiple of the loop's best ("relative"). The committed baseline,
+data/bench_baseline.json, can so be checked on any machine: stages are
+compared with it by relative cost and peak memory, never by absolute seconds.
+
+    python scripts/catalog_bench.py --sizes 1000,10000,50000
+    python scripts/catalog_bench.py --sizes 50000,500000 --save-baseline
+    python scripts/catalog_bench.py --check     # exit 1 on regressions
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from catalog_diff import diff_catalogs, dumps_canonical
+from designation_search import DesignationIndex
+from geometry_rules import apply_rules
+from profile_cli import select_profiles
+from profile_geometry import geometry_key
+from profile_records import parse_catalog
+from synthetic_catalog import DEFAULT_TEMPLATE, REPO_ROOT, synthesize
+
+DEFAULT_SIZES = (1000, 10000, 50000)
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "data", "bench_baseline.json")
+LOOKUPS = 1000
+CALIBRATION_ITEMS = 10000
+# Per-item cost this many times the smallest size's is reported as a cliff
+CLIFF_RATIO = 2.0
+
+Stage = Callable[[Dict[str, Any]], int]
+
+
+def _synthesize(ctx):
+    ctx['data'] = synthesize(ctx['template'], ctx['size'], ctx['seed'])
+    return ctx['size']
+
+
+def _serialize(ctx):
+    ctx['text'] = dumps_canonical(ctx['data'])
+    return ctx['size']
+
+
+def _load(ctx):
+    with open(ctx['path'], 'r') as f:
+        json.load(f)
+    return ctx['size']
+
+
+def _parse(ctx):
+    ctx['catalog'] = parse_catalog(ctx['data'])
+    return ctx['size']
+
+
+def _rules(ctx):
+    apply_rules(ctx['data'])
+    return ctx['size']
+
+
+def _diff(ctx):
+    diff_catalogs(ctx['data'], ctx['changed'])
+    return ctx['size']
+
+
+def _filter(ctx):
+    select_profiles(ctx['catalog'].by_category, ['*tube*'],
+                    ranges=[('wall_thickness_in', 0.125, 0.25)])
+    return ctx['size']
+
+
+def _index(ctx):
+    ctx['index'] = DesignationIndex.from_catalog(ctx['catalog'], cache_size=0)
+    return ctx['size']
+
+
+def _lookup(ctx):
+    index = ctx['index']
+    for query in ctx['queries']:
+        index.search(query, limit=10)
+    return len(ctx['queries'])
+
+
+def _preprocess(ctx):
+    groups: Dict[Any, List[str]] = {}
+    for record in ctx['catalog'].records():
+        key = geometry_key(record)
+        if key is not None:
+            groups.setdefault(key, []).append(record.sku)
+    return ctx['size']
+
+
+STAGES: List[Tuple[str, Stage]] = [
+    ('synthesize', _synthesize), ('serialize', _serialize), ('load', _load),
+    ('parse', _parse), ('rules', _rules), ('diff', _diff), ('filter', _filter),
+    ('index', _index), ('lookup', _lookup), ('preprocess', _preprocess),
+]
+
+# Stages whose context a stage reads
+DEPENDS = {'load': ('serialize',), 'diff': ('serialize',), 'filter': ('parse',),
+           'index': ('parse',), 'lookup': ('index',), 'preprocess': ('parse',)}
+
+
+def _prepare(ctx: Dict[str, Any], name: str) -> None:
+    """Untimed inputs a stage needs from earlier stages"""
+    if name == 'load':
+        with open(ctx['path'], 'w') as f:
+            f.write(ctx['text'])
+    elif name == 'diff' and 'changed' not in ctx:
+        rng = random.Random(ctx['seed'])
+        changed = json.loads(ctx['text'])
+        for items in changed['profiles'].values():
+            for item in items:
+                if rng.random() < 0.01:
+                    item['price'] = round(item['price'] * 1.05, 2)
+        ctx['changed'] = changed
+    elif name == 'lookup' and 'queries' not in ctx:
+        rng = random.Random(ctx['seed'])
+        records = ctx['catalog'].records()
+        # Mix of full designations, prefixes, lowercase and SKUs
+        queries = []
+        for i in range(LOOKUPS):
+            record = rng.choice(records)
+            text = record.designation
+            queries.append((text, text[:max(2, len(text) // 2)], text.lower(), record.sku)[i % 4])
+        ctx['queries'] = queries
+
+
+_CALIBRATION_ROWS = [{"sku": f"{i:06d}", "designation": f"HSS{i % 12}x{i % 7}x1/{i % 5 + 2}",
+                      "price": i * 0.37} for i in range(CALIBRATION_ITEMS)]
+
+
+def _calibration_run() -> float:
+    """Time one pass of a fixed workload mixing what the stages do (dict and
+    string work, sorting, JSON), the unit for relative costs"""
+    gc.collect()
+    start = time.perf_counter()
+    by_key: Dict[str, List[str]] = {}
+    for row in _CALIBRATION_ROWS:
+        by_key.setdefault(row["designation"].lower(), []).append(row["sku"])
+    json.loads(json.dumps(sorted(_CALIBRATION_ROWS,
+                                 key=lambda r: (r["designation"], -r["price"]))))
+    return time.perf_counter() - start
+
+
+def calibrate(repeat: int = 5) -> float:
+    return min(_calibration_run() for _ in range(repeat))
+
+
+def _measure(stage: Stage, ctx: Dict[str, Any], repeat: int, memory: bool) -> Dict[str, Any]:
+    best = unit = None
+    for _ in range(repeat):
+        # Interleaved so both see the same clock speed and machine load
+        calibration = _calibration_run()
+        unit = calibration if unit is None else min(unit, calibration)
+        gc.collect()
+        start = time.perf_counter()
+        items = stage(ctx)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    result = {"seconds": round(best, 6), "relative": round(best / unit, 5),
+              "items": items, "per_second": round(items / best, 1) if best > 0 else None}
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            stage(ctx)
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def _needed(stages: List[str]) -> List[str]:
+    """Selected stages plus the stages that build their inputs"""
+    needed = {'synthesize'}
+    todo = list(stages)
+    while todo:
+        name = todo.pop()
+        if name not in needed:
+            needed.add(name)
+            todo.extend(DEPENDS.get(name, ()))
+    return [name for name, _ in STAGES if name in needed]
+
+
+def run(template: Dict[str, Any], sizes: List[int], repeat: int = 3, memory: bool = True,
+        seed: int = 0, stages: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """{size: {stage: {seconds, relative, items, per_second[, peak_bytes]}}}"""
+    selected = stages or [name for name, _ in STAGES]
+    functions = dict(STAGES)
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="catalog-bench-") as tmp:
+        for size in sizes:
+            ctx = {'template': template, 'size': size, 'seed': seed,
+                   'path': os.path.join(tmp, f"catalog-{size}.json")}
+            row = results[str(size)] = {}
+            for name in _needed(selected):
+                _prepare(ctx, name)
+                if name not in selected:
+                    functions[name](ctx)
+                    continue
+                r = row[name] = _measure(functions[name], ctx, repeat, memory)
+                mem = f", peak {r['peak_bytes'] / 2**20:.1f} MiB" if 'peak_bytes' in r else ""
+                print(f"  {size:>8} {name:<11} {r['seconds']:9.4f}s "
+                      f"{r['per_second'] or 0:>12,.0f}/s{mem}")
+    return results
+
+
+def scaling(results: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Stages whose per-item cost grows CLIFF_RATIO times or more over the sizes"""
+    sizes = sorted(results, key=int)
+    notes = []
+    for name in results[sizes[0]]:
+        base = results[sizes[0]][name]
+        for size in sizes[1:]:
+            r = results[size].get(name)
+            if not r or not base['seconds']:
+                continue
+            ratio = (r['seconds'] / r['items']) / (base['seconds'] / base['items'])
+            if ratio >= CLIFF_RATIO:
+                notes.append(f"{name}: per-item cost x{ratio:.1f} at {size} vs {sizes[0]}")
+    return notes
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            tolerance: float) -> List[str]:
+    """Stages whose relative cost exceeds the baseline's by more than
+    tolerance (0.25 = 25%), or with peak memory grown by more than that"""
+    regressions = []
+    for size, stages in results.items():
+        for name, r in stages.items():
+            b = baseline.get(size, {}).get(name)
+            # Baselines from before calibration hold only machine-specific seconds
+            if not b or not b.get('relative'):
+                continue
+            ratio = r['relative'] / b['relative']
+            line = f"  {size:>8} {name:<11} x{ratio:.2f} time"
+            slow = ratio > 1 + tolerance
+            if 'peak_bytes' in r and b.get('peak_bytes'):
+                mem_ratio = r['peak_bytes'] / b['peak_bytes']
+                line += f", x{mem_ratio:.2f} memory"
+                slow = slow or mem_ratio > 1 + tolerance
+            print(line + ("  REGRESSION" if slow else ""))
+            if slow:
+                regressions.append(f"{size} {name}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the catalog data layer at scale")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma separated record counts")
+    parser.add_argument("--stage", action="append", choices=[name for name, _ in STAGES],
+                        help="only report these stages")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as the baseline (merged by size)")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--check", action="store_true", help="exit 1 on any regression")
+    parser.add_argument("--out", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.template, 'r') as f:
+        template = json.load(f)
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+
+    calibration = calibrate()
+    print(f"Benchmarking {', '.join(map(str, sizes))} records (best of {args.repeat}, "
+          f"calibration {calibration * 1000:.1f} ms)")
+    results = run(template, sizes, args.repeat, not args.no_memory, args.seed, args.stage)
+
+    cliffs = scaling(results) if len(sizes) > 1 else []
+    for note in cliffs:
+        print(f"Scaling: {note}")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f).get("results", {})
+    regressions = []
+    comparable = any(r.get('relative') for stages in baseline.values() for r in stages.values())
+    if comparable:
+        print(f"Against {args.baseline}:")
+        regressions = compare(results, baseline, args.tolerance)
+
+    report = {"python": sys.version.split()[0], "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "calibration_seconds": round(calibration, 6), "results": results,
+              "scaling": cliffs, "regressions": regressions}
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        merged = dict(baseline)
+        for size, stages in results.items():
+            merged.setdefault(size, {}).update(stages)
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(dict(report, results=merged), f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} regressions beyond {args.tolerance:.0%}")
+    if args.check and not comparable and not args.save_baseline:
+        print(f"No relative costs in {args.baseline} to check against; "
+              f"record them with --save-baseline")
+        return 1
+    return 1 if args.check and regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
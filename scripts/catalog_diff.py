@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Canonical catalog serialization and structural diff.
+
+Canonical form: categories sorted by key, records ordered by SKU, keys sorted,
+two-space indent, trailing newline. Two catalogs with the same content always
+serialize to the same bytes, so text diffs only show real changes.
+
+The structural diff aligns records by SKU through a hash join and reports
+added, removed and changed SKUs with field-level deltas as JSON:
+
+    python scripts/catalog_diff.py canonical data/profile_data.json
+    python scripts/catalog_diff.py diff old.json new.json --out changes.json
+"""
+
+import argparse
+import json
+import sys
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Top-level sections compared key by key
+TABLE_SECTIONS = ('metadata', 'materials', 'geometry_standards')
+
+
+def canonical_catalog(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of data with categories sorted and each category's records ordered by SKU"""
+    out = dict(data)
+    profiles = data.get('profiles', {})
+    out['profiles'] = {category: sorted(profiles[category], key=lambda p: str(p.get('sku', '')))
+                       for category in sorted(profiles)}
+    return out
+
+
+def dumps_canonical(data: Dict[str, Any]) -> str:
+    return json.dumps(canonical_catalog(data), indent=2, sort_keys=True,
+                      ensure_ascii=False) + "\n"
+
+
+def write_canonical(data: Dict[str, Any], path: str) -> None:
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(dumps_canonical(data))
+
+
+def iter_records(data: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    for category, items in data.get('profiles', {}).items():
+        for profile in items:
+            yield category, profile
+
+
+def _field_delta(old: Any, new: Any) -> Dict[str, Any]:
+    delta = {"old": old, "new": new}
+    if (isinstance(old, (int, float)) and isinstance(new, (int, float))
+            and not isinstance(old, bool) and not isinstance(new, bool)):
+        delta["delta"] = round(new - old, 10)
+    return delta
+
+
+def _diff_mapping(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Field-level changes between two flat records"""
+    changes = {}
+    for key in old.keys() | new.keys():
+        a = old.get(key)
+        b = new.get(key)
+        if a != b or (key in old) != (key in new):
+            changes[key] = _field_delta(a, b)
+    return dict(sorted(changes.items()))
+
+
+def diff_catalogs(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Added, removed and changed SKUs (plus table section changes) between
+    two decoded catalogs"""
+    # Build side of the hash join: the old catalog keyed by SKU
+    old_by_sku: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    for category, profile in iter_records(old):
+        old_by_sku[str(profile.get('sku'))] = (category, profile)
+
+    added: List[Dict[str, Any]] = []
+    changed: List[Dict[str, Any]] = []
+    unchanged = 0
+    # Probe side: the new catalog
+    for category, profile in iter_records(new):
+        sku = str(profile.get('sku'))
+        match = old_by_sku.pop(sku, None)
+        if match is None:
+            added.append({"sku": sku, "category": category, "record": profile})
+            continue
+        old_category, old_profile = match
+        if old_profile == profile and old_category == category:
+            unchanged += 1
+            continue
+        fields = _diff_mapping(old_profile, profile)
+        if old_category != category:
+            fields["category"] = _field_delta(old_category, category)
+        changed.append({"sku": sku, "category": category,
+                        "designation": profile.get('designation'), "fields": fields})
+
+    removed = [{"sku": sku, "category": category, "record": profile}
+               for sku, (category, profile) in old_by_sku.items()]
+
+    sections = {}
+    for section in TABLE_SECTIONS:
+        a = old.get(section, {})
+        b = new.get(section, {})
+        if a != b:
+            sections[section] = {key: _field_delta(a.get(key), b.get(key))
+                                 for key in sorted(a.keys() | b.keys()) if a.get(key) != b.get(key)}
+
+    by_sku = itemgetter("sku")
+    return {
+        "summary": {"added": len(added), "removed": len(removed),
+                    "changed": len(changed), "unchanged": unchanged},
+        "added": sorted(added, key=by_sku),
+        "removed": sorted(removed, key=by_sku),
+        "changed": sorted(changed, key=by_sku),
+        "sections": sections,
+    }
+
+
+def changed_skus(diff: Dict[str, Any]) -> List[str]:
+    """SKUs that need rebuilding: added or changed (removed SKUs have no record)"""
+    return sorted({e["sku"] for e in diff["added"]} | {e["sku"] for e in diff["changed"]})
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Canonical catalog output and SKU-aligned diff")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("canonical", help="rewrite a catalog in canonical form")
+    p.add_argument("path")
+    p.add_argument("--out", help="output path (default: rewrite in place)")
+    p.add_argument("--check", action="store_true",
+                   help="exit 1 if the file is not already canonical")
+
+    p = sub.add_parser("diff", help="structural diff between two catalogs")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.add_argument("--out", help="write the diff JSON here instead of stdout")
+    p.add_argument("--summary", action="store_true", help="print only the counts")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "canonical":
+        with open(args.path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        canonical = dumps_canonical(json.loads(text))
+        if args.check:
+            return 0 if text == canonical else 1
+        with open(args.out or args.path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(canonical)
+        return 0
+
+    diff = diff_catalogs(_load(args.old), _load(args.new))
+    payload = diff["summary"] if args.summary else diff
+    text = json.dumps(payload, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 1 if any(diff["summary"][k] for k in ("added", "removed", "changed")) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,462 @@
+"""
+Watch mode: keep the profile library in step with profile_data.json.
+
+The catalog file is watched with inotify on Linux (through ctypes, watching
+the parent folder so editors that save by rename are seen) and by polling
+its mtime and size elsewhere. Bursts of saves are debounced into one scan;
+each scan diffs the new catalog against the last one by SKU and queues only
+added and changed records. Files of removed or renamed records are deleted
+from the library.
+
+A single worker thread drains the queue through one ProfileGenerator, so
+the SolidWorks session (and its COM apartment) stays warm between batches.
+Records queued while a batch is running are coalesced by SKU into the next
+one.
+
+The catalog state that has been applied to the library is saved after each
+batch, so changes made while the daemon was stopped are picked up on start.
+Queue depth and throughput are kept in `metrics()` and, if a metrics path
+is given, rewritten as JSON after every scan and batch.
+"""
+
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import select
+import struct
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from catalog_diff import changed_skus, diff_catalogs
+from profile_records import ProfileRecord, parse_catalog, profile_filename
+
+# inotify(7) event bits
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class PollingWatcher:
+    """Detects changes to one file by comparing (mtime, size)"""
+
+    def __init__(self, path: str, interval: float = 1.0):
+        self.path = path
+        self.interval = interval
+        self._stat = self._read_stat()
+
+    def _read_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def wait(self, timeout: float) -> bool:
+        """True as soon as the file has changed, False after timeout"""
+        deadline = time.monotonic() + timeout
+        while True:
+            stat = self._read_stat()
+            if stat != self._stat:
+                self._stat = stat
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.interval, remaining))
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify on the file's folder, filtered to the file's name"""
+
+    def __init__(self, path: str):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.path = path
+        self.name = os.fsencode(os.path.basename(path))
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        folder = os.fsencode(os.path.dirname(os.path.abspath(path)))
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, folder, mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"inotify_add_watch failed for {folder!r}")
+
+    def wait(self, timeout: float) -> bool:
+        """True on an event for the watched name; events for other files in
+        the folder (editor swap files) keep waiting until timeout"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            ready, _, _ = select.select([self.fd], [], [], max(remaining, 0))
+            if not ready:
+                return False
+            if self._read_events():
+                return True
+
+    def _read_events(self) -> bool:
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        offset = 0
+        hit = False
+        while offset < len(buffer):
+            _, _, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b'\0')
+            offset += length
+            hit = hit or name == self.name
+        return hit
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def make_watcher(path: str, poll_interval: Optional[float] = None):
+    """inotify where available, otherwise (or if poll_interval is given) polling"""
+    if poll_interval is None and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}), polling instead")
+    return PollingWatcher(path, poll_interval or 1.0)
+
+
+def _write_json_atomic(path: str, value: Any) -> None:
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    # A unique temp file: the scan and worker threads both write metrics
+    fd, tmp = tempfile.mkstemp(dir=folder or '.', prefix=os.path.basename(path) + '.',
+                               suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(value, f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+class CatalogWatchDaemon:
+    """Debounced catalog watcher feeding changed records to one warm generator"""
+
+    def __init__(self, data_path: str = "data/profile_data.json", output_dir: str = "output",
+                 generator=None, publish_to: Optional[str] = None, copy_workers: int = 4,
+                 state_path: Optional[str] = None, metrics_path: Optional[str] = None,
+                 debounce: float = 1.0, max_delay: float = 10.0,
+                 poll_interval: Optional[float] = None):
+        """generator defaults to a ProfileGenerator; publish_to publishes each
+        batch to that share with an incremental LibraryPublisher (only the
+        batch's files and the index are replaced) instead of writing to
+        output_dir. debounce is the quiet period that ends a burst of saves;
+        max_delay caps how long a continuous burst can postpone a scan."""
+        if generator is None:
+            from generate_profiles import ProfileGenerator
+            generator = ProfileGenerator(data_path)
+        self.data_path = data_path
+        self.output_dir = output_dir
+        self.generator = generator
+        self.publish_to = publish_to
+        self.copy_workers = copy_workers
+        if state_path is None:
+            target = os.path.abspath(publish_to or output_dir)
+            key = hashlib.sha1(target.encode()).hexdigest()[:12]
+            state_path = os.path.join("data", "cache", f"watch-{key}.json")
+        self.state_path = state_path
+        self.metrics_path = metrics_path
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+
+        # Catalog as last queued, and the bytes digest it came from
+        self._data: Dict[str, Any] = {}
+        self._digest: Optional[str] = None
+        self._lock = threading.Condition()
+        self._pending: Dict[str, ProfileRecord] = {}
+        self._stale: List[Tuple[str, str]] = []
+        self._queued_at: Optional[float] = None
+        self._failed: Dict[str, str] = {}
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+        self.stats = {"scans": 0, "batches": 0, "generated": 0, "failed": 0, "removed": 0,
+                      "busy_seconds": 0.0, "last_batch": None}
+        self.started = time.time()
+
+    # Catalog state
+
+    def _load_baseline(self, full: bool) -> None:
+        if full:
+            self._data = {}
+            return
+        if not os.path.exists(self.state_path):
+            # First start: assume the library matches the catalog as it is now
+            self._data = self._read_catalog()[1] or {}
+            self._save_state(self._data)
+            return
+        with open(self.state_path, 'r') as f:
+            self._data = json.load(f)
+
+    def _read_catalog(self) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """(digest, decoded catalog); data is None while the file is missing
+        or mid-write and not valid JSON"""
+        try:
+            with open(self.data_path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return None, None
+        digest = hashlib.sha1(raw).hexdigest()
+        try:
+            return digest, json.loads(raw)
+        except ValueError as e:
+            print(f"[watch] catalog is not valid JSON yet ({e}); waiting for the next save")
+            return digest, None
+
+    def scan(self) -> int:
+        """Diff the catalog on disk against the last queued state and queue
+        the difference. Returns the number of records queued."""
+        digest, data = self._read_catalog()
+        if data is None or digest == self._digest:
+            return 0
+        self.stats["scans"] += 1
+        diff = diff_catalogs(self._data, data)
+        catalog = parse_catalog(data)
+        for problem in catalog.problems:
+            print(f"[watch] invalid record skipped: {problem}")
+        records = {r.sku: r for r in catalog.records()}
+
+        stale = [(e["category"], e["record"].get("designation", "")) for e in diff["removed"]]
+        for entry in diff["changed"]:
+            fields = entry["fields"]
+            if "designation" in fields or "category" in fields:
+                old_category = fields["category"]["old"] if "category" in fields else entry["category"]
+                old_designation = (fields["designation"]["old"] if "designation" in fields
+                                   else entry["designation"])
+                stale.append((old_category, old_designation))
+
+        skus = set(changed_skus(diff))
+        # Records that failed last time are retried with the next change
+        skus.update(s for s in self._failed if s in records)
+        queued = [records[s] for s in sorted(skus) if s in records]
+
+        with self._lock:
+            for record in queued:
+                self._pending[record.sku] = record
+            self._stale.extend(stale)
+            if (queued or stale) and self._queued_at is None:
+                self._queued_at = time.monotonic()
+            self._data = data
+            self._digest = digest
+            self._lock.notify_all()
+
+        summary = diff["summary"]
+        if not (queued or stale):
+            return 0
+        print(f"[watch] catalog changed: {summary['added']} added, {summary['changed']} changed, "
+              f"{summary['removed']} removed; queue depth {self.queue_depth}")
+        self._write_metrics()
+        return len(queued)
+
+    # Worker
+
+    @property
+    def queue_depth(self) -> int:
+        with self._lock:
+            return len(self._pending) + len(self._stale)
+
+    def _take_batch(self) -> Optional[Tuple[List[ProfileRecord], List[Tuple[str, str]], float, Dict]]:
+        with self._lock:
+            while not (self._pending or self._stale):
+                if self._stop.is_set():
+                    return None
+                self._lock.wait(0.5)
+            batch = list(self._pending.values())
+            stale = self._stale
+            queued_at = self._queued_at or time.monotonic()
+            self._pending, self._stale, self._queued_at = {}, [], None
+            return batch, stale, queued_at, self._data
+
+    def _work(self) -> None:
+        # Every generator call happens on this thread, so the COM session
+        # it opens stays valid for the daemon's lifetime
+        while True:
+            taken = self._take_batch()
+            if taken is None:
+                return
+            self.run_batch(*taken)
+
+    def run_batch(self, batch: List[ProfileRecord], stale: List[Tuple[str, str]],
+                  queued_at: float, data: Dict[str, Any]) -> None:
+        import library_index
+
+        start = time.monotonic()
+        publisher = None
+        if self.publish_to:
+            from library_publisher import LibraryPublisher
+            # Replace only this batch's files (and the index) in the live
+            # library; a full staged publish would copy the whole share
+            publisher = LibraryPublisher(self.publish_to, workers=self.copy_workers,
+                                         incremental=True)
+
+        regenerated = {(r.category, profile_filename(r.designation)) for r in batch}
+        removed = 0
+        deleted: List[str] = []
+        for category, designation in stale:
+            fname = profile_filename(designation)
+            if (category, fname) in regenerated:
+                continue
+            if publisher is not None:
+                publisher.remove(os.path.join(category, fname))
+                removed += 1
+                continue
+            try:
+                os.remove(os.path.join(self.output_dir, category, fname))
+                removed += 1
+            except FileNotFoundError:
+                pass
+            deleted.append(os.path.join(category, fname))
+        if deleted:
+            with library_index.LibraryIndex(os.path.join(self.output_dir,
+                                                         library_index.INDEX_NAME)) as index:
+                index.remove(deleted)
+
+        profiles: Dict[str, List[ProfileRecord]] = {}
+        for record in batch:
+            profiles.setdefault(record.category, []).append(record)
+
+        failed: Dict[str, str] = {}
+        try:
+            if profiles:
+                result = self.generator.generate_all(self.output_dir, profiles=profiles,
+                                                     publisher=publisher)
+                if result is None:
+                    failed = {r.sku: "SolidWorks unavailable" for r in batch}
+                else:
+                    failed = dict(result["failed"])
+            elif publisher is not None:
+                # Removals only: the index still has to drop their rows
+                library_index.finish_run(
+                    library_index.open_for_run(publisher.scratch_dir, publisher), publisher)
+                publisher.publish()
+        except Exception as e:
+            print(f"[watch] batch failed: {e}")
+            failed = {r.sku: str(e) for r in batch}
+        finally:
+            # No-op once published; otherwise drops the batch's scratch folder
+            if publisher is not None:
+                publisher.abort()
+
+        done = time.monotonic()
+        generated = len(batch) - len(failed)
+        with self._lock:
+            for record in batch:
+                self._failed.pop(record.sku, None)
+            self._failed.update(failed)
+            idle = not (self._pending or self._stale)
+        self.stats["batches"] += 1
+        self.stats["generated"] += generated
+        self.stats["failed"] += len(failed)
+        self.stats["removed"] += removed
+        self.stats["busy_seconds"] += done - start
+        self.stats["last_batch"] = {
+            "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "profiles": len(batch), "generated": generated, "failed": len(failed),
+            "removed": removed, "seconds": round(done - start, 3),
+            "profiles_per_sec": round(generated / (done - start), 3) if done > start else None,
+            # From the first queued change to the library being current
+            "latency_seconds": round(done - queued_at, 3),
+        }
+        print(f"[watch] batch done: {generated} generated, {len(failed)} failed, "
+              f"{removed} removed in {done - start:.1f}s")
+
+        if idle:
+            self._save_state(data)
+        self._write_metrics()
+
+    def _save_state(self, data: Dict[str, Any]) -> None:
+        """Persist the applied catalog, minus records that failed, so a
+        restart retries them"""
+        failed = set(self._failed)
+        if failed:
+            data = dict(data, profiles={
+                category: [p for p in items if str(p.get('sku')) not in failed]
+                for category, items in data.get('profiles', {}).items()})
+        _write_json_atomic(self.state_path, data)
+
+    # Metrics
+
+    def metrics(self) -> Dict[str, Any]:
+        busy = self.stats["busy_seconds"]
+        with self._lock:
+            failed = sorted(self._failed)
+        return {
+            "data_path": self.data_path,
+            "target": self.publish_to or self.output_dir,
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "queue_depth": self.queue_depth,
+            "scans": self.stats["scans"],
+            "batches": self.stats["batches"],
+            "generated": self.stats["generated"],
+            "failed": self.stats["failed"],
+            "removed": self.stats["removed"],
+            "profiles_per_sec": round(self.stats["generated"] / busy, 3) if busy else None,
+            "last_batch": self.stats["last_batch"],
+            "failed_skus": failed,
+        }
+
+    def _write_metrics(self) -> None:
+        if self.metrics_path:
+            _write_json_atomic(self.metrics_path, self.metrics())
+
+    # Main loop
+
+    def _wait_for_change(self, watcher) -> bool:
+        """Block until a burst of changes has gone quiet; False on stop"""
+        while not self._stop.is_set():
+            if not watcher.wait(0.5):
+                continue
+            deadline = time.monotonic() + self.max_delay
+            while time.monotonic() < deadline:
+                if not watcher.wait(min(self.debounce, deadline - time.monotonic())):
+                    break
+            return True
+        return False
+
+    def run(self, full: bool = False) -> None:
+        """Watch until stop() (or Ctrl+C). full regenerates the whole catalog
+        first instead of starting from the saved state."""
+        self._load_baseline(full)
+        self._worker = threading.Thread(target=self._work, name="watch-generator", daemon=True)
+        self._worker.start()
+        watcher = make_watcher(self.data_path, self.poll_interval)
+        print(f"[watch] watching {self.data_path} ({type(watcher).__name__}), "
+              f"library at {self.publish_to or self.output_dir}")
+        try:
+            self.scan()
+            while self._wait_for_change(watcher):
+                self.scan()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+            self.stop()
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop watching; the worker finishes what is already queued"""
+        self._stop.set()
+        with self._lock:
+            self._lock.notify_all()
+        if wait and self._worker is not None and self._worker is not threading.current_thread():
+            self._worker.join()
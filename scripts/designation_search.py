@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Designation normalizer and search index.
+
+Parses the designation styles in the catalog and the ones users type
+("L2x2x1/4", "2x2x1/4 angle", "L2x2x.25", "w8 31", "HSS1 1/2x1 1/2x14ga-SS",
+"1-1/4 x 3/4 x 1/8 stainless angle") into a family, dimensions and material,
+and formats them back as the catalog's canonical designation.
+
+DesignationIndex answers search-box queries over canonical designations,
+bare dimensions ("2x2x1/4" matches angles and tubes) and SKUs:
+
+  * exact and prefix matches from a sorted key array; two bisects give the
+    contiguous block of keys sharing the prefix (a flattened trie)
+  * typo-tolerant matches from a trigram index, verified with a bounded
+    edit distance against the closest prefix of each candidate key
+
+    index = DesignationIndex.from_catalog(load_catalog())
+    index.search("w8 31")
+"""
+
+import argparse
+import bisect
+import re
+import time
+from collections import Counter, OrderedDict
+from itertools import chain
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from generate_comprehensive_profiles import GAUGE_TO_INCHES
+from profile_records import Catalog, load_catalog
+
+FAMILIES = ('L', 'HSS', 'W', 'S', 'C')
+# Families designated by nominal depth x weight per foot instead of inches
+WEIGHT_FAMILIES = ('W', 'S', 'C')
+# Designation suffix -> material group
+MATERIAL_SUFFIXES = {'': 'steel', 'AL': 'aluminum', 'SS': 'stainless'}
+
+_MATERIAL_WORDS = (
+    (re.compile(r'(?:-|\b)(?:al|alum\w*|6061(?:-t6)?|6063(?:-t52)?)\b'), 'AL'),
+    (re.compile(r'(?:-|\b)(?:ss|stainless|304l?)\b'), 'SS'),
+    (re.compile(r'\b(?:steel|carbon|a36|a500b?|a992|a572)\b'), ''),
+)
+# Checked in order, so "i beam" is claimed before plain "beam"
+_FAMILY_WORDS = (
+    (re.compile(r'\bwide[\s-]*flanges?\b|\bwf\b|\bw[\s-]beams?\b'), 'W'),
+    (re.compile(r'\b[is][\s-]*beams?\b'), 'S'),
+    (re.compile(r'\bbeams?\b'), 'W'),
+    (re.compile(r'\bchannels?\b'), 'C'),
+    (re.compile(r'\bangles?\b'), 'L'),
+    (re.compile(r'\b(?:(?:square|rect\w*)\s*)?tub(?:e|es|ing)\b|\bhss\b'), 'HSS'),
+)
+_FAMILY_PREFIX = re.compile(r'\s*(hss|l|w|s|c)\s*(?=[\d.])')
+_GAUGE = re.compile(r'(\d+)\s*(?:ga|gauge|gage)\b')
+_NUMBER = re.compile(r'(\d+)[\s-]+(\d+)/(\d+)|(\d+)/(\d+)|(\d+\.?\d*|\.\d+)')
+_SEPARATORS = re.compile(r'[\sx*,-]*')
+_WORD = re.compile(r'\b[a-z]{2,}\b')
+
+
+def format_inches(value: float) -> str:
+    """Catalog style: nearest 1/64 as a (mixed) fraction, else a decimal"""
+    n = round(value * 64)
+    if abs(n / 64 - value) > 0.001:
+        return f"{value:g}"
+    whole, num = divmod(n, 64)
+    if num == 0:
+        return str(whole)
+    den = 64
+    while num % 2 == 0:
+        num //= 2
+        den //= 2
+    return f"{whole} {num}/{den}" if whole else f"{num}/{den}"
+
+
+def format_weight(value: float) -> str:
+    return f"{value:g}"
+
+
+class Designation(NamedTuple):
+    """A parsed designation. dims are inches for L and HSS (legs or outer
+    sizes, then thickness) and (nominal depth, lb/ft) for W, S and C."""
+    family: str
+    dims: Tuple[float, ...]
+    material: str = ''
+    gauge: Optional[str] = None
+
+    @property
+    def dims_text(self) -> str:
+        fmt = format_weight if self.family in WEIGHT_FAMILIES else format_inches
+        parts = [fmt(v) for v in self.dims]
+        if self.gauge:
+            parts[-1] = self.gauge
+        return 'x'.join(parts)
+
+    @property
+    def canonical(self) -> str:
+        suffix = f"-{self.material}" if self.material else ''
+        return f"{self.family}{self.dims_text}{suffix}"
+
+
+class _Tokens(NamedTuple):
+    family: Optional[str]
+    material: Optional[str]
+    numbers: List[float]
+    gauge: Optional[str]
+    trailing_x: bool
+
+
+def _tokenize(text: str, lenient: bool = False) -> Optional[_Tokens]:
+    """Split free text into family, material, numbers and gauge; None if
+    anything is left over that is not a separator (lenient: unknown words
+    are dropped instead)"""
+    s = text.lower().replace('×', 'x').replace('"', ' ').replace("'", ' ')
+    material = None
+    for pattern, code in _MATERIAL_WORDS:
+        s, n = pattern.subn(' ', s)
+        if n:
+            material = code
+    family = None
+    for pattern, code in _FAMILY_WORDS:
+        s, n = pattern.subn(' ', s)
+        if n and family is None:
+            family = code
+    m = _FAMILY_PREFIX.match(s)
+    if m:
+        family = family or m.group(1).upper()
+        s = s[m.end():]
+
+    gauge = None
+    m = _GAUGE.search(s)
+    if m:
+        gauge = f"{int(m.group(1))}ga"
+        s = s[:m.start()] + ' ' + s[m.end():]
+    trailing_x = s.rstrip().endswith(('x', '*'))
+
+    numbers: List[float] = []
+
+    def take(m: "re.Match") -> str:
+        if m.group(1):
+            numbers.append(int(m.group(1)) + int(m.group(2)) / int(m.group(3)))
+        elif m.group(4):
+            numbers.append(int(m.group(4)) / int(m.group(5)))
+        else:
+            numbers.append(float(m.group(6)))
+        return ' '
+
+    rest = _NUMBER.sub(take, s)
+    if lenient:
+        rest = _WORD.sub(' ', rest)
+    if not _SEPARATORS.fullmatch(rest) or any(v == 0 for v in numbers):
+        return None
+    return _Tokens(family, material, numbers, gauge, trailing_x)
+
+
+def parse_designation(text: str) -> Optional[Designation]:
+    """Complete designation from catalog or user text, or None if the family
+    or a dimension is missing or the text is not a designation"""
+    tokens = _tokenize(text)
+    if tokens is None or tokens.family is None:
+        return None
+    dims = list(tokens.numbers)
+    if tokens.gauge:
+        if tokens.gauge not in GAUGE_TO_INCHES:
+            return None
+        dims.append(GAUGE_TO_INCHES[tokens.gauge])
+    if len(dims) != (2 if tokens.family in WEIGHT_FAMILIES else 3):
+        return None
+    return Designation(tokens.family, tuple(dims), tokens.material or '', tokens.gauge)
+
+
+def normalize_designation(text: str) -> Optional[str]:
+    """Canonical designation string for text, e.g. 'w8 31' -> 'W8x31'"""
+    parsed = parse_designation(text)
+    return parsed.canonical if parsed else None
+
+
+class _Query(NamedTuple):
+    keys: List[str]             # lowercase index keys to prefix-search
+    family: Optional[str]       # None = any
+    material: Optional[str]     # None = any
+
+
+def _parse_query(text: str) -> _Query:
+    raw = ' '.join(text.lower().split())
+    keys = [raw] if raw.isdigit() else []
+    tokens = _tokenize(text, lenient=True)
+    if tokens is None or not (tokens.numbers or tokens.gauge):
+        return _Query(keys or [raw], None, None)
+
+    formats = ((format_weight,) if tokens.family in WEIGHT_FAMILIES else
+               (format_inches,) if tokens.family else (format_inches, format_weight))
+    for fmt in formats:
+        parts = [fmt(v) for v in tokens.numbers]
+        if tokens.gauge:
+            parts.append(tokens.gauge)
+        key = 'x'.join(parts) + ('x' if tokens.trailing_x else '')
+        if tokens.family:
+            key = tokens.family.lower() + key
+        if key not in keys:
+            keys.append(key)
+    return _Query(keys, tokens.family, tokens.material)
+
+
+def _trigrams(key: str) -> List[str]:
+    padded = '  ' + key
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def prefix_distance(query: str, key: str, bound: int) -> int:
+    """Edit distance from query to the closest prefix of key, or bound + 1
+    if it exceeds bound. Only the diagonal band |i - j| <= bound is filled."""
+    # A shared leading run never needs editing
+    common = 0
+    for qc, kc in zip(query, key):
+        if qc != kc:
+            break
+        common += 1
+    query, key = query[common:], key[common:]
+    n = len(key)
+    over = bound + 1
+    prev = [j if j <= bound else over for j in range(n + 1)]
+    for i, qc in enumerate(query, 1):
+        lo, hi = max(1, i - bound), min(n, i + bound)
+        cur = [over] * (n + 1)
+        if i <= bound:
+            cur[0] = i
+        for j in range(lo, hi + 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (qc != key[j - 1]))
+        if min(cur[lo - 1:hi + 1]) > bound:
+            return over
+        prev = cur
+    return min(min(prev), over)
+
+
+class Match(NamedTuple):
+    item: Any
+    designation: str
+    distance: int   # 0 for exact and prefix matches
+
+
+class DesignationIndex:
+    """Prefix and typo-tolerant lookup over designations, dimensions and SKUs"""
+
+    def __init__(self, entries: Iterable[Tuple[str, str, Any]], cache_size: int = 1024,
+                 fuzzy_candidates: int = 16):
+        """entries are (sku, designation, item); search results return item"""
+        self.items: List[Any] = []
+        self.designations: List[str] = []
+        self.families: List[str] = []
+        self.materials: List[str] = []
+        postings: Dict[str, List[int]] = {}
+        sort_keys = []
+
+        for sku, designation, item in entries:
+            pos = len(self.items)
+            self.items.append(item)
+            self.designations.append(designation)
+            parsed = parse_designation(designation)
+            keys = [str(sku).lower(), designation.lower()]
+            if parsed:
+                self.families.append(parsed.family)
+                self.materials.append(parsed.material)
+                keys.append(parsed.canonical.lower())
+                keys.append(parsed.dims_text.lower())
+                if parsed.gauge:
+                    # Gauge walls are also findable by their decimal thickness
+                    decimal = parsed._replace(gauge=None)
+                    keys += [decimal.canonical.lower(), decimal.dims_text.lower()]
+                sort_keys.append((0, FAMILIES.index(parsed.family), parsed.dims,
+                                  parsed.material, pos))
+            else:
+                self.families.append('')
+                self.materials.append('')
+                sort_keys.append((1, 0, (), designation, pos))
+            for key in dict.fromkeys(keys):
+                postings.setdefault(key, []).append(pos)
+
+        # Position in family/size order, used to rank equal matches
+        self.rank = [0] * len(self.items)
+        for order, key in enumerate(sorted(sort_keys)):
+            self.rank[key[-1]] = order
+
+        self.keys: List[str] = sorted(postings)
+        self.postings: List[List[int]] = [postings[k] for k in self.keys]
+        self.trigrams: Dict[str, List[int]] = {}
+        for k, key in enumerate(self.keys):
+            for gram in set(_trigrams(key)):
+                self.trigrams.setdefault(gram, []).append(k)
+
+        self.fuzzy_candidates = fuzzy_candidates
+        self._cache: "OrderedDict[Tuple[str, int, bool], Tuple[Match, ...]]" = OrderedDict()
+        self._cache_size = cache_size
+
+    @classmethod
+    def from_catalog(cls, catalog: Catalog, **kwargs) -> "DesignationIndex":
+        return cls(((r.sku, r.designation, r) for r in catalog.records()), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _prefix_block(self, prefix: str) -> range:
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + '￿', lo)
+        return range(lo, hi)
+
+    def _fuzzy(self, key: str, max_edits: int) -> Dict[int, int]:
+        """{entry: distance} for keys within max_edits of a prefix-typo of key"""
+        grams = _trigrams(key)
+        counts = Counter(chain.from_iterable(self.trigrams.get(g, ()) for g in grams))
+        # Each edit destroys at most three of the query's trigrams
+        need = len(grams) - 3 * max_edits
+        best = sorted((k for k, n in counts.items() if n >= need),
+                      key=counts.__getitem__, reverse=True)[:self.fuzzy_candidates]
+        found: Dict[int, int] = {}
+        for k in best:
+            distance = prefix_distance(key, self.keys[k], max_edits)
+            if distance <= max_edits:
+                for pos in self.postings[k]:
+                    if distance < found.get(pos, max_edits + 1):
+                        found[pos] = distance
+        return found
+
+    def search(self, text: str, limit: int = 10, fuzzy: bool = True) -> List[Match]:
+        """Exact matches first, then prefix matches, each in family/size
+        order; if neither finds anything and fuzzy is set, near misses by
+        edit distance. Each call returns a new list; the cache keeps tuples."""
+        cache_key = (text, limit, fuzzy)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self._cache.move_to_end(cache_key)
+            return list(cached)
+
+        query = _parse_query(text)
+
+        def wanted(pos: int) -> bool:
+            return ((query.material is None or self.materials[pos] == query.material)
+                    and (query.family is None or self.families[pos] == query.family))
+
+        exact: Dict[int, None] = {}
+        prefix: Dict[int, None] = {}
+        for key in query.keys:
+            for k in self._prefix_block(key):
+                target = exact if self.keys[k] == key else prefix
+                for pos in self.postings[k]:
+                    if wanted(pos):
+                        target[pos] = None
+        rank = self.rank.__getitem__
+        ordered = sorted(exact, key=rank)
+        ordered += sorted((p for p in prefix if p not in exact), key=rank)
+        results = [Match(self.items[p], self.designations[p], 0) for p in ordered[:limit]]
+
+        # Typos are matched against what was typed, not the parsed form
+        key = ' '.join(text.lower().split())
+        if fuzzy and not results and key:
+            max_edits = 1 if len(key) <= 4 else 2
+            near = sorted((d, rank(p), p) for p, d in self._fuzzy(key, max_edits).items()
+                          if wanted(p))
+            results = [Match(self.items[p], self.designations[p], d)
+                       for d, _, p in near[:limit]]
+
+        self._cache[cache_key] = tuple(results)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Normalize and search profile designations")
+    parser.add_argument("query", nargs='+', help="designation, dimensions or SKU")
+    parser.add_argument("--data", default="data/profile_data.json")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--no-fuzzy", action="store_true")
+    args = parser.parse_args(argv)
+
+    index = DesignationIndex.from_catalog(load_catalog(args.data))
+    text = ' '.join(args.query)
+    canonical = normalize_designation(text)
+    if canonical:
+        print(f"Canonical: {canonical}")
+
+    start = time.perf_counter()
+    results = index.search(text, args.limit, fuzzy=not args.no_fuzzy)
+    elapsed = time.perf_counter() - start
+    for match in results:
+        record = match.item
+        note = f"  (~{match.distance})" if match.distance else ''
+        print(f"{match.designation:<24} {record.sku:>6}  {record.category}{note}")
+    if not results:
+        print("No matches")
+    print(f"{len(results)} results in {elapsed * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
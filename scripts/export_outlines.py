@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Headless profile outline exporter.
+Writes every catalog cross-section as DXF and SVG into a single zip archive
+with an index.json, without SolidWorks. Profiles are rendered across a
+process pool and streamed into the archive as they complete.
+"""
+
+import argparse
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from profile_geometry import Arc, Loop, arc_angles, outline_bounds, profile_outline
+from profile_records import ProfileRecord, load_catalog, profile_stem
+
+
+def _fmt(value: float) -> str:
+    """Compact fixed-precision number for DXF/SVG output"""
+    text = f"{value:.6f}".rstrip('0').rstrip('.')
+    return "0" if text == "-0" else text
+
+
+def outline_to_dxf(loops: List[Loop]) -> str:
+    """Render outline loops as an ASCII DXF (R12) drawing. Coordinates are
+    inches: R12 has no units header variable ($INSUNITS is AC1015+), so the
+    importing program must be told (index.json records "units": "in")."""
+    out = [
+        "0", "SECTION", "2", "HEADER",
+        "9", "$ACADVER", "1", "AC1009",
+        "0", "ENDSEC",
+        "0", "SECTION", "2", "ENTITIES",
+    ]
+    for loop in loops:
+        for ent in loop:
+            if isinstance(ent, Arc):
+                radius, start, end = arc_angles(ent)
+                out += ["0", "ARC", "8", "0",
+                        "10", _fmt(ent.cx), "20", _fmt(ent.cy), "30", "0",
+                        "40", _fmt(radius), "50", _fmt(start), "51", _fmt(end)]
+            else:
+                out += ["0", "LINE", "8", "0",
+                        "10", _fmt(ent.x1), "20", _fmt(ent.y1), "30", "0",
+                        "11", _fmt(ent.x2), "21", _fmt(ent.y2), "31", "0"]
+    out += ["0", "ENDSEC", "0", "EOF"]
+    return "\n".join(out) + "\n"
+
+
+def outline_to_svg(loops: List[Loop], title: str = "") -> str:
+    """Render outline loops as a single even-odd filled SVG path (inches, y up)"""
+    min_x, min_y, max_x, max_y = outline_bounds(loops)
+    width = max_x - min_x
+    height = max_y - min_y
+
+    parts = []
+    for loop in loops:
+        first = loop[0]
+        parts.append(f"M{_fmt(first.x1)} {_fmt(-first.y1)}")
+        for ent in loop:
+            if isinstance(ent, Arc):
+                radius, start, end = arc_angles(ent)
+                large = 1 if (end - start) % 360 > 180 else 0
+                # y is flipped, so counter-clockwise becomes sweep-flag 0
+                sweep = 0 if ent.direction > 0 else 1
+                parts.append(f"A{_fmt(radius)} {_fmt(radius)} 0 {large} {sweep} "
+                             f"{_fmt(ent.x2)} {_fmt(-ent.y2)}")
+            else:
+                parts.append(f"L{_fmt(ent.x2)} {_fmt(-ent.y2)}")
+        parts.append("Z")
+
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        f'width="{_fmt(width)}in" height="{_fmt(height)}in" '
+        f'viewBox="{_fmt(min_x)} {_fmt(-max_y)} {_fmt(width)} {_fmt(height)}">'
+        f'<title>{escape(title)}</title>'
+        f'<path d="{" ".join(parts)}" fill="#888" fill-rule="evenodd" '
+        'stroke="#000" stroke-width="0.01"/></svg>\n'
+    )
+
+
+def _render(record: ProfileRecord) -> Optional[Tuple[str, str, Tuple]]:
+    """Worker: build the outline for one record and render both formats"""
+    loops = profile_outline(record)
+    if loops is None:
+        return None
+    return (outline_to_dxf(loops), outline_to_svg(loops, record.designation),
+            outline_bounds(loops))
+
+
+def export_archive(data_path: str = "data/profile_data.json",
+                   archive_path: str = "output/profile_outlines.zip",
+                   workers: Optional[int] = None,
+                   chunksize: int = 32,
+                   profiles: Optional[Dict[str, List[ProfileRecord]]] = None) -> Dict[str, Any]:
+    """Export every supported profile (or the given {category: [record]}
+    subset) to DXF + SVG inside one zip archive"""
+    catalog = load_catalog(data_path, strict=False)
+    if profiles is None:
+        profiles = catalog.by_category
+    jobs = [record for items in profiles.values() for record in items]
+
+    os.makedirs(os.path.dirname(archive_path) or ".", exist_ok=True)
+    index: List[Dict[str, Any]] = []
+    skipped: List[str] = []
+    started = time.perf_counter()
+
+    if workers == 1:
+        executor = None
+        results = map(_render, jobs)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_render, jobs, chunksize=chunksize)
+
+    try:
+        with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for record, result in zip(jobs, results):
+                if result is None:
+                    skipped.append(record.sku)
+                    continue
+                dxf, svg, bounds = result
+                stem = f"{record.category}/{profile_stem(record.designation)}"
+                zf.writestr(f"{stem}.dxf", dxf)
+                zf.writestr(f"{stem}.svg", svg)
+                index.append({
+                    "sku": record.sku,
+                    "designation": record.designation,
+                    "category": record.category,
+                    "material": record.material,
+                    "dxf": f"{stem}.dxf",
+                    "svg": f"{stem}.svg",
+                    "bounds_in": [round(v, 6) for v in bounds],
+                })
+            zf.writestr("index.json", json.dumps({
+                "source": catalog.metadata.get('source', ''),
+                "scrape_date": catalog.metadata.get('scrape_date', ''),
+                "units": "in",
+                "profiles": index,
+                "skipped_skus": skipped,
+            }, indent=2))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return {
+        "archive": archive_path,
+        "exported": len(index),
+        "skipped": len(skipped),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export profile outlines as DXF/SVG")
+    parser.add_argument("--data", default="data/profile_data.json")
+    parser.add_argument("--out", default="output/profile_outlines.zip")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="process pool size (1 = run in-process)")
+    args = parser.parse_args(argv)
+
+    summary = export_archive(args.data, args.out, args.workers)
+    print(f"Exported {summary['exported']} profiles to {summary['archive']} "
+          f"in {summary['seconds']}s ({summary['skipped']} skipped)")
+
+
+if __name__ == "__main__":
+    main()
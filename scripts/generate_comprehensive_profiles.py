@@ -8,8 +8,11 @@ import json
 import math
 from typing import Dict, List, Any
 
+from catalog_diff import write_canonical
+
 # Fraction to decimal conversion
 FRACTIONS = {
+    "1/16": 0.0625,
     "1/8": 0.125,
     "3/16": 0.1875,
     "1/4": 0.25,
@@ -108,8 +111,6 @@ def generate_steel_equal_leg_angles() -> List[Dict[str, Any]]:
                 "leg_a_in": leg_in,
                 "leg_b_in": leg_in,
                 "thickness_in": t_in,
-                "inside_fillet_radius_in": t_in,  # AISC standard
-                "toe_radius_in": t_in / 2,  # AISC standard
                 "length_inches": 240,
                 "weight_per_ft": round(weight_per_ft, 3),
                 "area_in2": round(area, 3),
@@ -174,8 +175,6 @@ def generate_steel_unequal_leg_angles() -> List[Dict[str, Any]]:
                 "leg_a_in": leg_a_in,
                 "leg_b_in": leg_b_in,
                 "thickness_in": t_in,
-                "inside_fillet_radius_in": t_in,
-                "toe_radius_in": t_in / 2,
                 "length_inches": 240,
                 "weight_per_ft": round(weight_per_ft, 3),
                 "area_in2": round(area, 3),
@@ -222,9 +221,6 @@ def generate_steel_i_beams() -> List[Dict[str, Any]]:
     
     for desig, depth, flange_w, web_t, flange_t, weight in s_shapes:
         # S-shapes have tapered flanges at 16.67% (9.46 degrees)
-        # Fillet radius approximation
-        k_dim = flange_t + 0.25  # Approximate k dimension
-        fillet_r = k_dim - flange_t
         
         area = weight / 3.4  # Approximate area from weight
         price = weight * 20 * 1.35  # 20ft length
@@ -237,8 +233,6 @@ def generate_steel_i_beams() -> List[Dict[str, Any]]:
             "web_thickness_in": web_t,
             "flange_thickness_in": flange_t,
             "flange_slope_degrees": 16.67,  # S-shapes have tapered flanges
-            "k_dimension_in": round(k_dim, 3),
-            "fillet_radius_in": round(fillet_r, 3),
             "length_inches": 240,
             "weight_per_ft": weight,
             "area_in2": round(area, 3),
@@ -368,7 +362,6 @@ def generate_steel_wide_flange() -> List[Dict[str, Any]]:
     
     for desig, depth, flange_w, web_t, flange_t, k_dim, weight in w_shapes:
         # W-shapes have parallel flanges
-        fillet_r = k_dim - flange_t
         
         area = weight / 3.4  # Approximate
         price = weight * 20 * 1.40  # 20ft length
@@ -381,7 +374,6 @@ def generate_steel_wide_flange() -> List[Dict[str, Any]]:
             "web_thickness_in": web_t,
             "flange_thickness_in": flange_t,
             "k_dimension_in": k_dim,
-            "fillet_radius_in": round(fillet_r, 3),
             "length_inches": 240,
             "weight_per_ft": weight,
             "area_in2": round(area, 3),
@@ -435,8 +427,6 @@ def generate_steel_c_channels() -> List[Dict[str, Any]]:
     
     for desig, depth, flange_w, web_t, flange_t, weight in c_shapes:
         # C-shapes have tapered flanges at 16.67% (9.46 degrees)
-        k_dim = flange_t + 0.25
-        fillet_r = k_dim - flange_t
         
         area = weight / 3.4
         price = weight * 20 * 1.35
@@ -449,8 +439,6 @@ def generate_steel_c_channels() -> List[Dict[str, Any]]:
             "web_thickness_in": web_t,
             "flange_thickness_in": flange_t,
             "flange_slope_degrees": 9.46,  # American Standard channels
-            "k_dimension_in": round(k_dim, 3),
-            "fillet_radius_in": round(fillet_r, 3),
             "length_inches": 240,
             "weight_per_ft": weight,
             "area_in2": round(area, 3),
@@ -513,8 +501,6 @@ def generate_steel_square_tubes() -> List[Dict[str, Any]]:
                 "size": f"{size}\" x {size}\"",
                 "outer_dim_in": outer_in,
                 "wall_thickness_in": wall_in,
-                "corner_radius_outer_in": 2 * wall_in,  # HSS standard
-                "corner_radius_inner_in": wall_in,  # HSS standard
                 "length_inches": 288,
                 "weight_per_ft": round(weight_per_ft, 3),
                 "area_in2": round(area, 3),
@@ -615,8 +601,6 @@ def generate_steel_rectangular_tubes() -> List[Dict[str, Any]]:
                 "outer_width_in": width_in,
                 "outer_height_in": height_in,
                 "wall_thickness_in": wall_in,
-                "corner_radius_outer_in": 2 * wall_in,
-                "corner_radius_inner_in": wall_in,
                 "length_inches": 288,
                 "weight_per_ft": round(weight_per_ft, 3),
                 "area_in2": round(area, 3),
@@ -669,8 +653,6 @@ def generate_aluminum_angles() -> List[Dict[str, Any]]:
                 "leg_a_in": leg_in,
                 "leg_b_in": leg_in,
                 "thickness_in": t_in,
-                "inside_fillet_radius_in": t_in,
-                "toe_radius_in": t_in / 2,
                 "length_inches": 144,
                 "weight_per_ft": round(weight_per_ft, 3),
                 "area_in2": round(area, 3),
@@ -721,8 +703,6 @@ def generate_aluminum_square_tubes() -> List[Dict[str, Any]]:
                 "size": f"{size}\" x {size}\"",
                 "outer_dim_in": outer_in,
                 "wall_thickness_in": wall_in,
-                "corner_radius_outer_in": 2 * wall_in,
-                "corner_radius_inner_in": wall_in,
                 "length_inches": 144,
                 "weight_per_ft": round(weight_per_ft, 3),
                 "area_in2": round(area, 3),
@@ -773,8 +753,6 @@ def generate_stainless_angles() -> List[Dict[str, Any]]:
                 "leg_a_in": leg_in,
                 "leg_b_in": leg_in,
                 "thickness_in": t_in,
-                "inside_fillet_radius_in": t_in,
-                "toe_radius_in": t_in / 2,
                 "length_inches": 240,
                 "weight_per_ft": round(weight_per_ft, 3),
                 "area_in2": round(area, 3),
@@ -832,8 +810,6 @@ def generate_stainless_square_tubes() -> List[Dict[str, Any]]:
                 "size": f"{size}\" x {size}\"",
                 "outer_dim_in": outer_in,
                 "wall_thickness_in": wall_in,
-                "corner_radius_outer_in": 2 * wall_in,
-                "corner_radius_inner_in": wall_in,
                 "length_inches": 240,
                 "weight_per_ft": round(weight_per_ft, 3),
                 "area_in2": round(area, 3),
@@ -902,28 +878,52 @@ def generate_complete_profile_data():
                 "description": "Hot-rolled steel angles per ASTM A36/A992",
                 "inside_fillet_radius": "Equal to material thickness (t)",
                 "toe_radius": "Half of material thickness (t/2)",
-                "reference": "AISC Steel Construction Manual"
+                "reference": "AISC Steel Construction Manual",
+                "applies_to": ["*angle*"],
+                "rules": {
+                    "inside_fillet_radius_in": "thickness_in",
+                    "toe_radius_in": "thickness_in / 2"
+                }
             },
             "wide_flange": {
                 "description": "W-shapes per ASTM A992/A36",
                 "flange_taper": "None - parallel flanges",
                 "k_dimension": "Distance from outer flange face to web fillet tangent",
-                "fillet_radius": "Varies by size - typically (k - tf)"
+                "fillet_radius": "Varies by size - typically (k - tf)",
+                "applies_to": ["*wide_flange*"],
+                "rules": {
+                    "fillet_radius_in": "round(k_dimension_in - flange_thickness_in, 3)"
+                }
             },
             "i_beams": {
                 "description": "S-shapes per ASTM A36",
                 "flange_slope": "16.67% (tapered flanges)",
-                "fillet_radius": "Varies by size"
+                "fillet_radius": "Varies by size",
+                "applies_to": ["*i_beam*"],
+                "rules": {
+                    "k_dimension_in": "round(flange_thickness_in + 0.25, 3)",
+                    "fillet_radius_in": "round(k_dimension_in - flange_thickness_in, 3)"
+                }
             },
             "channels": {
                 "description": "C-shapes per ASTM A36",
                 "flange_slope": "16.67% (9.46 degrees) for American Standard",
-                "fillet_radius": "Varies by size"
+                "fillet_radius": "Varies by size",
+                "applies_to": ["*channel*"],
+                "rules": {
+                    "k_dimension_in": "round(flange_thickness_in + 0.25, 3)",
+                    "fillet_radius_in": "round(k_dimension_in - flange_thickness_in, 3)"
+                }
             },
             "hss_tubes": {
                 "description": "HSS Square/Rectangular tubes per ASTM A500",
                 "corner_radius_outer": "Typically 2x wall thickness for formed HSS",
-                "corner_radius_inner": "Typically 1x wall thickness"
+                "corner_radius_inner": "Typically 1x wall thickness",
+                "applies_to": ["*tube*"],
+                "rules": {
+                    "corner_radius_outer_in": "2 * wall_thickness_in",
+                    "corner_radius_inner_in": "wall_thickness_in"
+                }
             }
         },
         "materials": {
@@ -949,6 +949,10 @@ def generate_complete_profile_data():
         }
     }
     
+    # Radii and approximate k dimensions come from the standards' rules;
+    # imported here so modules that only need GAUGE_TO_INCHES skip NumPy
+    from geometry_rules import apply_rules
+    apply_rules(data)
     return data
 
 
@@ -958,8 +962,7 @@ if __name__ == "__main__":
     data = generate_complete_profile_data()
     
     output_file = "../data/profile_data.json"
-    with open(output_file, 'w') as f:
-        json.dump(data, f, indent=8)
+    write_canonical(data, output_file)
     
     print(f"\nProfile data written to {output_file}")
     print(f"Total profiles: {data['metadata']['total_profiles']}")
@@ -4,199 +4,307 @@ Generates .sldlfp profile files from Coremark Metals scraped data
 Version 2.0 - Uses enhanced profile_data.json with complete geometry
 """
 
-import json
 import os
-import win32com.client
-import pythoncom
+import shutil
+import time
 from pathlib import Path
 
+import library_index
+from progress_events import ProgressEvents
+from profile_geometry import Arc, geometry_key, profile_outline
+from profile_records import (AngleRecord, RectangularTubeRecord, SquareTubeRecord, load_catalog,
+                             profile_filename)
+
 # Conversion factor: inches to meters (SolidWorks uses meters internally)
 IN_TO_M = 0.0254
 
+SW_DOC_PART = 1             # swDocPART (library feature parts open as parts)
+SW_OPEN_SILENT = 1          # swOpenDocOptions_Silent
+SW_SAVE_SILENT = 1          # swSaveAsOptions_Silent
+
+
+def profile_properties(profile):
+    """Custom properties written to a profile's file, name -> text, in order"""
+    props = {
+        "Designation": profile.designation,
+        "Size": profile.size,
+        "Material": profile.material,
+    }
+    # Geometric properties
+    if isinstance(profile, AngleRecord):
+        props["Leg_A"] = str(profile.leg_a_in)
+        props["Leg_B"] = str(profile.leg_b_in)
+        props["Thickness"] = str(profile.thickness_in)
+    if isinstance(profile, SquareTubeRecord):
+        props["Outer_Dimension"] = str(profile.outer_dim_in)
+    if isinstance(profile, (SquareTubeRecord, RectangularTubeRecord)):
+        props["Wall_Thickness"] = str(profile.wall_thickness_in)
+    # Commercial properties
+    props["Price"] = str(profile.price)
+    props["Weight_Per_Ft"] = str(profile.weight_per_ft)
+    props["SKU"] = profile.sku
+    props["Source"] = "Coremark Metals"
+    return props
+
+
 class ProfileGenerator:
-          def __init__(self, data_path="data/profile_data.json"):
-                        with open(data_path, 'r') as f:
-                                          self.data = json.load(f)
-                                      self.profiles = self.data.get('profiles', {})
-                        self.materials = self.data.get('materials', {})
-                        self.geometry_standards = self.data.get('geometry_standards', {})
-                        self.sw_app = None
+    def __init__(self, data_path="data/profile_data.json"):
+        # The catalog is parsed on first use so callers that pass their own
+        # profile subset to generate_all never read the full file
+        self.data_path = data_path
+        self._catalog = None
+        self.sw_app = None
+        self.template = None
+
+    @property
+    def catalog(self):
+        if self._catalog is None:
+            self._catalog = load_catalog(self.data_path, strict=False)
+            for problem in self._catalog.problems:
+                print(f"  Invalid record skipped: {problem}")
+        return self._catalog
+
+    @property
+    def profiles(self):
+        return self.catalog.by_category
+
+    @property
+    def materials(self):
+        return self.catalog.materials
+
+    @property
+    def geometry_standards(self):
+        return self.catalog.geometry_standards
 
     def connect_solidworks(self):
-                  """Connect to running SolidWorks instance"""
-                  pythoncom.CoInitialize()
-                  self.sw_app = win32com.client.Dispatch("SldWorks.Application")
-                  self.sw_app.Visible = True
-                  return self.sw_app is not None
-
-    def create_angle_profile(self, profile, category):
-                  """Create L-shaped angle profile with proper fillet radii"""
-                  # Extract dimensions from enhanced data structure
-                  leg_a = profile.get('leg_a_in', 1.0) * IN_TO_M
-                  leg_b = profile.get('leg_b_in', 1.0) * IN_TO_M
-                  thickness = profile.get('thickness_in', 0.125) * IN_TO_M
-                  inside_fillet = profile.get('inside_fillet_radius_in', thickness/IN_TO_M) * IN_TO_M
-                  toe_radius = profile.get('toe_radius_in', thickness/IN_TO_M/2) * IN_TO_M
-
+        """Connect to running SolidWorks instance"""
+        # COM modules are Windows-only; import them only when connecting
+        import pythoncom
+        import win32com.client
+
+        pythoncom.CoInitialize()
+        self.sw_app = win32com.client.Dispatch("SldWorks.Application")
+        self.sw_app.Visible = True
+        # Resolved once per session instead of once per part
+        self.template = self.sw_app.GetUserPreferenceStringValue(21)  # swDefaultTemplateLibFeatPart
+        return self.sw_app is not None
+
+    def _new_part(self):
+        """New library feature part from the session's default template"""
+        return self.sw_app.NewDocument(self.template, 0, 0, 0)
+
+    def create_angle_profile(self, profile):
+        """Create L-shaped angle profile with proper fillet radii"""
         # Create new document
-                  model = self.sw_app.NewDocument(
-                      self.sw_app.GetUserPreferenceStringValue(21),  # swDefaultTemplateLibFeatPart
-                      0, 0, 0
-                  )
+        model = self._new_part()
 
         # Select front plane and start sketch
-                  model.Extension.SelectByID2("Front Plane", "PLANE", 0, 0, 0, False, 0, None, 0)
-                  model.SketchManager.InsertSketch(True)
-
-        # Draw L-shape with fillets
-                  # Outer profile
-                  sketch = model.SketchManager
-
-        # Start at origin, go right along leg_a
-                  sketch.CreateLine(0, 0, 0, leg_a, 0, 0)
-                  # Go up by thickness
-                  sketch.CreateLine(leg_a, 0, 0, leg_a, thickness, 0)
-                  # Go left to inside corner (minus fillet area)
-                  sketch.CreateLine(leg_a, thickness, 0, thickness + inside_fillet, thickness, 0)
-
-        # Inside fillet arc (90 degree arc)
-                  sketch.CreateArc(thickness + inside_fillet, thickness + inside_fillet, 0,
-                                   thickness + inside_fillet, thickness, 0,
-                                   thickness, thickness + inside_fillet, 0, 1)
-
-        # Go up leg_b
-                  sketch.CreateLine(thickness, thickness + inside_fillet, 0, thickness, leg_b, 0)
-                  # Go left by thickness
-                  sketch.CreateLine(thickness, leg_b, 0, 0, leg_b, 0)
-                  # Go down to origin
-                  sketch.CreateLine(0, leg_b, 0, 0, 0, 0)
+        model.Extension.SelectByID2("Front Plane", "PLANE", 0, 0, 0, False, 0, None, 0)
+        model.SketchManager.InsertSketch(True)
+
+        # Draw L-shape with inside fillet
+        self._draw_outline(model.SketchManager, profile_outline(profile))
 
         model.SketchManager.InsertSketch(True)
 
         # Add custom properties
-        self._add_properties(model, profile, category)
+        self._add_properties(model, profile)
 
         return model
 
-    def create_square_tube_profile(self, profile, category):
-                  """Create square tube profile with corner radii"""
-                  outer_dim = profile.get('outer_dim_in', 2.0) * IN_TO_M
-                  wall = profile.get('wall_thickness_in', 0.125) * IN_TO_M
-                  corner_outer = profile.get('corner_radius_outer_in', wall * 2) * IN_TO_M
-                  corner_inner = profile.get('corner_radius_inner_in', wall) * IN_TO_M
-
-        inner_dim = outer_dim - 2 * wall
-
-        model = self.sw_app.NewDocument(
-                          self.sw_app.GetUserPreferenceStringValue(21),
-                          0, 0, 0
-        )
+    def create_square_tube_profile(self, profile):
+        """Create square or rectangular tube profile with corner radii"""
+        model = self._new_part()
 
         model.Extension.SelectByID2("Front Plane", "PLANE", 0, 0, 0, False, 0, None, 0)
         model.SketchManager.InsertSketch(True)
 
-        sketch = model.SketchManager
-
-        # Outer rectangle with corner radii
-        half_outer = outer_dim / 2
-        half_inner = inner_dim / 2
-
-        # Draw outer rounded rectangle
-        self._draw_rounded_rectangle(sketch, -half_outer, -half_outer, 
-                                                                         half_outer, half_outer, corner_outer)
-
-        # Draw inner rounded rectangle (cutout)
-        self._draw_rounded_rectangle(sketch, -half_inner, -half_inner,
-                                                                         half_inner, half_inner, corner_inner)
+        # Outer rounded rectangle, then inner rounded rectangle (cutout)
+        self._draw_outline(model.SketchManager, profile_outline(profile))
 
         model.SketchManager.InsertSketch(True)
-        self._add_properties(model, profile, category)
+        self._add_properties(model, profile)
 
         return model
 
-    def _draw_rounded_rectangle(self, sketch, x1, y1, x2, y2, radius):
-                  """Draw a rounded rectangle in the sketch"""
-                  r = radius
-                  # Bottom edge
-                  sketch.CreateLine(x1 + r, y1, 0, x2 - r, y1, 0)
-        # Bottom-right corner
-        sketch.CreateArc(x2 - r, y1 + r, 0, x2 - r, y1, 0, x2, y1 + r, 0, -1)
-        # Right edge
-        sketch.CreateLine(x2, y1 + r, 0, x2, y2 - r, 0)
-        # Top-right corner
-        sketch.CreateArc(x2 - r, y2 - r, 0, x2, y2 - r, 0, x2 - r, y2, 0, -1)
-        # Top edge
-        sketch.CreateLine(x2 - r, y2, 0, x1 + r, y2, 0)
-        # Top-left corner
-        sketch.CreateArc(x1 + r, y2 - r, 0, x1 + r, y2, 0, x1, y2 - r, 0, -1)
-        # Left edge
-        sketch.CreateLine(x1, y2 - r, 0, x1, y1 + r, 0)
-        # Bottom-left corner
-        sketch.CreateArc(x1 + r, y1 + r, 0, x1, y1 + r, 0, x1 + r, y1, 0, -1)
-
-    def _add_properties(self, model, profile, category):
-                  """Add custom properties to the model"""
-                  cpm = model.Extension.CustomPropertyManager("")
-
-        # Standard properties
-                  cpm.Add3("Designation", 30, profile.get('designation', ''), 2)
-        cpm.Add3("Size", 30, profile.get('size', ''), 2)
-        cpm.Add3("Material", 30, profile.get('material', ''), 2)
-
-        # Geometric properties
-        if 'leg_a_in' in profile:
-                          cpm.Add3("Leg_A", 30, str(profile['leg_a_in']), 2)
-                          cpm.Add3("Leg_B", 30, str(profile['leg_b_in']), 2)
-                      if 'outer_dim_in' in profile:
-                                        cpm.Add3("Outer_Dimension", 30, str(profile['outer_dim_in']), 2)
-                                    if 'thickness_in' in profile:
-                                                      cpm.Add3("Thickness", 30, str(profile['thickness_in']), 2)
-                                                  if 'wall_thickness_in' in profile:
-                                                                    cpm.Add3("Wall_Thickness", 30, str(profile['wall_thickness_in']), 2)
-
-        # Commercial properties
-        cpm.Add3("Price", 30, str(profile.get('price', '')), 2)
-        cpm.Add3("Weight_Per_Ft", 30, str(profile.get('weight_per_ft', '')), 2)
-        cpm.Add3("SKU", 30, str(profile.get('sku', '')), 2)
-        cpm.Add3("Source", 30, "Coremark Metals", 2)
+    def _draw_outline(self, sketch, loops):
+        """Draw outline loops (inches) into the sketch (meters)"""
+        for loop in loops:
+            for ent in loop:
+                if isinstance(ent, Arc):
+                    sketch.CreateArc(ent.cx * IN_TO_M, ent.cy * IN_TO_M, 0,
+                                     ent.x1 * IN_TO_M, ent.y1 * IN_TO_M, 0,
+                                     ent.x2 * IN_TO_M, ent.y2 * IN_TO_M, 0,
+                                     ent.direction)
+                else:
+                    sketch.CreateLine(ent.x1 * IN_TO_M, ent.y1 * IN_TO_M, 0,
+                                      ent.x2 * IN_TO_M, ent.y2 * IN_TO_M, 0)
+
+    def _add_properties(self, model, profile):
+        """Add custom properties to the model"""
+        cpm = model.Extension.CustomPropertyManager("")
+        for name, value in profile_properties(profile).items():
+            cpm.Add3(name, 30, value, 2)
 
     def save_profile(self, model, folder, filename):
-                  """Save model as .sldlfp file"""
-                  os.makedirs(folder, exist_ok=True)
-                  filepath = os.path.join(folder, filename)
-                  model.Extension.SaveAs(filepath, 0, 1, None, 0, 0)
-                  model.Close()
-                  return filepath
-
-    def generate_all(self, output_dir="output"):
-                  """Generate all profiles from loaded data"""
-                  if not self.connect_solidworks():
-                                    print("Failed to connect to SolidWorks")
-                                    return
-
-                  for category, items in self.profiles.items():
-                                    print(f"Processing {category}...")
-                                    cat_folder = os.path.join(output_dir, category)
-
-            for profile in items:
-                                  designation = profile.get('designation', profile.get('size', 'unknown'))
-
-                try:
-                                          if 'angle' in category.lower():
-                                                                        model = self.create_angle_profile(profile, category)
-elif 'tube' in category.lower() or 'square' in category.lower():
-                        model = self.create_square_tube_profile(profile, category)
-else:
-                        print(f"  Skipping unknown type: {category}")
-                              continue
-
-                    if model:
-                                                  fname = f"{designation.replace('/', '-').replace(' ', '_')}.sldlfp"
-                                                  self.save_profile(model, cat_folder, fname)
-                                                  print(f"  Created: {fname}")
-except Exception as e:
-                    print(f"  Error creating {designation}: {e}")
+        """Save model as .sldlfp file"""
+        os.makedirs(folder, exist_ok=True)
+        filepath = os.path.join(folder, filename)
+        model.Extension.SaveAs(filepath, 0, 1, None, 0, 0)
+        model.Close()
+        return filepath
+
+    def _status_args(self):
+        """By-reference (errors, warnings) longs for OpenDoc6/Save3"""
+        import pythoncom
+        import win32com.client
+
+        return tuple(win32com.client.VARIANT(pythoncom.VT_BYREF | pythoncom.VT_I4, 0)
+                     for _ in range(2))
+
+    def clone_profile(self, source, profile, folder, filename):
+        """Copy a saved profile with the same cross-section and rewrite only
+        its custom properties for profile, skipping the sketch entirely"""
+        os.makedirs(folder, exist_ok=True)
+        filepath = os.path.join(folder, filename)
+        shutil.copyfile(source, filepath)
+        errors, warnings = self._status_args()
+        model = self.sw_app.OpenDoc6(filepath, SW_DOC_PART, SW_OPEN_SILENT, "", errors, warnings)
+        if model is None:
+            raise RuntimeError(f"could not open {filepath} (error {errors.value})")
+        try:
+            self._add_properties(model, profile)
+            if not model.Save3(SW_SAVE_SILENT, errors, warnings):
+                raise RuntimeError(f"could not save {filepath} (error {errors.value})")
+        finally:
+            model.Close()
+        return filepath
+
+    def generate_all(self, output_dir="output", profiles=None, publisher=None, clone=True,
+                     events=None):
+        """Generate all profiles from loaded data, or only the given
+        {category: [record, ...]} subset. With a LibraryPublisher, files are
+        saved to its local scratch folder and copied to the share in the
+        background, then published together at the end.
+
+        With clone=True each distinct cross-section is drawn once per call;
+        records with the same geometry_key (other materials and grades of a
+        size) copy that file and get their own custom properties. When
+        publishing, those source files are kept in scratch until publish(). A
+        failed clone is reported as a clone_failed event and falls back to
+        drawing the profile, which becomes the new source.
+
+        Every saved file is recorded in library_index.sqlite in the library
+        root as it is saved (see library_index.py).
+
+        Progress goes to events, a progress_events.ProgressEvents (by default
+        the console lines); the caller owns and closes its sinks. run_finished
+        is emitted however the run ends, with error set if it did not finish.
+
+        The SolidWorks session is reused across calls. Returns
+        {"created": [paths], "failed": {sku: error}, "cloned": count}, or
+        None if SolidWorks could not be reached."""
+        if publisher is not None:
+            output_dir = publisher.scratch_dir
+        if profiles is None:
+            profiles = self.profiles
+        if events is None:
+            events = ProgressEvents.console()
+
+        created = []
+        failed = {}
+        drawn = {}      # geometry key -> first file saved with that cross-section
+        cloned = 0
+        error = None
+        run_start = time.monotonic()
+        events.emit("run_started", total=sum(len(items) for items in profiles.values()),
+                    categories=len(profiles), output_dir=output_dir)
+        try:
+            if self.sw_app is None and not self.connect_solidworks():
+                error = "Failed to connect to SolidWorks"
+                return None
+            index = library_index.open_for_run(output_dir, publisher)
+
+            for category, items in profiles.items():
+                events.emit("category_started", category=category, count=len(items))
+                cat_folder = os.path.join(output_dir, category)
+                cat_start = time.monotonic()
+                cat_done = cat_failed = 0
+
+                for profile in items:
+                    designation = profile.designation
+                    start = time.monotonic()
+                    info = {"category": category, "sku": profile.sku, "designation": designation}
+
+                    fname = profile_filename(designation)
+                    key = geometry_key(profile) if clone else None
+                    source = drawn.get(key)
+                    if source is not None:
+                        try:
+                            filepath = self.clone_profile(source, profile, cat_folder, fname)
+                            index.record(os.path.join(category, fname), profile, filepath)
+                            if publisher is not None:
+                                publisher.submit(filepath, os.path.join(category, fname))
+                            created.append(filepath)
+                            cloned += 1
+                            cat_done += 1
+                            events.emit("profile_done", **info, file=fname,
+                                        seconds=round(time.monotonic() - start, 3), cloned=True,
+                                        source=os.path.basename(source))
+                            continue
+                        except Exception as e:
+                            # The drawing below becomes the source for this key
+                            del drawn[key]
+                            events.emit("clone_failed", **info, source=os.path.basename(source),
+                                        error=str(e))
+
+                    try:
+                        if isinstance(profile, AngleRecord):
+                            model = self.create_angle_profile(profile)
+                        elif isinstance(profile, (SquareTubeRecord, RectangularTubeRecord)):
+                            model = self.create_square_tube_profile(profile)
+                        else:
+                            events.emit("profile_skipped", **info,
+                                        reason=f"no builder for {profile.FAMILY}")
+                            continue
+
+                        if model:
+                            filepath = self.save_profile(model, cat_folder, fname)
+                            index.record(os.path.join(category, fname), profile, filepath)
+                            # Clone sources stay in scratch until the run is published
+                            is_source = key is not None and key not in drawn
+                            if publisher is not None:
+                                publisher.submit(filepath, os.path.join(category, fname),
+                                                 keep=is_source)
+                            created.append(filepath)
+                            if is_source:
+                                drawn[key] = filepath
+                            cat_done += 1
+                            events.emit("profile_done", **info, file=fname,
+                                        seconds=round(time.monotonic() - start, 3), cloned=False)
+                    except Exception as e:
+                        failed[profile.sku] = str(e)
+                        cat_failed += 1
+                        events.emit("profile_failed", **info,
+                                    seconds=round(time.monotonic() - start, 3), error=str(e))
+
+                events.emit("category_done", category=category, done=cat_done, failed=cat_failed,
+                            seconds=round(time.monotonic() - cat_start, 3))
+
+            library_index.finish_run(index, publisher)
+            if publisher is not None:
+                events.emit("publishing", pending=publisher.pending)
+                events.emit("published", library=publisher.publish())
+            return {"created": created, "failed": failed, "cloned": cloned}
+        except BaseException as e:
+            # Interrupted runs too, so the event log never has an open run
+            error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            raise
+        finally:
+            events.emit("run_finished", created=len(created), failed=len(failed),
+                        cloned=cloned, seconds=round(time.monotonic() - run_start, 3),
+                        error=error)
 
 if __name__ == "__main__":
-          gen = ProfileGenerator()
+    gen = ProfileGenerator()
     gen.generate_all()
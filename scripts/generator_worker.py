@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Persistent generator worker with a local job queue.
+
+One process keeps a ProfileGenerator connected to SolidWorks (COM session
+and part template resolved once) and accepts generation jobs from any
+number of clients over a loopback TCP socket. The protocol is one JSON
+object per line in each direction:
+
+    {"op": "submit", "skus": ["00230"], "priority": "interactive", "wait": true}
+    {"op": "status", "job": "j12"}
+    {"op": "cancel", "job": "j12"}
+    {"op": "stats"}
+    {"op": "ping"}
+
+Jobs are served by priority (interactive, normal, bulk) and FIFO within a
+priority. The COM thread works in chunks of at most `chunk_size` SKUs,
+filled from the head jobs of the top priority. Small jobs are batched into
+one generate_all call, and a large bulk job yields to interactive requests
+between chunks.
+
+    python scripts/generator_worker.py serve --out output
+    python scripts/generator_worker.py submit 00230 00600 --priority interactive --wait
+"""
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from profile_records import ProfileRecord, load_catalog, profile_filename
+
+PRIORITIES = {"interactive": 0, "normal": 1, "bulk": 2}
+DEFAULT_PORT = 8766
+MAX_LINE_BYTES = 1 << 20
+
+
+class Job:
+    """One client request: a list of SKUs to (re)generate"""
+
+    def __init__(self, job_id: str, skus: List[str], priority: int):
+        self.id = job_id
+        self.skus = skus
+        self.priority = priority
+        self.status = "queued"
+        self.pending: Deque[str] = deque(skus)
+        self.inflight = 0
+        self.cancelled = False
+        self.files: Dict[str, str] = {}
+        self.failed: Dict[str, str] = {}
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        name = {v: k for k, v in PRIORITIES.items()}.get(self.priority, self.priority)
+        result = {"job": self.id, "status": self.status, "priority": name,
+                  "skus": len(self.skus), "remaining": len(self.pending) + self.inflight,
+                  "files": self.files, "failed": self.failed}
+        if self.finished is not None:
+            result["seconds"] = round(self.finished - self.submitted, 3)
+        return result
+
+
+class JobQueue:
+    """Priority queue of jobs drained in SKU chunks by one generator thread"""
+
+    def __init__(self, generator, data_path: str = "data/profile_data.json",
+                 output_dir: str = "output", chunk_size: int = 25, keep_finished: int = 1000,
+                 on_finished: Optional[Callable[[Job], None]] = None):
+        self.generator = generator
+        self.data_path = data_path
+        self.output_dir = output_dir
+        self.chunk_size = chunk_size
+        self.keep_finished = keep_finished
+        self.on_finished = on_finished
+
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[int, int, Job]] = []
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+        self._catalog_stat: Optional[Tuple[int, int]] = None
+        self._records: Dict[str, ProfileRecord] = {}
+        self.stats = {"batches": 0, "generated": 0, "failed": 0, "busy_seconds": 0.0,
+                      "connected": False, "last_batch": None}
+        self.started = time.time()
+
+    # Client side (any thread)
+
+    def submit(self, skus: List[str], priority: int = PRIORITIES["normal"]) -> Job:
+        with self._cond:
+            job = Job(f"j{next(self._ids)}", list(dict.fromkeys(skus)), priority)
+            self.jobs[job.id] = job
+            heapq.heappush(self._heap, (priority, next(self._seq), job))
+            self._cond.notify()
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Drop the not-yet-started SKUs of a job"""
+        with self._cond:
+            job = self.jobs.get(job_id)
+            if job is None or job.finished is not None:
+                return False
+            job.pending.clear()
+            job.cancelled = True
+            if job.inflight == 0:
+                self._finish(job, "cancelled")
+            return True
+
+    def status(self) -> Dict[str, Any]:
+        with self._cond:
+            queued = [job for _, _, job in self._heap if job.pending]
+            by_priority: Dict[str, int] = {}
+            for job in queued:
+                name = {v: k for k, v in PRIORITIES.items()}.get(job.priority, str(job.priority))
+                by_priority[name] = by_priority.get(name, 0) + len(job.pending)
+            busy = self.stats["busy_seconds"]
+            return {
+                "uptime_seconds": round(time.time() - self.started, 1),
+                "connected": self.stats["connected"],
+                "queued_jobs": len(queued),
+                "queued_skus": sum(len(j.pending) for j in queued),
+                "queued_by_priority": by_priority,
+                "batches": self.stats["batches"],
+                "generated": self.stats["generated"],
+                "failed": self.stats["failed"],
+                "profiles_per_sec": round(self.stats["generated"] / busy, 3) if busy else None,
+                "last_batch": self.stats["last_batch"],
+            }
+
+    # Generator thread
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="generator", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        # Connect up front so the first request does not pay for it; all COM
+        # calls stay on this thread
+        connect = getattr(self.generator, "connect_solidworks", None)
+        if connect is not None:
+            try:
+                self.stats["connected"] = bool(connect())
+            except Exception as e:
+                print(f"SolidWorks not connected yet ({e}); will retry per batch")
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._run_batch(batch)
+
+    def _next_batch(self) -> Optional[List[Tuple[Job, str]]]:
+        """Up to chunk_size (job, sku) pairs from the head jobs of the top priority"""
+        with self._cond:
+            while True:
+                while self._heap and not self._heap[0][2].pending:
+                    heapq.heappop(self._heap)
+                if self._heap:
+                    break
+                if self._stopping:
+                    return None
+                self._cond.wait()
+
+            priority = self._heap[0][0]
+            batch: List[Tuple[Job, str]] = []
+            while self._heap and self._heap[0][0] == priority and len(batch) < self.chunk_size:
+                job = self._heap[0][2]
+                if not job.pending:
+                    heapq.heappop(self._heap)
+                    continue
+                take = min(self.chunk_size - len(batch), len(job.pending))
+                batch.extend((job, job.pending.popleft()) for _ in range(take))
+                job.inflight += take
+                if job.started is None:
+                    job.started = time.time()
+                    job.status = "running"
+                if not job.pending:
+                    heapq.heappop(self._heap)
+            return batch
+
+    def _catalog_records(self) -> Dict[str, ProfileRecord]:
+        """Records by SKU, reloaded whenever the catalog file changes"""
+        st = os.stat(self.data_path)
+        stat = (st.st_mtime_ns, st.st_size)
+        if stat != self._catalog_stat:
+            catalog = load_catalog(self.data_path, strict=False)
+            self._records = {r.sku: r for r in catalog.records()}
+            self._catalog_stat = stat
+        return self._records
+
+    def _run_batch(self, batch: List[Tuple[Job, str]]) -> None:
+        start = time.monotonic()
+        failed: Dict[str, str] = {}
+        profiles: Dict[str, List[ProfileRecord]] = {}
+        try:
+            records = self._catalog_records()
+        except Exception as e:
+            records = {}
+            failed = {sku: f"catalog unreadable: {e}" for _, sku in batch}
+
+        for sku in dict.fromkeys(sku for _, sku in batch):
+            record = records.get(sku)
+            if record is None:
+                failed.setdefault(sku, "unknown SKU")
+            else:
+                profiles.setdefault(record.category, []).append(record)
+
+        if profiles:
+            try:
+                result = self.generator.generate_all(self.output_dir, profiles=profiles)
+            except Exception as e:
+                result = {"created": [], "failed": {r.sku: str(e) for items in profiles.values()
+                                                    for r in items}}
+            if result is None:
+                result = {"created": [], "failed": {r.sku: "SolidWorks unavailable"
+                                                    for items in profiles.values() for r in items}}
+            else:
+                self.stats["connected"] = True
+            failed.update(result["failed"])
+
+        elapsed = time.monotonic() - start
+        with self._cond:
+            for job, sku in batch:
+                job.inflight -= 1
+                if sku in failed:
+                    job.failed[sku] = failed[sku]
+                else:
+                    record = records[sku]
+                    job.files[sku] = os.path.join(self.output_dir, record.category,
+                                                  profile_filename(record.designation))
+                if job.inflight == 0 and not job.pending and job.finished is None:
+                    self._finish(job, "cancelled" if job.cancelled else "done")
+            unique = len({sku for _, sku in batch})
+            self.stats["batches"] += 1
+            self.stats["generated"] += unique - len(failed)
+            self.stats["failed"] += len(failed)
+            self.stats["busy_seconds"] += elapsed
+            self.stats["last_batch"] = {"skus": unique, "jobs": len({j.id for j, _ in batch}),
+                                        "failed": len(failed), "seconds": round(elapsed, 3)}
+
+    def _finish(self, job: Job, status: str) -> None:
+        """Caller holds the lock"""
+        job.status = status
+        job.finished = time.time()
+        done = [j for j in self.jobs.values() if j.finished is not None]
+        for old in done[:max(0, len(done) - self.keep_finished)]:
+            del self.jobs[old.id]
+        if self.on_finished is not None:
+            self.on_finished(job)
+
+
+class WorkerServer:
+    """asyncio JSON-lines front end for a JobQueue"""
+
+    def __init__(self, queue: JobQueue):
+        self.queue = queue
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        queue.on_finished = self._job_finished
+
+    def _job_finished(self, job: Job) -> None:
+        # Called on the generator thread
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._wake, job.id)
+
+    def _wake(self, job_id: str) -> None:
+        for future in self._waiters.pop(job_id, []):
+            if not future.done():
+                future.set_result(None)
+
+    async def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True}
+        if op == "stats":
+            return dict(self.queue.status(), ok=True)
+        if op == "submit":
+            skus = request.get("skus")
+            if not isinstance(skus, list) or not skus:
+                return {"ok": False, "error": "submit needs a non-empty skus list"}
+            priority = request.get("priority", "normal")
+            if priority not in PRIORITIES:
+                return {"ok": False, "error": f"priority must be one of {sorted(PRIORITIES)}"}
+            job = self.queue.submit([str(s) for s in skus], PRIORITIES[priority])
+            if request.get("wait"):
+                # Safe without a lock: a finish on the generator thread only
+                # schedules _wake, which cannot run before this await
+                future = self.loop.create_future()
+                self._waiters.setdefault(job.id, []).append(future)
+                await future
+            return dict(job.to_dict(), ok=True)
+        if op in ("status", "cancel"):
+            job = self.queue.jobs.get(str(request.get("job")))
+            if job is None:
+                return {"ok": False, "error": f"unknown job {request.get('job')}"}
+            ok = self.queue.cancel(job.id) if op == "cancel" else True
+            return dict(job.to_dict(), ok=ok)
+        return {"ok": False, "error": f"unknown op {op!r}"}
+
+    async def serve_connection(self, reader: asyncio.StreamReader,
+                               writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    response = {"ok": False, "error": "request line too long"}
+                    writer.write(json.dumps(response).encode() + b"\n")
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a JSON object")
+                except ValueError as e:
+                    response = {"ok": False, "error": f"invalid request: {e}"}
+                else:
+                    response = await self.dispatch(request)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def run(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.queue.start()
+        server = await asyncio.start_server(self.serve_connection, host, port,
+                                            limit=MAX_LINE_BYTES)
+        print(f"Generator worker listening on {host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.queue.stop()
+
+
+def request(message: Dict[str, Any], host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+            timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Send one request to a running worker and return its reply"""
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall(json.dumps(message).encode() + b"\n")
+        with sock.makefile('rb') as reply:
+            line = reply.readline()
+    if not line:
+        raise ConnectionError("worker closed the connection")
+    return json.loads(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Persistent SolidWorks generator worker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("serve", help="run the worker")
+    p.add_argument("--data", default="data/profile_data.json")
+    p.add_argument("--out", default="output")
+    p.add_argument("--chunk", type=int, default=25, help="max SKUs per generate call")
+
+    p = sub.add_parser("submit", help="queue SKUs for generation")
+    p.add_argument("skus", nargs='+')
+    p.add_argument("--priority", choices=sorted(PRIORITIES), default="normal")
+    p.add_argument("--wait", action="store_true", help="block until the job is done")
+
+    p = sub.add_parser("status", help="show one job")
+    p.add_argument("job")
+
+    p = sub.add_parser("cancel", help="drop the unstarted part of a job")
+    p.add_argument("job")
+
+    sub.add_parser("stats", help="queue depth and throughput")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        from generate_profiles import ProfileGenerator
+
+        queue = JobQueue(ProfileGenerator(args.data), args.data, args.out, args.chunk)
+        try:
+            asyncio.run(WorkerServer(queue).run(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.command == "submit":
+        message = {"op": "submit", "skus": args.skus, "priority": args.priority,
+                   "wait": args.wait}
+    elif args.command in ("status", "cancel"):
+        message = {"op": args.command, "job": args.job}
+    else:
+        message = {"op": "stats"}
+    reply = request(message, args.host, args.port)
+    print(json.dumps(reply, indent=2))
+    return 0 if reply.get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Machine-evaluable geometry rules for derived profile dimensions.
+
+Each entry in the catalog's `geometry_standards` can carry, next to its prose
+description, the categories it covers and the rules that derive columns:
+
+    "hss_tubes": {
+        "applies_to": ["*tube*"],
+        "rules": {"corner_radius_outer_in": "2 * wall_thickness_in",
+                  "corner_radius_inner_in": "wall_thickness_in"}
+    }
+
+A rule is an arithmetic expression over the record's own numeric fields
+(+ - * / ** and min, max, abs, round, sqrt, where with comparisons). Each is
+checked against that whitelist and compiled once, then evaluated over whole
+NumPy columns, so a category is filled in one pass per rule. A rule may use a
+column another rule derives; rules run in dependency order.
+
+A record pins a value with "overrides": {"fillet_radius_in": 0.3125}; the
+override is written in place of the rule result for that row only.
+
+    python scripts/geometry_rules.py data/profile_data.json --check
+    python scripts/geometry_rules.py data/profile_data.json
+"""
+
+import argparse
+import ast
+import json
+import sys
+from fnmatch import fnmatch
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from catalog_diff import write_canonical
+
+
+class RuleError(ValueError):
+    """A rule expression that is malformed or uses something not allowed"""
+
+
+def _round(values, digits=0):
+    return np.round(values, int(digits))
+
+
+FUNCTIONS: Dict[str, Callable] = {
+    'min': np.minimum, 'max': np.maximum, 'abs': np.abs, 'round': _round,
+    'sqrt': np.sqrt, 'where': np.where,
+}
+
+_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name,
+          ast.Constant, ast.Load, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow,
+          ast.USub, ast.UAdd, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq)
+
+
+class Rule:
+    """One compiled expression deriving `field` from the columns it names"""
+
+    __slots__ = ('field', 'expression', 'names', '_code')
+
+    def __init__(self, field: str, expression: str):
+        self.field = field
+        self.expression = expression
+        try:
+            tree = ast.parse(expression, mode='eval')
+        except SyntaxError as e:
+            raise RuleError(f"{field}: {e.msg} in {expression!r}") from None
+
+        names = []
+        for node in ast.walk(tree):
+            if not isinstance(node, _NODES):
+                raise RuleError(f"{field}: {type(node).__name__} not allowed in {expression!r}")
+            if isinstance(node, ast.Constant) and (isinstance(node.value, bool)
+                                                   or not isinstance(node.value, (int, float))):
+                raise RuleError(f"{field}: only numeric constants allowed in {expression!r}")
+            if isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS \
+                        or node.keywords:
+                    raise RuleError(f"{field}: unsupported call in {expression!r}")
+            elif isinstance(node, ast.Name) and node.id not in FUNCTIONS and node.id not in names:
+                names.append(node.id)
+        self.names = tuple(names)
+        self._code = compile(tree, f"<rule {field}>", 'eval')
+
+    def __call__(self, columns: Dict[str, np.ndarray], n: int) -> np.ndarray:
+        scope = {name: columns[name] for name in self.names}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = eval(self._code, {'__builtins__': {}, **FUNCTIONS}, scope)
+        return np.broadcast_to(np.asarray(result, dtype=np.float64), (n,))
+
+    def __repr__(self) -> str:
+        return f"Rule({self.field!r}, {self.expression!r})"
+
+
+class Standard(NamedTuple):
+    name: str
+    applies_to: Sequence[str]
+    rules: List[Rule]
+
+    def covers(self, category: str) -> bool:
+        return any(fnmatch(category, pattern) for pattern in self.applies_to)
+
+
+def compile_standards(geometry_standards: Dict[str, Any]) -> List[Standard]:
+    """Compile every standard that has rules; raises RuleError on the first bad one"""
+    standards = []
+    for name, spec in geometry_standards.items():
+        rules = spec.get('rules') if isinstance(spec, dict) else None
+        if not rules:
+            continue
+        applies_to = spec.get('applies_to') or [name]
+        try:
+            compiled = _dependency_order([Rule(field, expression)
+                                          for field, expression in rules.items()])
+        except RuleError as e:
+            raise RuleError(f"{name}.{e}") from None
+        standards.append(Standard(name, tuple(applies_to), compiled))
+    return standards
+
+
+def _dependency_order(rules: List[Rule]) -> List[Rule]:
+    """Rules ordered so each runs after the rules deriving its inputs
+    (the canonical catalog sorts keys, so file order can't be relied on)"""
+    by_field = {rule.field: rule for rule in rules}
+    ordered: List[Rule] = []
+    state: Dict[str, int] = {}   # 1 visiting, 2 done
+
+    def visit(rule: Rule) -> None:
+        if state.get(rule.field) == 2:
+            return
+        if state.get(rule.field) == 1:
+            raise RuleError(f"{rule.field}: circular rule in {rule.expression!r}")
+        state[rule.field] = 1
+        for name in rule.names:
+            if name in by_field and name != rule.field:
+                visit(by_field[name])
+        state[rule.field] = 2
+        ordered.append(rule)
+
+    for rule in rules:
+        visit(rule)
+    return ordered
+
+
+def _column(items: List[Dict[str, Any]], name: str) -> np.ndarray:
+    values = [item.get(name) for item in items]
+    return np.array([v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan
+                     for v in values], dtype=np.float64)
+
+
+def apply_rules(data: Dict[str, Any],
+                standards: Optional[List[Standard]] = None) -> Dict[str, int]:
+    """Recompute rule-derived columns in place for every covered category.
+    Rows whose inputs are missing keep their value. Returns changed-value
+    counts keyed by 'category.field'."""
+    if standards is None:
+        standards = compile_standards(data.get('geometry_standards', {}))
+    changed: Dict[str, int] = {}
+
+    for category, items in data.get('profiles', {}).items():
+        active = [s for s in standards if s.covers(category)]
+        if not active or not items:
+            continue
+        n = len(items)
+        columns: Dict[str, np.ndarray] = {}
+        overrides = [item.get('overrides') or {} for item in items]
+
+        for standard in active:
+            for rule in standard.rules:
+                for name in rule.names:
+                    if name not in columns:
+                        columns[name] = _column(items, name)
+                values = rule(columns, n).copy()
+                for i, pinned in enumerate(overrides):
+                    if rule.field in pinned:
+                        values[i] = pinned[rule.field]
+                # Later rules see this column as derived
+                columns[rule.field] = values
+
+                count = 0
+                for item, value in zip(items, values.tolist()):
+                    if value != value or item.get(rule.field) == value:
+                        continue
+                    item[rule.field] = value
+                    count += 1
+                if count:
+                    changed[f"{category}.{rule.field}"] = count
+    return changed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute derived geometry from geometry_standards")
+    parser.add_argument("data", nargs='?', default="data/profile_data.json")
+    parser.add_argument("--out", help="write here instead of updating the catalog in place")
+    parser.add_argument("--check", action="store_true",
+                        help="report columns that differ from the rules and exit 1, writing nothing")
+    args = parser.parse_args(argv)
+
+    with open(args.data, 'r') as f:
+        data = json.load(f)
+    try:
+        changed = apply_rules(data)
+    except RuleError as e:
+        print(f"Invalid geometry rule: {e}", file=sys.stderr)
+        return 2
+
+    for key, count in sorted(changed.items()):
+        print(f"  {key}: {count} changed")
+    if args.check:
+        print("Derived geometry matches the rules" if not changed else "Derived geometry is stale")
+        return 1 if changed else 0
+    if changed or args.out:
+        write_canonical(data, args.out or args.data)
+        print(f"Wrote {args.out or args.data}")
+    else:
+        print("Derived geometry already matches the rules")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
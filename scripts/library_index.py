@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Searchable SQLite sidecar index for a generated .sldlfp library.
+
+generate_all keeps library_index.sqlite in the library root up to date as it
+saves each file: one row per file with its relative path, SKU, designation
+(and normalized designation), family, material, key dimensions, price,
+weight, size and SHA-256. Add-ins and PDM scripts query it read-only instead
+of opening documents:
+
+    from library_index import open_library
+    with open_library("S:/weldment-profiles/library") as index:
+        index.find(family="square_tube", material="steel_a500b",
+                   ranges=[("width_in", 2, 4)])
+
+    python scripts/library_index.py find --library output --designation "hss 2x2x1/8"
+    python scripts/library_index.py rebuild --library output
+
+depth_in / width_in / thickness_in are the profile envelope and thinnest wall
+(long/short leg for angles, long/short side for tubes, depth/flange width for
+beams and channels); every family dimension is also stored as JSON in dimensions.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from designation_search import normalize_designation
+from library_publisher import sha256_file
+from profile_records import (AngleRecord, ProfileRecord, RectangularTubeRecord, SquareTubeRecord,
+                             profile_filename)
+
+INDEX_NAME = "library_index.sqlite"
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    path TEXT PRIMARY KEY,
+    sku TEXT NOT NULL,
+    designation TEXT NOT NULL,
+    designation_key TEXT NOT NULL,
+    category TEXT NOT NULL,
+    family TEXT NOT NULL,
+    material TEXT NOT NULL,
+    depth_in REAL,
+    width_in REAL,
+    thickness_in REAL,
+    dimensions TEXT NOT NULL,
+    price REAL,
+    weight_per_ft REAL,
+    size_bytes INTEGER,
+    sha256 TEXT,
+    indexed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS profiles_sku ON profiles (sku);
+CREATE INDEX IF NOT EXISTS profiles_designation ON profiles (designation_key);
+CREATE INDEX IF NOT EXISTS profiles_size ON profiles (family, depth_in, width_in, thickness_in);
+CREATE INDEX IF NOT EXISTS profiles_material ON profiles (material);
+"""
+
+COLUMNS = ('path', 'sku', 'designation', 'designation_key', 'category', 'family', 'material',
+           'depth_in', 'width_in', 'thickness_in', 'dimensions', 'price', 'weight_per_ft',
+           'size_bytes', 'sha256', 'indexed_at')
+RANGE_COLUMNS = ('depth_in', 'width_in', 'thickness_in', 'price', 'weight_per_ft')
+
+
+def key_dimensions(record: ProfileRecord) -> Tuple[float, float, float]:
+    """(depth, width, thinnest wall) in inches"""
+    if isinstance(record, AngleRecord):
+        return (max(record.leg_a_in, record.leg_b_in), min(record.leg_a_in, record.leg_b_in),
+                record.thickness_in)
+    if isinstance(record, (SquareTubeRecord, RectangularTubeRecord)):
+        return (max(record.outer_width_in, record.outer_height_in),
+                min(record.outer_width_in, record.outer_height_in), record.wall_thickness_in)
+    return (record.depth_in, record.flange_width_in,
+            min(record.web_thickness_in, record.flange_thickness_in))
+
+
+def _rel(rel_path: str) -> str:
+    return rel_path.replace(os.sep, '/')
+
+
+class LibraryIndex:
+    """One library's index; writable unless opened with readonly=True"""
+
+    def __init__(self, path: str, readonly: bool = False):
+        self.path = path
+        if readonly:
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+            self.db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            # Rollback journal rather than WAL: the file lives on shares too
+            self.db = sqlite3.connect(path)
+            self.db.executescript(SCHEMA)
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.db.commit()
+        self.db.row_factory = sqlite3.Row
+
+    def __enter__(self) -> "LibraryIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    # Writing
+
+    def record(self, rel_path: str, profile: ProfileRecord, file_path: Optional[str] = None) -> None:
+        """Insert or replace the row for a saved file; hashes file_path if given"""
+        size = checksum = None
+        if file_path is not None:
+            size, checksum = os.path.getsize(file_path), sha256_file(file_path)
+        depth, width, thickness = key_dimensions(profile)
+        dims = {name: getattr(profile, name) for name, _ in profile.DIMENSIONS}
+        row = (_rel(rel_path), profile.sku, profile.designation,
+               normalize_designation(profile.designation) or profile.designation,
+               profile.category, profile.FAMILY, profile.material, depth, width, thickness,
+               json.dumps(dims, sort_keys=True), profile.price, profile.weight_per_ft,
+               size, checksum, time.strftime("%Y-%m-%dT%H:%M:%S"))
+        with self.db:
+            self.db.execute(f"INSERT OR REPLACE INTO profiles ({', '.join(COLUMNS)}) "
+                            f"VALUES ({', '.join('?' * len(COLUMNS))})", row)
+
+    def remove(self, rel_paths: Iterable[str]) -> int:
+        with self.db:
+            cur = self.db.executemany("DELETE FROM profiles WHERE path = ?",
+                                      [(_rel(p),) for p in rel_paths])
+        return cur.rowcount
+
+    # Querying
+
+    def find(self, sku: Optional[str] = None, designation: Optional[str] = None,
+             family: Optional[str] = None, material: Optional[str] = None,
+             category: Optional[str] = None,
+             ranges: Sequence[Tuple[str, Optional[float], Optional[float]]] = (),
+             limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Rows matching every given filter, smallest profiles first.
+        designation is normalized, so 'w8 31' finds W8x31."""
+        where: List[str] = []
+        params: List[Any] = []
+        for column, value in (('sku', sku), ('family', family), ('material', material),
+                              ('category', category)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if designation is not None:
+            where.append("designation_key = ?")
+            params.append(normalize_designation(designation) or designation)
+        for column, lo, hi in ranges:
+            if column not in RANGE_COLUMNS:
+                raise ValueError(f"cannot filter on {column}; use one of {', '.join(RANGE_COLUMNS)}")
+            if lo is not None:
+                where.append(f"{column} >= ?")
+                params.append(lo)
+            if hi is not None:
+                where.append(f"{column} <= ?")
+                params.append(hi)
+
+        sql = "SELECT * FROM profiles"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY family, depth_in, width_in, thickness_in, material, sku"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [self._row(r) for r in self.db.execute(sql, params)]
+
+    def get(self, sku: str) -> Optional[Dict[str, Any]]:
+        rows = self.find(sku=sku, limit=1)
+        return rows[0] if rows else None
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        out = dict(row)
+        out['dimensions'] = json.loads(out['dimensions'])
+        return out
+
+
+def open_library(library_root: str) -> LibraryIndex:
+    """Read-only index of a published or local library folder"""
+    return LibraryIndex(os.path.join(library_root, INDEX_NAME), readonly=True)
+
+
+def open_for_run(output_dir: str, publisher=None) -> LibraryIndex:
+    """Writable index for a generation run. When publishing, the index is built
+    in scratch, seeded from the live library's so a subset run keeps the rest."""
+    path = os.path.join(output_dir, INDEX_NAME)
+    if publisher is not None and publisher.merge_live and not os.path.exists(path):
+        live = os.path.join(publisher.live_dir, INDEX_NAME)
+        if os.path.exists(live):
+            src = sqlite3.connect(f"file:{live}?mode=ro", uri=True)
+            dest = sqlite3.connect(path)
+            try:
+                src.backup(dest)
+            finally:
+                src.close()
+                dest.close()
+    return LibraryIndex(path)
+
+
+def finish_run(index: LibraryIndex, publisher=None) -> None:
+    """Close the run's index; when publishing, drop removed files and queue it"""
+    if publisher is not None:
+        index.remove(publisher.removed)
+    index.close()
+    if publisher is not None:
+        publisher.submit(index.path, INDEX_NAME)
+
+
+def rebuild(library_root: str, catalog) -> Dict[str, int]:
+    """Re-index every catalog record whose file exists under library_root and
+    drop rows for files that are gone"""
+    seen = set()
+    with LibraryIndex(os.path.join(library_root, INDEX_NAME)) as index:
+        for record in catalog.records():
+            rel_path = f"{record.category}/{profile_filename(record.designation)}"
+            file_path = os.path.join(library_root, record.category,
+                                     profile_filename(record.designation))
+            if os.path.exists(file_path):
+                index.record(rel_path, record, file_path)
+                seen.add(rel_path)
+        stale = [row[0] for row in index.db.execute("SELECT path FROM profiles")
+                 if row[0] not in seen]
+        index.remove(stale)
+        return {"indexed": len(seen), "removed": len(stale)}
+
+
+def main(argv=None):
+    from profile_cli import parse_range
+
+    parser = argparse.ArgumentParser(description="Query or rebuild a library's sidecar index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("find", help="print matching library files as JSON lines")
+    p.add_argument("--library", default="output", help="library root folder")
+    p.add_argument("--sku")
+    p.add_argument("--designation")
+    p.add_argument("--family")
+    p.add_argument("--material")
+    p.add_argument("--category")
+    p.add_argument("--range", action="append", type=parse_range, metavar="FIELD=LO:HI",
+                   help=f"one of {', '.join(RANGE_COLUMNS)}")
+    p.add_argument("--limit", type=int)
+    p = sub.add_parser("rebuild", help="index the existing files of a library from the catalog")
+    p.add_argument("--library", default="output", help="library root folder")
+    p.add_argument("--data", default="data/profile_data.json")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        from profile_records import load_catalog
+
+        counts = rebuild(args.library, load_catalog(args.data, strict=False))
+        print(f"Indexed {counts['indexed']} files, dropped {counts['removed']} stale rows")
+        return 0
+
+    try:
+        index = open_library(args.library)
+    except FileNotFoundError as e:
+        print(f"No library index at {e}")
+        return 1
+    with index:
+        try:
+            rows = index.find(args.sku, args.designation, args.family, args.material,
+                              args.category, args.range or (), args.limit)
+        except ValueError as e:
+            parser.error(str(e))
+    for row in rows:
+        print(json.dumps(row))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
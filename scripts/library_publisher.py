@@ -0,0 +1,252 @@
+"""
+Pipelined publishing of generated profiles to the network library share.
+
+SolidWorks saves each .sldlfp to fast local scratch; a background thread pool
+then verifies, checksums and copies it into a staging folder on the share
+(copy to *.part, check size and SHA-256, atomic rename). Only when every file
+has arrived does publish() swap the staging folder in as the live library,
+so readers never see a half-written library. Files of the live library that
+the run did not regenerate are carried into staging as hard links (a plain
+copy where the share does not support them), so a subset run still moves
+only its own files' data; a share without hard links pays for a full copy,
+and subset runs there should use incremental=True.
+
+With incremental=True there is no staging folder: each verified file is
+renamed straight into the live library, publish() deletes the removed files
+and rewrites manifest.json, and nothing else on the share is touched. Every
+file still changes atomically, but not all at once; watch mode uses this so a
+one-SKU edit does not copy the whole library.
+
+    publisher = LibraryPublisher("S:/weldment-profiles")
+    gen.generate_all(publisher=publisher)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+
+COPY_BUFFER = 1 << 20
+
+
+class PublishError(RuntimeError):
+    """Raised by publish() when any file failed to reach the share"""
+
+    def __init__(self, failures: Dict[str, str]):
+        self.failures = failures
+        lines = "\n  ".join(f"{path}: {err}" for path, err in sorted(failures.items()))
+        super().__init__(f"{len(failures)} files failed to publish:\n  {lines}")
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(COPY_BUFFER), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def copy_verified(src: str, dest: str) -> Dict[str, object]:
+    """Copy src to dest via dest.part, hashing on the way, then re-read the
+    copy and compare before renaming it into place"""
+    size = os.path.getsize(src)
+    if size == 0:
+        raise IOError("scratch file is empty")
+
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    part = dest + '.part'
+    digest = hashlib.sha256()
+    with open(src, 'rb') as fin, open(part, 'wb') as fout:
+        for block in iter(lambda: fin.read(COPY_BUFFER), b''):
+            digest.update(block)
+            fout.write(block)
+        fout.flush()
+        os.fsync(fout.fileno())
+    checksum = digest.hexdigest()
+
+    if os.path.getsize(part) != size or sha256_file(part) != checksum:
+        os.remove(part)
+        raise IOError("copy on share does not match scratch file")
+    os.replace(part, dest)
+    return {"size": size, "sha256": checksum}
+
+
+class LibraryPublisher:
+    """Background copier from local scratch into a staged library on the share"""
+
+    def __init__(self, share_root: str, library_name: str = "library",
+                 scratch_dir: Optional[str] = None, workers: int = 4,
+                 max_pending: int = 32, keep_scratch: bool = False,
+                 merge_live: bool = True, incremental: bool = False):
+        """merge_live carries files that were not regenerated over from the
+        current live library, so publishing a subset does not drop the rest.
+        incremental replaces files in the live library one by one instead."""
+        self.share_root = share_root
+        self.merge_live = merge_live or incremental
+        self.incremental = incremental
+        self.live_dir = os.path.join(share_root, library_name)
+        if incremental:
+            self.staging_dir = self.live_dir
+        else:
+            self.staging_dir = os.path.join(
+                share_root, f".{library_name}.staging-{os.getpid()}-{int(time.time())}")
+        self.scratch_dir = scratch_dir or tempfile.mkdtemp(prefix="weldment-scratch-")
+        self.keep_scratch = keep_scratch
+
+        os.makedirs(self.staging_dir, exist_ok=incremental)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="publish")
+        # Bounds the number of saved-but-not-yet-copied files so a slow share
+        # throttles generation instead of filling scratch
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._futures: List[Future] = []
+        self.manifest: Dict[str, Dict[str, object]] = {}
+        self.failures: Dict[str, str] = {}
+        self.removed: Set[str] = set()
+        self.published = False
+
+    def scratch_path(self, rel_path: str) -> str:
+        path = os.path.join(self.scratch_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def submit(self, local_path: str, rel_path: str, keep: bool = False) -> Future:
+        """Queue a saved scratch file for copying to rel_path in the library.
+        Blocks while max_pending copies are already outstanding. With keep=True
+        the scratch file stays until publish(), e.g. as a source for clones."""
+        self._slots.acquire()
+        try:
+            future = self._pool.submit(self._transfer, local_path, rel_path, keep)
+        except BaseException:
+            self._slots.release()
+            raise
+        self._futures.append(future)
+        return future
+
+    def _transfer(self, local_path: str, rel_path: str, keep: bool = False) -> None:
+        try:
+            info = copy_verified(local_path, os.path.join(self.staging_dir, rel_path))
+            with self._lock:
+                self.manifest[rel_path.replace(os.sep, '/')] = info
+            if not (self.keep_scratch or keep):
+                os.remove(local_path)
+        except Exception as e:
+            with self._lock:
+                self.failures[rel_path] = str(e)
+        finally:
+            self._slots.release()
+
+    def remove(self, rel_path: str) -> None:
+        """Leave rel_path out of the published library even if it is live now"""
+        self.removed.add(rel_path.replace(os.sep, '/'))
+
+    @property
+    def pending(self) -> int:
+        return sum(1 for f in self._futures if not f.done())
+
+    def wait(self) -> None:
+        for future in self._futures:
+            future.result()
+
+    def publish(self) -> str:
+        """Wait for all copies, then atomically swap staging in as the live library.
+        On any failure the live library is left untouched and PublishError is raised."""
+        self.wait()
+        self._pool.shutdown()
+        if self.failures:
+            raise PublishError(self.failures)
+        if self.incremental:
+            return self._publish_incremental()
+        if self.merge_live and os.path.isdir(self.live_dir):
+            self._carry_over_live()
+
+        with open(os.path.join(self.staging_dir, "manifest.json"), 'w') as f:
+            json.dump({"published": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "files": dict(sorted(self.manifest.items()))}, f, indent=2)
+
+        retired = None
+        if os.path.exists(self.live_dir):
+            retired = f"{self.live_dir}.old-{int(time.time())}"
+            os.replace(self.live_dir, retired)
+        try:
+            os.replace(self.staging_dir, self.live_dir)
+        except OSError:
+            if retired:
+                os.replace(retired, self.live_dir)
+            raise
+        if retired:
+            shutil.rmtree(retired, ignore_errors=True)
+        if not self.keep_scratch:
+            shutil.rmtree(self.scratch_dir, ignore_errors=True)
+        self.published = True
+        return self.live_dir
+
+    def _publish_incremental(self) -> str:
+        """Drop removed files from the live library and merge the manifest"""
+        manifest_path = os.path.join(self.live_dir, "manifest.json")
+        files = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                files = json.load(f).get("files", {})
+        for rel_path in self.removed:
+            if rel_path in self.manifest:
+                continue
+            try:
+                os.remove(os.path.join(self.live_dir, rel_path))
+            except FileNotFoundError:
+                pass
+            files.pop(rel_path, None)
+        files.update(self.manifest)
+
+        tmp = manifest_path + '.part'
+        with open(tmp, 'w') as f:
+            json.dump({"published": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "files": dict(sorted(files.items()))}, f, indent=2)
+        os.replace(tmp, manifest_path)
+        if not self.keep_scratch:
+            shutil.rmtree(self.scratch_dir, ignore_errors=True)
+        self.published = True
+        return self.live_dir
+
+    def _carry_over_live(self) -> None:
+        """Link (or copy) live files that this run did not produce into staging"""
+        previous = {}
+        manifest_path = os.path.join(self.live_dir, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                previous = json.load(f).get("files", {})
+
+        for folder, _, files in os.walk(self.live_dir):
+            for name in files:
+                src = os.path.join(folder, name)
+                rel_path = os.path.relpath(src, self.live_dir).replace(os.sep, '/')
+                if (rel_path == "manifest.json" or rel_path in self.manifest
+                        or rel_path in self.removed):
+                    continue
+                dest = os.path.join(self.staging_dir, rel_path)
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                try:
+                    # Live files are only ever replaced by rename, never
+                    # rewritten in place, so sharing the data is safe
+                    os.link(src, dest)
+                except OSError:
+                    shutil.copy2(src, dest)
+                self.manifest[rel_path] = previous.get(rel_path) or {
+                    "size": os.path.getsize(dest), "sha256": sha256_file(dest)}
+
+    def abort(self) -> None:
+        """Stop copying and discard the staging and scratch folders; live
+        library untouched. Incremental publishers stop copying; files already
+        copied stay live. Does nothing after a successful publish()."""
+        if self.published:
+            return
+        self._pool.shutdown(cancel_futures=True)
+        if not self.incremental:
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+        if not self.keep_scratch:
+            shutil.rmtree(self.scratch_dir, ignore_errors=True)
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Columnar price history across catalog scrapes.
+
+Each scrape is appended as one compressed chunk holding four integer columns
+(SKU id, price in cents, cost_per_lb in cents, weight_per_ft in thousandths),
+sorted by SKU id. A small manifest lists the chunks by date together with
+per-category aggregates, so:
+
+  * price of SKU X on date D   -> bisect the manifest, decode one chunk
+  * per-category trend         -> manifest only, no chunk reads
+  * largest movers D1 -> D2    -> decode two chunks and align SKU ids
+
+Layout of the store directory:
+    manifest.json     chunk list + per-category aggregates
+    skus.json         SKU dictionary (id = position) and SKU categories
+    chunks/<date>.phc
+"""
+
+import argparse
+import bisect
+import datetime
+import json
+import os
+import struct
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from profile_records import Catalog, load_catalog
+
+CHUNK_MAGIC = b'PHC1'
+# Column name, integer scale applied before storage
+COLUMNS = (('price', 100), ('cost_per_lb', 100), ('weight_per_ft', 1000))
+
+
+def _write_atomic(path: str, payload: bytes) -> None:
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+
+def iso_date(value) -> str:
+    """YYYY-MM-DD for a date, datetime or ISO 8601 string, the form the
+    manifest stores and bisects on"""
+    if isinstance(value, datetime.datetime):
+        return value.date().isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    text = str(value).strip()
+    try:
+        return datetime.date.fromisoformat(text).isoformat()
+    except ValueError:
+        return datetime.datetime.fromisoformat(text).date().isoformat()
+
+
+def encode_chunk(sku_ids: np.ndarray, columns: Dict[str, np.ndarray]) -> bytes:
+    """Serialise one snapshot; sku_ids must be sorted ascending"""
+    parts = [np.diff(sku_ids, prepend=0).astype('<u4')]
+    for name, scale in COLUMNS:
+        parts.append(np.rint(columns[name] * scale).astype('<i4'))
+    out = [CHUNK_MAGIC, struct.pack('<I', len(sku_ids))]
+    for part in parts:
+        packed = zlib.compress(part.tobytes(), 9)
+        out.append(struct.pack('<I', len(packed)))
+        out.append(packed)
+    return b''.join(out)
+
+
+def decode_chunk(payload: bytes) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Inverse of encode_chunk: (sku_ids, {column: float array})"""
+    if payload[:4] != CHUNK_MAGIC:
+        raise ValueError("not a price history chunk")
+    (rows,) = struct.unpack_from('<I', payload, 4)
+    offset = 8
+    arrays = []
+    for dtype in ('<u4',) + ('<i4',) * len(COLUMNS):
+        (size,) = struct.unpack_from('<I', payload, offset)
+        offset += 4
+        arrays.append(np.frombuffer(zlib.decompress(payload[offset:offset + size]), dtype=dtype))
+        offset += size
+    sku_ids = np.cumsum(arrays[0], dtype=np.int64)
+    columns = {name: arrays[i + 1] / scale for i, (name, scale) in enumerate(COLUMNS)}
+    if len(sku_ids) != rows:
+        raise ValueError("chunk row count mismatch")
+    return sku_ids, columns
+
+
+class PriceHistory:
+    """Append-only store of catalog price snapshots"""
+
+    def __init__(self, root: str = "data/price_history", cache_chunks: int = 8):
+        self.root = root
+        # Created by the first append_snapshot, so queries never write
+        self.chunk_dir = os.path.join(root, 'chunks')
+        self._cache: "OrderedDict[str, Tuple[np.ndarray, Dict[str, np.ndarray]]]" = OrderedDict()
+        self._cache_chunks = cache_chunks
+
+        self.manifest = self._read_json('manifest.json', {"chunks": []})
+        dictionary = self._read_json('skus.json', {"skus": [], "categories": []})
+        self.skus: List[str] = dictionary['skus']
+        self.sku_categories: List[str] = dictionary['categories']
+        self.sku_ids: Dict[str, int] = {sku: i for i, sku in enumerate(self.skus)}
+        self.dates: List[str] = [c['date'] for c in self.manifest['chunks']]
+
+    def _read_json(self, name: str, default):
+        path = os.path.join(self.root, name)
+        if not os.path.exists(path):
+            return default
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _write_json(self, name: str, value) -> None:
+        _write_atomic(os.path.join(self.root, name),
+                      json.dumps(value, separators=(',', ':')).encode())
+
+    # Writing
+
+    def append_snapshot(self, date: str, catalog: Catalog, overwrite: bool = False) -> Dict:
+        """Store the catalog's prices as the snapshot for date (YYYY-MM-DD)"""
+        date = iso_date(date)
+        if date in self.dates and not overwrite:
+            raise ValueError(f"snapshot for {date} already stored (use overwrite)")
+
+        rows = []
+        for record in catalog.records():
+            sku_id = self.sku_ids.get(record.sku)
+            if sku_id is None:
+                sku_id = self.sku_ids[record.sku] = len(self.skus)
+                self.skus.append(record.sku)
+                self.sku_categories.append(record.category)
+            rows.append((sku_id, record.price, record.cost_per_lb, record.weight_per_ft))
+        rows.sort()
+        table = np.array(rows, dtype=np.float64).reshape(-1, 1 + len(COLUMNS))
+        sku_ids = table[:, 0].astype(np.int64)
+        columns = {name: table[:, i + 1] for i, (name, _) in enumerate(COLUMNS)}
+
+        families: Dict[str, List[float]] = {}
+        for sku_id, price, cost in zip(sku_ids, columns['price'], columns['cost_per_lb']):
+            agg = families.setdefault(self.sku_categories[sku_id], [0, 0.0, 0.0])
+            agg[0] += 1
+            agg[1] += float(price)
+            agg[2] += float(cost)
+
+        payload = encode_chunk(sku_ids, columns)
+        filename = f"{date}.phc"
+        os.makedirs(self.chunk_dir, exist_ok=True)
+        # Dictionary first: a chunk must never reference an unknown SKU id
+        self._write_json('skus.json', {"skus": self.skus, "categories": self.sku_categories})
+        _write_atomic(os.path.join(self.chunk_dir, filename), payload)
+
+        entry = {"date": date, "file": filename, "rows": len(sku_ids), "bytes": len(payload),
+                 "families": {k: [v[0], round(v[1], 2), round(v[2], 4)]
+                              for k, v in sorted(families.items())}}
+        chunks = [c for c in self.manifest['chunks'] if c['date'] != date]
+        chunks.append(entry)
+        chunks.sort(key=lambda c: c['date'])
+        self.manifest['chunks'] = chunks
+        self.dates = [c['date'] for c in chunks]
+        self._write_json('manifest.json', self.manifest)
+        self._cache.pop(filename, None)
+        return entry
+
+    # Reading
+
+    def _chunk(self, pos: int) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        filename = self.manifest['chunks'][pos]['file']
+        cached = self._cache.get(filename)
+        if cached is not None:
+            self._cache.move_to_end(filename)
+            return cached
+        with open(os.path.join(self.chunk_dir, filename), 'rb') as f:
+            decoded = decode_chunk(f.read())
+        self._cache[filename] = decoded
+        if len(self._cache) > self._cache_chunks:
+            self._cache.popitem(last=False)
+        return decoded
+
+    def _snapshot_at(self, date: str) -> Optional[int]:
+        """Position of the latest snapshot on or before date"""
+        pos = bisect.bisect_right(self.dates, iso_date(date)) - 1
+        return pos if pos >= 0 else None
+
+    def price_on(self, sku: str, date: str) -> Optional[Dict]:
+        """Values in effect for sku on date, from the latest scrape on or before it"""
+        sku_id = self.sku_ids.get(sku)
+        pos = self._snapshot_at(date)
+        if sku_id is None or pos is None:
+            return None
+        sku_ids, columns = self._chunk(pos)
+        i = int(np.searchsorted(sku_ids, sku_id))
+        if i == len(sku_ids) or sku_ids[i] != sku_id:
+            return None
+        result = {"sku": sku, "as_of": self.dates[pos]}
+        result.update({name: float(columns[name][i]) for name, _ in COLUMNS})
+        return result
+
+    def family_trend(self, category: str, start: Optional[str] = None,
+                     end: Optional[str] = None) -> List[Dict]:
+        """Average price and cost_per_lb per snapshot for one category"""
+        lo = bisect.bisect_left(self.dates, iso_date(start)) if start else 0
+        hi = bisect.bisect_right(self.dates, iso_date(end)) if end else len(self.dates)
+        trend = []
+        for chunk in self.manifest['chunks'][lo:hi]:
+            agg = chunk['families'].get(category)
+            if not agg or not agg[0]:
+                continue
+            trend.append({"date": chunk['date'], "count": agg[0],
+                          "avg_price": round(agg[1] / agg[0], 2),
+                          "avg_cost_per_lb": round(agg[2] / agg[0], 4)})
+        return trend
+
+    def largest_movers(self, start: str, end: str, top: int = 20,
+                       by: str = 'pct', category: Optional[str] = None) -> List[Dict]:
+        """SKUs with the largest absolute price change between two dates.
+        by='pct' ranks by percent change, by='abs' by dollar change."""
+        a, b = self._snapshot_at(start), self._snapshot_at(end)
+        if a is None or b is None:
+            return []
+        ids_a, cols_a = self._chunk(a)
+        ids_b, cols_b = self._chunk(b)
+        common, ia, ib = np.intersect1d(ids_a, ids_b, assume_unique=True, return_indices=True)
+        if category is not None:
+            keep = np.array([self.sku_categories[i] == category for i in common], dtype=bool)
+            common, ia, ib = common[keep], ia[keep], ib[keep]
+
+        before = cols_a['price'][ia]
+        after = cols_b['price'][ib]
+        delta = after - before
+        pct = np.divide(delta, before, out=np.zeros_like(delta), where=before != 0) * 100
+        score = np.abs(pct if by == 'pct' else delta)
+        order = np.argsort(-score, kind='stable')[:top]
+        return [{"sku": self.skus[common[i]], "category": self.sku_categories[common[i]],
+                 "from": float(before[i]), "to": float(after[i]),
+                 "change": round(float(delta[i]), 2), "pct": round(float(pct[i]), 2)}
+                for i in order]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Catalog price history store")
+    parser.add_argument("--store", default="data/price_history")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("append", help="store a catalog snapshot")
+    p.add_argument("--data", default="data/profile_data.json")
+    p.add_argument("--date", help="snapshot date (default: metadata.scrape_date)")
+    p.add_argument("--overwrite", action="store_true")
+
+    p = sub.add_parser("price", help="price of a SKU on a date")
+    p.add_argument("sku")
+    p.add_argument("date")
+
+    p = sub.add_parser("trend", help="average price per snapshot for a category")
+    p.add_argument("category")
+    p.add_argument("--start")
+    p.add_argument("--end")
+
+    p = sub.add_parser("movers", help="largest price changes between two dates")
+    p.add_argument("start")
+    p.add_argument("end")
+    p.add_argument("--top", type=int, default=20)
+    p.add_argument("--by", choices=("pct", "abs"), default="pct")
+    p.add_argument("--category")
+
+    args = parser.parse_args(argv)
+    history = PriceHistory(args.store)
+
+    if args.command == "append":
+        catalog = load_catalog(args.data)
+        date = args.date or catalog.metadata.get('scrape_date')
+        entry = history.append_snapshot(date, catalog, args.overwrite)
+        print(f"Stored {entry['rows']} prices for {entry['date']} ({entry['bytes']} bytes)")
+    elif args.command == "price":
+        print(json.dumps(history.price_on(args.sku, args.date)))
+    elif args.command == "trend":
+        for point in history.family_trend(args.category, args.start, args.end):
+            print(json.dumps(point))
+    elif args.command == "movers":
+        for mover in history.largest_movers(args.start, args.end, args.top, args.by,
+                                            args.category):
+            print(json.dumps(mover))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Price and weight what-if engine.
+Recomputes weight_per_ft, stick price and cost_per_lb for the whole catalog
+from the `materials` densities, a $/lb rate table and stock lengths, and
+evaluates many market-index scenarios at once with NumPy broadcasting.
+
+    engine = PricingEngine(load_catalog())
+    prices = engine.price_matrix(np.linspace(0.8, 1.3, 1000), group='steel')
+    # prices.shape == (1000, 558)
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from profile_records import Catalog, load_catalog
+
+# $/lb by category, calibrated so recompute() at index 1.0 reproduces the
+# catalog prices (check with --check). Steel and stainless angles are
+# priced in the catalog at 0.6x the nominal $1.30 and $4.00:
+# generate_comprehensive_profiles.py multiplies their weight by 12 ft, not by
+# the 20 ft stick length.
+DEFAULT_RATES_PER_LB = {
+    "steel_equal_leg_angle": 0.78,
+    "steel_unequal_leg_angle": 0.78,
+    "steel_i_beam": 1.35,
+    "steel_wide_flange": 1.40,
+    "steel_c_channel": 1.35,
+    "steel_square_tube": 1.40,
+    "steel_rectangular_tube": 1.40,
+    "aluminum_angle_6061_t6": 4.50,
+    "aluminum_square_tube_6063_t52": 5.00,
+    "stainless_angle_304": 2.40,
+    "stainless_square_tube_304": 4.50,
+}
+
+# Relative price difference tolerated by calibration_errors()
+CALIBRATION_TOLERANCE = 0.01
+
+# Market index groups, matched against the material key prefix
+MATERIAL_GROUPS = ("steel", "aluminum", "stainless")
+
+
+def material_group(material: str) -> str:
+    for group in MATERIAL_GROUPS:
+        if material.startswith(group):
+            return group
+    raise ValueError(f"material {material!r} is not in any index group {MATERIAL_GROUPS}")
+
+
+class PricingEngine:
+    """Column arrays for the catalog plus vectorised price/weight formulas"""
+
+    def __init__(self, catalog: Catalog,
+                 rates_per_lb: Optional[Mapping[str, float]] = None,
+                 stock_lengths_in: Optional[Mapping[str, float]] = None):
+        """rates_per_lb and stock_lengths_in are keyed by category or material
+        (category wins); records fall back to DEFAULT_RATES_PER_LB and their
+        own length_inches."""
+        rates = dict(DEFAULT_RATES_PER_LB)
+        rates.update(rates_per_lb or {})
+        lengths = dict(stock_lengths_in or {})
+
+        records = catalog.records()
+        self.skus: List[str] = [r.sku for r in records]
+        self.categories: List[str] = [r.category for r in records]
+        self.sku_index: Dict[str, int] = {sku: i for i, sku in enumerate(self.skus)}
+
+        missing = sorted({r.category for r in records
+                          if r.category not in rates and r.material not in rates})
+        if missing:
+            raise KeyError(f"no $/lb rate for categories {missing}")
+
+        self.catalog_price = np.array([r.price for r in records], dtype=np.float64)
+        self.area_in2 = np.array([r.area_in2 for r in records], dtype=np.float64)
+        self.density = np.array([catalog.materials[r.material]['density_lb_in3']
+                                 for r in records], dtype=np.float64)
+        self.length_in = np.array([lengths.get(r.category, lengths.get(r.material, r.length_inches))
+                                   for r in records], dtype=np.float64)
+        self.rate = np.array([rates.get(r.category, rates.get(r.material))
+                              for r in records], dtype=np.float64)
+        self.group_index = np.array([MATERIAL_GROUPS.index(material_group(r.material))
+                                     for r in records], dtype=np.intp)
+
+    def __len__(self) -> int:
+        return len(self.skus)
+
+    # Base (index = 1.0) values
+
+    def weight_per_ft(self) -> np.ndarray:
+        """lb/ft = in^2 * lb/in^3 * 12 in/ft"""
+        return self.area_in2 * self.density * 12.0
+
+    def stick_weight(self) -> np.ndarray:
+        return self.weight_per_ft() * (self.length_in / 12.0)
+
+    def base_prices(self) -> np.ndarray:
+        return self.stick_weight() * self.rate
+
+    def recompute(self) -> Dict[str, Dict[str, float]]:
+        """{sku: {weight_per_ft, price, cost_per_lb}} at today's rates"""
+        wpf = self.weight_per_ft()
+        price = self.base_prices()
+        cost = np.divide(price, self.stick_weight(), out=np.zeros_like(price),
+                         where=self.stick_weight() > 0)
+        return {sku: {"weight_per_ft": round(float(w), 3), "price": round(float(p), 2),
+                      "cost_per_lb": round(float(c), 2)}
+                for sku, w, p, c in zip(self.skus, wpf, price, cost)}
+
+    def calibration_errors(self, tolerance: float = CALIBRATION_TOLERANCE
+                           ) -> Dict[str, Dict[str, float]]:
+        """SKUs whose base price differs from the catalog price by more than
+        tolerance (relative): {sku: {catalog, engine}}"""
+        price = self.base_prices()
+        off = np.abs(price - self.catalog_price) > tolerance * self.catalog_price
+        return {self.skus[i]: {"catalog": float(self.catalog_price[i]),
+                               "engine": round(float(price[i]), 2)}
+                for i in np.flatnonzero(off)}
+
+    # Scenarios
+
+    def index_factors(self, index: np.ndarray, group: Optional[str] = None,
+                      groups: Sequence[str] = MATERIAL_GROUPS) -> np.ndarray:
+        """Expand scenario indices to a (S, len(MATERIAL_GROUPS)) factor table.
+        index is (S,) for a single group, or (S, len(groups)) for several."""
+        index = np.asarray(index, dtype=np.float64)
+        if group is not None:
+            groups = (group,)
+            index = index.reshape(-1, 1)
+        if index.ndim != 2 or index.shape[1] != len(groups):
+            raise ValueError(f"index shape {index.shape} does not match groups {tuple(groups)}")
+        factors = np.ones((index.shape[0], len(MATERIAL_GROUPS)))
+        factors[:, [MATERIAL_GROUPS.index(g) for g in groups]] = index
+        return factors
+
+    def price_matrix(self, index: np.ndarray, group: Optional[str] = None,
+                     groups: Sequence[str] = MATERIAL_GROUPS) -> np.ndarray:
+        """(S, N) stick prices: base price broadcast against per-scenario index
+        factors for each record's material group"""
+        factors = self.index_factors(index, group, groups)
+        return self.base_prices()[np.newaxis, :] * factors[:, self.group_index]
+
+    def bom_costs(self, quantities: Mapping[str, float], index: np.ndarray,
+                  group: Optional[str] = None,
+                  groups: Sequence[str] = MATERIAL_GROUPS) -> np.ndarray:
+        """(S,) total cost of a bill of materials {sku: sticks} per scenario"""
+        qty = np.zeros(len(self))
+        for sku, n in quantities.items():
+            qty[self.sku_index[sku]] += n
+        factors = self.index_factors(index, group, groups)
+        # Per-group subtotal at base price, then one (S, G) @ (G,) product
+        subtotal = np.bincount(self.group_index, weights=self.base_prices() * qty,
+                               minlength=len(MATERIAL_GROUPS))
+        return factors @ subtotal
+
+
+def parse_sweep(text: str) -> np.ndarray:
+    """'0.8:1.3:1000' -> linspace; '0.9,1.0,1.1' -> explicit values"""
+    if ':' in text:
+        lo, hi, n = text.split(':')
+        return np.linspace(float(lo), float(hi), int(n))
+    return np.array([float(v) for v in text.split(',')])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep market price scenarios over the catalog")
+    parser.add_argument("--data", default="data/profile_data.json")
+    parser.add_argument("--rates", help="JSON {category or material: $/lb} overrides")
+    parser.add_argument("--lengths", help="JSON {category or material: stock length in} overrides")
+    parser.add_argument("--group", default="steel", choices=MATERIAL_GROUPS)
+    parser.add_argument("--index", default="0.8:1.3:1000", type=parse_sweep,
+                        help="LO:HI:COUNT or comma separated index values")
+    parser.add_argument("--bom", help="JSON {sku: sticks} to total per scenario")
+    parser.add_argument("--recompute", metavar="OUT",
+                        help="write {sku: weight_per_ft, price, cost_per_lb} at index 1.0")
+    parser.add_argument("--check", action="store_true",
+                        help="exit 1 unless index 1.0 reproduces the catalog prices")
+    args = parser.parse_args(argv)
+
+    def read_json(path):
+        if not path:
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    engine = PricingEngine(load_catalog(args.data), read_json(args.rates), read_json(args.lengths))
+
+    if args.check:
+        errors = engine.calibration_errors()
+        by_category: Dict[str, int] = {}
+        for sku in errors:
+            category = engine.categories[engine.sku_index[sku]]
+            by_category[category] = by_category.get(category, 0) + 1
+        for category, n in sorted(by_category.items()):
+            print(f"  {category}: {n} SKUs off the catalog price by more than "
+                  f"{CALIBRATION_TOLERANCE:.0%}")
+        print(f"{len(errors)} of {len(engine)} SKUs differ from the catalog at index 1.0")
+        return 1 if errors else 0
+
+    if args.recompute:
+        with open(args.recompute, 'w') as f:
+            json.dump(engine.recompute(), f, indent=2)
+        print(f"Wrote recomputed pricing for {len(engine)} SKUs to {args.recompute}")
+
+    if args.bom:
+        totals = engine.bom_costs(read_json(args.bom), args.index, group=args.group)
+        for idx, total in zip(args.index, totals):
+            print(f"{args.group} index {idx:.4f}: ${total:,.2f}")
+    else:
+        prices = engine.price_matrix(args.index, group=args.group)
+        catalog_totals = prices.sum(axis=1)
+        print(f"{prices.shape[0]} scenarios x {prices.shape[1]} SKUs")
+        for q in (0, 50, 100):
+            print(f"  p{q:<3} one stick of every SKU: ${np.percentile(catalog_totals, q):,.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""
+Command line front end for the profile library.
+
+    python -m scripts generate  [filters] [--out DIR | --publish SHARE] [--progress]
+                                [--events PATH] [--events-port PORT]
+    python -m scripts validate  [--data PATH]
+    python -m scripts query     [filters] [--fields a,b,c]
+    python -m scripts export    [filters] [--out ZIP] [--workers N]
+    python -m scripts watch     [--data PATH] [--out DIR | --publish SHARE] [--full]
+
+Filters (all optional, combined with AND):
+    --category PATTERN    category key or glob, repeatable (steel_*_tube)
+    --material KEY        material key, repeatable (steel_a36)
+    --sku SKU[,SKU...]    explicit SKUs, repeatable
+    --range FIELD=LO:HI   numeric range on any field, either bound optional
+
+Only the standard library is imported at startup; the COM generator and the
+exporter are imported by the subcommands that need them.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import sys
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from profile_records import ProfileRecord, load_catalog
+
+DEFAULT_DATA = "data/profile_data.json"
+
+
+def parse_range(text: str) -> Tuple[str, Optional[float], Optional[float]]:
+    """'depth_in=8:12' -> ('depth_in', 8.0, 12.0); either bound may be empty"""
+    field, sep, bounds = text.partition('=')
+    lo, colon, hi = bounds.partition(':')
+    if not sep or not colon or not field:
+        raise argparse.ArgumentTypeError(f"expected FIELD=LO:HI, got {text!r}")
+    try:
+        return field, float(lo) if lo else None, float(hi) if hi else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad bounds in {text!r}")
+
+
+def select_profiles(profiles: Dict[str, List[ProfileRecord]],
+                    categories: Optional[Sequence[str]] = None,
+                    materials: Optional[Sequence[str]] = None,
+                    skus: Optional[Iterable[str]] = None,
+                    ranges: Sequence[Tuple[str, Optional[float], Optional[float]]] = ()
+                    ) -> Dict[str, List[ProfileRecord]]:
+    """Return the {category: [record]} subset matching every given filter.
+    Categories that are not selected are never walked."""
+    wanted_skus = set(skus) if skus else None
+    wanted_materials = set(materials) if materials else None
+
+    selected = {}
+    for category, items in profiles.items():
+        if categories and not any(fnmatch.fnmatchcase(category, p) for p in categories):
+            continue
+        matches = []
+        for profile in items:
+            if wanted_skus is not None and profile.sku not in wanted_skus:
+                continue
+            if wanted_materials is not None and profile.material not in wanted_materials:
+                continue
+            if not all(_in_range(getattr(profile, field, None), lo, hi)
+                       for field, lo, hi in ranges):
+                continue
+            matches.append(profile)
+        if matches:
+            selected[category] = matches
+    return selected
+
+
+def _in_range(value, lo: Optional[float], hi: Optional[float]) -> bool:
+    if not isinstance(value, (int, float)):
+        return False
+    return (lo is None or value >= lo) and (hi is None or value <= hi)
+
+
+def load_selection(args: argparse.Namespace) -> Dict[str, List[ProfileRecord]]:
+    """Load the catalog named by --data and apply the command line filters"""
+    catalog = load_catalog(args.data)
+    skus = [s.strip() for group in args.sku or [] for s in group.split(',') if s.strip()]
+    return select_profiles(catalog.by_category, args.category, args.material,
+                           skus, args.range or ())
+
+
+def count(selection: Dict[str, List[ProfileRecord]]) -> int:
+    return sum(len(items) for items in selection.values())
+
+
+# Subcommands
+
+def cmd_generate(args: argparse.Namespace) -> int:
+    selection = load_selection(args)
+    if not selection:
+        print("No profiles match the given filters")
+        return 1
+    print(f"Generating {count(selection)} profiles in {len(selection)} categories")
+
+    from generate_profiles import ProfileGenerator
+
+    publisher = None
+    if args.publish:
+        from library_publisher import LibraryPublisher
+        publisher = LibraryPublisher(args.publish, workers=args.copy_workers)
+
+    from progress_events import (ConsoleSink, JsonLinesSink, ProgressEvents, SocketSink,
+                                 TerminalSummary)
+
+    sinks = [TerminalSummary() if args.progress else ConsoleSink()]
+    if args.events:
+        sinks.append(JsonLinesSink(args.events))
+    if args.events_port:
+        sinks.append(SocketSink(args.events_port))
+    events = ProgressEvents(sinks)
+    try:
+        result = ProfileGenerator(args.data).generate_all(
+            args.out, profiles=selection, publisher=publisher, clone=not args.no_clone,
+            events=events)
+    finally:
+        events.close()
+        # A run that did not publish leaves no staging or scratch folder behind
+        if publisher is not None:
+            publisher.abort()
+    if result is None:
+        return 1
+    if result["failed"]:
+        print(f"{len(result['failed'])} profiles failed: {', '.join(sorted(result['failed']))}")
+        return 1
+    return 0
+
+
+def cmd_validate(args: argparse.Namespace) -> int:
+    catalog = load_catalog(args.data, strict=False)
+    for problem in catalog.problems:
+        print(problem)
+    print(f"{len(catalog)} valid profiles, {len(catalog.problems)} problems")
+    return 1 if catalog.problems else 0
+
+
+def cmd_query(args: argparse.Namespace) -> int:
+    selection = load_selection(args)
+    fields = [f for f in (args.fields or '').split(',') if f]
+    try:
+        for category, items in selection.items():
+            for profile in items:
+                record = dict(profile.to_dict(), category=category)
+                if fields:
+                    record = {f: record.get(f) for f in fields}
+                print(json.dumps(record))
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader stopped early (| head); point stdout at devnull so the
+        # flush at exit does not raise again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    selection = load_selection(args)
+
+    from export_outlines import export_archive
+
+    summary = export_archive(args.data, args.out, args.workers, profiles=selection)
+    print(f"Exported {summary['exported']} profiles to {summary['archive']} "
+          f"in {summary['seconds']}s ({summary['skipped']} skipped)")
+    return 0
+
+
+def cmd_watch(args: argparse.Namespace) -> int:
+    from catalog_watch import CatalogWatchDaemon
+
+    daemon = CatalogWatchDaemon(args.data, args.out, publish_to=args.publish,
+                                copy_workers=args.copy_workers, metrics_path=args.metrics,
+                                debounce=args.debounce, poll_interval=args.poll)
+    daemon.run(full=args.full)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    filters = argparse.ArgumentParser(add_help=False)
+    filters.add_argument("--data", default=DEFAULT_DATA, help="catalog JSON path")
+    filters.add_argument("--category", action="append", metavar="PATTERN")
+    filters.add_argument("--material", action="append", metavar="KEY")
+    filters.add_argument("--sku", action="append", metavar="SKU[,SKU...]")
+    filters.add_argument("--range", action="append", type=parse_range,
+                         metavar="FIELD=LO:HI")
+
+    parser = argparse.ArgumentParser(prog="python -m scripts",
+                                     description="Coremark weldment profile tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("generate", parents=[filters], help="build .sldlfp files in SolidWorks")
+    p.add_argument("--out", default="output", help="output folder")
+    p.add_argument("--publish", metavar="SHARE",
+                   help="save to local scratch and publish the library to this share")
+    p.add_argument("--copy-workers", type=int, default=4,
+                   help="background copy threads when publishing")
+    p.add_argument("--no-clone", action="store_true",
+                   help="draw every profile instead of copying shared cross-sections")
+    p.add_argument("--progress", action="store_true",
+                   help="live summary (rate, ETA, failures) instead of a line per profile")
+    p.add_argument("--events", metavar="PATH",
+                   help="append progress events to this JSON-lines file")
+    p.add_argument("--events-port", type=int, metavar="PORT",
+                   help="also send progress events to this local UDP port")
+    p.set_defaults(func=cmd_generate)
+
+    p = sub.add_parser("validate", help="check every catalog record against the schema")
+    p.add_argument("--data", default=DEFAULT_DATA, help="catalog JSON path")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("query", parents=[filters], help="print matching records as JSON lines")
+    p.add_argument("--fields", help="comma separated fields to print")
+    p.set_defaults(func=cmd_query)
+
+    p = sub.add_parser("export", parents=[filters], help="export DXF/SVG outlines to a zip")
+    p.add_argument("--out", default="output/profile_outlines.zip")
+    p.add_argument("--workers", type=int, default=None)
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("watch", help="regenerate changed profiles whenever the catalog changes")
+    p.add_argument("--data", default=DEFAULT_DATA, help="catalog JSON path")
+    p.add_argument("--out", default="output", help="output folder")
+    p.add_argument("--publish", metavar="SHARE", help="publish each batch to this share")
+    p.add_argument("--copy-workers", type=int, default=4,
+                   help="background copy threads when publishing")
+    p.add_argument("--metrics", metavar="PATH", default="output/watch_metrics.json",
+                   help="queue depth and throughput JSON, rewritten after each batch")
+    p.add_argument("--debounce", type=float, default=1.0,
+                   help="seconds of quiet that end a burst of saves")
+    p.add_argument("--poll", type=float, metavar="SECONDS",
+                   help="poll the file at this interval instead of using inotify")
+    p.add_argument("--full", action="store_true",
+                   help="regenerate the whole catalog first instead of resuming")
+    p.set_defaults(func=cmd_watch)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Cross-section geometry for weldment profiles.
+Shared by the SolidWorks builders in generate_profiles.py and the headless
+DXF/SVG exporter so both draw exactly the same lines and arcs.
+All coordinates are in inches; callers scale to their own units.
+"""
+
+import math
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+from profile_records import AngleRecord, ProfileRecord, RectangularTubeRecord, SquareTubeRecord
+
+
+class Line(NamedTuple):
+    """Straight sketch segment from (x1, y1) to (x2, y2)"""
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+
+
+class Arc(NamedTuple):
+    """Circular sketch arc, same argument order as SketchManager.CreateArc.
+    direction is +1 for counter-clockwise, -1 for clockwise."""
+    cx: float
+    cy: float
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+    direction: int
+
+
+Entity = Union[Line, Arc]
+Loop = List[Entity]
+
+
+def angle_outline(leg_a: float, leg_b: float, thickness: float,
+                  inside_fillet: float) -> List[Loop]:
+    """L-shaped angle with the inside fillet, heel at the origin"""
+    t = thickness
+    r = inside_fillet
+    return [[
+        # Start at origin, go right along leg_a
+        Line(0, 0, leg_a, 0),
+        # Go up by thickness
+        Line(leg_a, 0, leg_a, t),
+        # Go left to inside corner (minus fillet area)
+        Line(leg_a, t, t + r, t),
+        # Inside fillet arc (90 degree arc, concave)
+        Arc(t + r, t + r, t + r, t, t, t + r, -1),
+        # Go up leg_b
+        Line(t, t + r, t, leg_b),
+        # Go left by thickness
+        Line(t, leg_b, 0, leg_b),
+        # Go down to origin
+        Line(0, leg_b, 0, 0),
+    ]]
+
+
+def rounded_rectangle(x1: float, y1: float, x2: float, y2: float,
+                      radius: float) -> Loop:
+    """Rectangle from (x1, y1) to (x2, y2) with all four corners rounded"""
+    r = radius
+    return [
+        # Bottom edge
+        Line(x1 + r, y1, x2 - r, y1),
+        # Bottom-right corner
+        Arc(x2 - r, y1 + r, x2 - r, y1, x2, y1 + r, 1),
+        # Right edge
+        Line(x2, y1 + r, x2, y2 - r),
+        # Top-right corner
+        Arc(x2 - r, y2 - r, x2, y2 - r, x2 - r, y2, 1),
+        # Top edge
+        Line(x2 - r, y2, x1 + r, y2),
+        # Top-left corner
+        Arc(x1 + r, y2 - r, x1 + r, y2, x1, y2 - r, 1),
+        # Left edge
+        Line(x1, y2 - r, x1, y1 + r),
+        # Bottom-left corner
+        Arc(x1 + r, y1 + r, x1, y1 + r, x1 + r, y1, 1),
+    ]
+
+
+def tube_outline(width: float, height: float, wall: float, corner_outer: float,
+                 corner_inner: float) -> List[Loop]:
+    """Square or rectangular tube centred on the origin: outer loop then inner cutout"""
+    half_w = width / 2
+    half_h = height / 2
+    return [
+        rounded_rectangle(-half_w, -half_h, half_w, half_h, corner_outer),
+        rounded_rectangle(-half_w + wall, -half_h + wall, half_w - wall, half_h - wall,
+                          corner_inner),
+    ]
+
+
+def profile_outline(record: ProfileRecord) -> Optional[List[Loop]]:
+    """Outline loops for a typed catalog record, or None for families
+    that have no builder yet (beams and channels)"""
+    if isinstance(record, AngleRecord):
+        return angle_outline(record.leg_a_in, record.leg_b_in, record.thickness_in,
+                             record.inside_fillet_radius_in)
+    if isinstance(record, (SquareTubeRecord, RectangularTubeRecord)):
+        return tube_outline(record.outer_width_in, record.outer_height_in,
+                            record.wall_thickness_in, record.corner_radius_outer_in,
+                            record.corner_radius_inner_in)
+    return None
+
+
+def geometry_key(record: ProfileRecord) -> Optional[Tuple]:
+    """Hashable key for the drawn cross-section, or None if the family has no
+    builder. Records with equal keys produce identical sketches; the family is
+    part of the key because it decides which custom properties a file carries."""
+    loops = profile_outline(record)
+    if loops is None:
+        return None
+    return (record.FAMILY,) + tuple(tuple(loop) for loop in loops)
+
+
+def arc_angles(arc: Arc) -> Tuple[float, float, float]:
+    """Radius and counter-clockwise start/end angles in degrees"""
+    radius = math.hypot(arc.x1 - arc.cx, arc.y1 - arc.cy)
+    start = math.degrees(math.atan2(arc.y1 - arc.cy, arc.x1 - arc.cx)) % 360
+    end = math.degrees(math.atan2(arc.y2 - arc.cy, arc.x2 - arc.cx)) % 360
+    if arc.direction < 0:
+        start, end = end, start
+    return radius, start, end
+
+
+def loop_area(loop: Loop) -> float:
+    """Signed area of a closed, chained loop (positive counter-clockwise),
+    exact for arcs: Green's theorem, 1/2 * integral of x dy - y dx"""
+    area = 0.0
+    for ent in loop:
+        if isinstance(ent, Arc):
+            radius = math.hypot(ent.x1 - ent.cx, ent.y1 - ent.cy)
+            start = math.atan2(ent.y1 - ent.cy, ent.x1 - ent.cx)
+            end = math.atan2(ent.y2 - ent.cy, ent.x2 - ent.cx)
+            if ent.direction > 0:
+                sweep = (end - start) % (2 * math.pi)
+            else:
+                sweep = -((start - end) % (2 * math.pi))
+            area += 0.5 * (radius * radius * sweep + ent.cx * (ent.y2 - ent.y1)
+                           - ent.cy * (ent.x2 - ent.x1))
+        else:
+            area += 0.5 * (ent.x1 * ent.y2 - ent.x2 * ent.y1)
+    return area
+
+
+def outline_area(loops: List[Loop]) -> float:
+    """Cross-section area: the largest loop minus the others (cutouts)"""
+    areas = [abs(loop_area(loop)) for loop in loops]
+    return 2 * max(areas) - sum(areas) if areas else 0.0
+
+
+def outline_bounds(loops: List[Loop]) -> Tuple[float, float, float, float]:
+    """(min_x, min_y, max_x, max_y) of all entity end points"""
+    xs: List[float] = []
+    ys: List[float] = []
+    for loop in loops:
+        for ent in loop:
+            xs.extend((ent.x1, ent.x2))
+            ys.extend((ent.y1, ent.y2))
+    return min(xs), min(ys), max(xs), max(ys)
@@ -0,0 +1,242 @@
+"""
+Typed profile records and a schema-checked catalog loader.
+Each profile family gets a record class with __slots__ and a fixed field
+schema. load_catalog() validates and converts profile_data.json in one pass
+and reports every missing or malformed field instead of substituting
+defaults.
+"""
+
+import json
+import math
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+# Field kinds
+STR = 'str'
+INT = 'int'
+NUM = 'num'
+
+# Leading and trailing fields shared by every family, in catalog key order
+HEAD_FIELDS = (('designation', STR), ('size', STR))
+TAIL_FIELDS = (('length_inches', INT), ('weight_per_ft', NUM), ('area_in2', NUM),
+               ('price', NUM), ('cost_per_lb', NUM), ('sku', STR), ('material', STR))
+
+
+def profile_stem(designation: str) -> str:
+    """File name stem for a designation, used for library files and exported
+    outlines alike: L1 1/4x3/4x1/8 -> L1_1-4x3-4x1-8"""
+    return designation.replace('/', '-').replace(' ', '_')
+
+
+def profile_filename(designation: str) -> str:
+    """Library file name for a designation: L1 1/4x3/4x1/8 -> L1_1-4x3-4x1-8.sldlfp"""
+    return f"{profile_stem(designation)}.sldlfp"
+
+
+class CatalogError(ValueError):
+    """Raised when the catalog fails schema validation"""
+
+    def __init__(self, problems: List[str]):
+        self.problems = problems
+        preview = "\n  ".join(problems[:20])
+        more = f"\n  ... and {len(problems) - 20} more" if len(problems) > 20 else ""
+        super().__init__(f"{len(problems)} catalog problems:\n  {preview}{more}")
+
+
+class ProfileRecord:
+    """Base class: common identity and commercial fields"""
+    FAMILY = ''
+    # (name, kind) for the family specific dimension fields
+    DIMENSIONS: Tuple[Tuple[str, str], ...] = ()
+    # Dimension fields that may be absent, with their meaning when absent
+    OPTIONAL: Dict[str, Any] = {}
+
+    __slots__ = ('category',) + tuple(name for name, _ in HEAD_FIELDS + TAIL_FIELDS)
+
+    @classmethod
+    def fields(cls) -> Tuple[Tuple[str, str], ...]:
+        return HEAD_FIELDS + cls.DIMENSIONS + TAIL_FIELDS
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Catalog JSON representation, keys in catalog order"""
+        out = {}
+        for name, _ in self.fields():
+            value = getattr(self, name)
+            if value is None and name in self.OPTIONAL:
+                continue
+            out[name] = value
+        return out
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.sku!r}, {self.designation!r})"
+
+
+class AngleRecord(ProfileRecord):
+    FAMILY = 'angle'
+    DIMENSIONS = (('leg_a_in', NUM), ('leg_b_in', NUM), ('thickness_in', NUM),
+                  ('inside_fillet_radius_in', NUM), ('toe_radius_in', NUM))
+    __slots__ = tuple(name for name, _ in DIMENSIONS)
+
+
+class SquareTubeRecord(ProfileRecord):
+    FAMILY = 'square_tube'
+    DIMENSIONS = (('outer_dim_in', NUM), ('wall_thickness_in', NUM),
+                  ('corner_radius_outer_in', NUM), ('corner_radius_inner_in', NUM))
+    __slots__ = tuple(name for name, _ in DIMENSIONS)
+
+    @property
+    def outer_width_in(self) -> float:
+        return self.outer_dim_in
+
+    @property
+    def outer_height_in(self) -> float:
+        return self.outer_dim_in
+
+
+class RectangularTubeRecord(ProfileRecord):
+    FAMILY = 'rectangular_tube'
+    DIMENSIONS = (('outer_width_in', NUM), ('outer_height_in', NUM), ('wall_thickness_in', NUM),
+                  ('corner_radius_outer_in', NUM), ('corner_radius_inner_in', NUM))
+    __slots__ = tuple(name for name, _ in DIMENSIONS)
+
+
+class BeamRecord(ProfileRecord):
+    """W-shapes (parallel flanges) and S-shapes (tapered flanges)"""
+    FAMILY = 'beam'
+    DIMENSIONS = (('depth_in', NUM), ('flange_width_in', NUM), ('web_thickness_in', NUM),
+                  ('flange_thickness_in', NUM), ('flange_slope_degrees', NUM),
+                  ('k_dimension_in', NUM), ('fillet_radius_in', NUM))
+    # W-shapes carry no slope: parallel flanges
+    OPTIONAL = {'flange_slope_degrees': None}
+    __slots__ = tuple(name for name, _ in DIMENSIONS)
+
+
+class ChannelRecord(ProfileRecord):
+    FAMILY = 'channel'
+    DIMENSIONS = BeamRecord.DIMENSIONS
+    OPTIONAL = BeamRecord.OPTIONAL
+    __slots__ = tuple(name for name, _ in DIMENSIONS)
+
+
+# Category key substring -> record class, first match wins
+CATEGORY_FAMILIES: Tuple[Tuple[str, Type[ProfileRecord]], ...] = (
+    ('angle', AngleRecord),
+    ('rectangular_tube', RectangularTubeRecord),
+    ('square_tube', SquareTubeRecord),
+    ('channel', ChannelRecord),
+    ('wide_flange', BeamRecord),
+    ('i_beam', BeamRecord),
+)
+
+
+def record_class(category: str) -> Optional[Type[ProfileRecord]]:
+    """Record class for a catalog category key, or None if unknown"""
+    key = category.lower()
+    for token, cls in CATEGORY_FAMILIES:
+        if token in key:
+            return cls
+    return None
+
+
+def _convert(value: Any, kind: str) -> Any:
+    """Convert a JSON value to the field kind, raising ValueError if it can't be"""
+    if kind == STR:
+        if not isinstance(value, str):
+            raise ValueError(f"expected string, got {type(value).__name__}")
+        return value
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"expected number, got {type(value).__name__}")
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"not finite: {value!r}")
+    if kind == INT:
+        if number != int(number):
+            raise ValueError(f"expected integer, got {value!r}")
+        return int(number)
+    return number
+
+
+class Catalog:
+    """Validated catalog: metadata tables plus typed records"""
+
+    __slots__ = ('metadata', 'materials', 'geometry_standards', 'by_category', 'problems')
+
+    def __init__(self, metadata: Dict, materials: Dict, geometry_standards: Dict,
+                 by_category: Dict[str, List[ProfileRecord]], problems: List[str]):
+        self.metadata = metadata
+        self.materials = materials
+        self.geometry_standards = geometry_standards
+        self.by_category = by_category
+        self.problems = problems
+
+    def records(self) -> List[ProfileRecord]:
+        return [r for items in self.by_category.values() for r in items]
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self.by_category.values())
+
+
+def parse_catalog(data: Dict[str, Any]) -> Catalog:
+    """Validate and convert a decoded catalog in one pass.
+    Invalid records are left out of by_category and described in problems."""
+    materials = data.get('materials', {})
+    problems: List[str] = []
+    by_category: Dict[str, List[ProfileRecord]] = {}
+    seen_skus: Dict[str, str] = {}
+
+    for category, items in data.get('profiles', {}).items():
+        cls = record_class(category)
+        if cls is None:
+            problems.append(f"{category}: unknown profile family")
+            continue
+        schema = cls.fields()
+        optional = cls.OPTIONAL
+        records = by_category[category] = []
+
+        for pos, raw in enumerate(items):
+            label = f"{category}[{pos}] {raw.get('designation', '?')}"
+            record = cls.__new__(cls)
+            record.category = category
+            ok = True
+            for name, kind in schema:
+                value = raw.get(name)
+                if value is None:
+                    if name in optional:
+                        setattr(record, name, optional[name])
+                        continue
+                    problems.append(f"{label}: missing {name}")
+                    ok = False
+                    continue
+                try:
+                    value = _convert(value, kind)
+                except ValueError as e:
+                    problems.append(f"{label}: {name} {e}")
+                    ok = False
+                    continue
+                if kind != STR and name.endswith('_in') and value <= 0:
+                    problems.append(f"{label}: {name} must be positive, got {value}")
+                    ok = False
+                setattr(record, name, value)
+            if not ok:
+                continue
+
+            if record.material not in materials:
+                problems.append(f"{label}: unknown material {record.material}")
+                continue
+            if record.sku in seen_skus:
+                problems.append(f"{label}: duplicate SKU {record.sku} (also {seen_skus[record.sku]})")
+                continue
+            seen_skus[record.sku] = label
+            records.append(record)
+
+    return Catalog(data.get('metadata', {}), materials, data.get('geometry_standards', {}),
+                   by_category, problems)
+
+
+def load_catalog(data_path: str = "data/profile_data.json", strict: bool = True) -> Catalog:
+    """Load profile_data.json into typed records.
+    With strict=True any problem raises CatalogError listing all of them."""
+    with open(data_path, 'r') as f:
+        catalog = parse_catalog(json.load(f))
+    if strict and catalog.problems:
+        raise CatalogError(catalog.problems)
+    return catalog
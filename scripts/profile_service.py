@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Local profile lookup service.
+Loads profile_data.json once into in-memory indexes and serves lookups over
+HTTP/1.1 (asyncio, keep-alive). Responses are cached in an LRU keyed by
+catalog version, carry ETags, and the catalog is reloaded automatically when
+the file changes on disk.
+
+Endpoints:
+    GET  /health
+    GET  /profiles/<sku>
+    GET  /designations/<designation>
+    GET  /search?category=&material=&q=&field=&min=&max=&limit=&offset=
+    GET  /suggest?q=&limit=&fuzzy=   designation/SKU autocomplete
+    POST /batch   {"skus": [...], "designations": [...]}
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from designation_search import DesignationIndex
+
+MAX_BODY_BYTES = 1 << 20
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class CatalogIndex:
+    """Read-only indexed view of one version of the catalog"""
+
+    def __init__(self, data: Dict[str, Any], version: str):
+        self.version = version
+        self.metadata = data.get('metadata', {})
+        self.by_sku: Dict[str, Dict] = {}
+        self.by_designation: Dict[str, Dict] = {}
+        self.by_category: Dict[str, List[Dict]] = {}
+        self.by_material: Dict[str, List[Dict]] = {}
+        self.records: List[Dict] = []
+
+        for category, items in data.get('profiles', {}).items():
+            self.by_category[category] = []
+            for profile in items:
+                record = dict(profile, category=category)
+                self.records.append(record)
+                self.by_category[category].append(record)
+                self.by_material.setdefault(record.get('material', ''), []).append(record)
+                self.by_sku[str(record.get('sku', ''))] = record
+                self.by_designation[record.get('designation', '').lower()] = record
+        self.suggestions = DesignationIndex(
+            (str(r.get('sku', '')), r.get('designation', ''), r) for r in self.records)
+
+    @classmethod
+    def load(cls, data_path: str) -> "CatalogIndex":
+        with open(data_path, 'rb') as f:
+            raw = f.read()
+        return cls(json.loads(raw), hashlib.sha1(raw).hexdigest()[:16])
+
+    def search(self, category: Optional[str] = None, material: Optional[str] = None,
+               q: Optional[str] = None, field: Optional[str] = None,
+               lo: Optional[float] = None, hi: Optional[float] = None) -> List[Dict]:
+        """Filter records; starts from the narrowest available index"""
+        if category is not None:
+            candidates = self.by_category.get(category, [])
+        elif material is not None:
+            candidates = self.by_material.get(material, [])
+        else:
+            candidates = self.records
+
+        q = q.lower() if q else None
+        results = []
+        for record in candidates:
+            if material is not None and record.get('material') != material:
+                continue
+            if q is not None and q not in record.get('designation', '').lower():
+                continue
+            if field is not None:
+                value = record.get(field)
+                if not isinstance(value, (int, float)):
+                    continue
+                if lo is not None and value < lo:
+                    continue
+                if hi is not None and value > hi:
+                    continue
+            results.append(record)
+        return results
+
+
+class ResponseCache:
+    """LRU of encoded response bodies keyed by (catalog version, request key)"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[int, bytes, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[Tuple[int, bytes, str]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Tuple[str, str], entry: Tuple[int, bytes, str]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ProfileService:
+    """HTTP front end over a hot-reloadable CatalogIndex"""
+
+    def __init__(self, data_path: str = "data/profile_data.json",
+                 cache_size: int = 4096, reload_interval: float = 2.0):
+        self.data_path = data_path
+        self.reload_interval = reload_interval
+        self.index = CatalogIndex.load(data_path)
+        self.cache = ResponseCache(cache_size)
+        self._stat = self._file_stat()
+        self.requests = 0
+
+    def _file_stat(self) -> Tuple[float, int]:
+        st = os.stat(self.data_path)
+        return st.st_mtime, st.st_size
+
+    async def watch_catalog(self) -> None:
+        """Poll the catalog file and swap in a fresh index when it changes"""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                stat = self._file_stat()
+                if stat == self._stat:
+                    continue
+                index = await asyncio.get_running_loop().run_in_executor(
+                    None, CatalogIndex.load, self.data_path)
+            except (OSError, ValueError) as e:
+                # Keep serving the previous version while the file is mid-write
+                print(f"Catalog reload failed: {e}")
+                continue
+            self._stat = stat
+            if index.version != self.index.version:
+                self.index = index
+                self.cache.clear()
+                print(f"Reloaded catalog version {index.version} ({len(index.records)} profiles)")
+
+    # Request handling
+
+    def handle(self, method: str, target: str, body: bytes) -> Tuple[int, bytes, str]:
+        """Route one request to (status, body, etag), using the response cache"""
+        # Batch bodies can be up to MAX_BODY_BYTES; key on their digest instead
+        digest = hashlib.sha1(body).hexdigest() if body else ''
+        key = (self.index.version, f"{method} {target} {digest}")
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            status, payload = self._route(method, target, body)
+        except Exception as e:
+            print(f"Error handling {method} {target}: {e!r}")
+            status, payload = 500, {"error": "internal error"}
+        encoded = json.dumps(payload, separators=(',', ':')).encode()
+        etag = '"' + hashlib.blake2b(encoded, digest_size=8).hexdigest() + '"'
+        entry = (status, encoded, etag)
+        if status in (200, 404):
+            self.cache.put(key, entry)
+        return entry
+
+    def _route(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        url = urlsplit(target)
+        parts = [unquote(p) for p in url.path.strip('/').split('/') if p]
+        index = self.index
+
+        if method == 'GET' and parts == ['health']:
+            return 200, {"status": "ok", "version": index.version,
+                         "profiles": len(index.records),
+                         "scrape_date": index.metadata.get('scrape_date', '')}
+
+        if method == 'GET' and len(parts) == 2 and parts[0] == 'profiles':
+            record = index.by_sku.get(parts[1])
+            return (200, record) if record else (404, {"error": f"unknown SKU {parts[1]}"})
+
+        if method == 'GET' and len(parts) == 2 and parts[0] == 'designations':
+            record = index.by_designation.get(parts[1].lower())
+            return (200, record) if record else (404, {"error": f"unknown designation {parts[1]}"})
+
+        if method == 'GET' and parts == ['search']:
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                lo = float(params['min']) if 'min' in params else None
+                hi = float(params['max']) if 'max' in params else None
+                limit = int(params.get('limit', 100))
+                offset = int(params.get('offset', 0))
+            except ValueError as e:
+                return 400, {"error": str(e)}
+            if limit < 0 or offset < 0:
+                return 400, {"error": "limit and offset must not be negative"}
+            if (lo is not None or hi is not None) and 'field' not in params:
+                return 400, {"error": "min/max require field"}
+            matches = index.search(params.get('category'), params.get('material'),
+                                   params.get('q'), params.get('field'), lo, hi)
+            return 200, {"total": len(matches), "offset": offset,
+                         "results": matches[offset:offset + limit]}
+
+        if method == 'GET' and parts == ['suggest']:
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                limit = int(params.get('limit', 10))
+            except ValueError as e:
+                return 400, {"error": str(e)}
+            if limit < 0:
+                return 400, {"error": "limit must not be negative"}
+            fuzzy = params.get('fuzzy', '1') not in ('0', 'false', 'no')
+            matches = index.suggestions.search(params.get('q', ''), limit, fuzzy)
+            return 200, {"results": [
+                {"sku": m.item.get('sku'), "designation": m.designation,
+                 "category": m.item['category'], "distance": m.distance} for m in matches]}
+
+        if method == 'POST' and parts == ['batch']:
+            try:
+                request = json.loads(body or b'{}')
+            except ValueError as e:
+                return 400, {"error": f"invalid JSON: {e}"}
+            if not isinstance(request, dict):
+                return 400, {"error": "body must be a JSON object"}
+            skus = request.get('skus', [])
+            designations = request.get('designations', [])
+            for name, values in (('skus', skus), ('designations', designations)):
+                if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+                    return 400, {"error": f"{name} must be a list of strings"}
+            return 200, {
+                "skus": {s: index.by_sku.get(s) for s in skus},
+                "designations": {d: index.by_designation.get(d.lower()) for d in designations},
+            }
+
+        if parts and parts[0] in ('health', 'profiles', 'designations', 'search', 'suggest', 'batch'):
+            return 405, {"error": f"{method} not allowed"}
+        return 404, {"error": f"no route for {url.path}"}
+
+    # HTTP/1.1 transport
+
+    async def serve_connection(self, reader: asyncio.StreamReader,
+                               writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._write(writer, 400, b'{"error":"bad request line"}', None, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._write(writer, 400, b'{"error":"bad Content-Length"}', None, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._write(writer, 413, b'{"error":"body too large"}', None, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version == 'HTTP/1.1')
+                self.requests += 1
+                status, payload, etag = self.handle(method, target, body)
+                if status == 200 and headers.get('if-none-match') == etag:
+                    await self._write(writer, 304, b'', etag, keep_alive)
+                else:
+                    await self._write(writer, status, payload, etag, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _write(writer: asyncio.StreamWriter, status: int, body: bytes,
+                     etag: Optional[str], keep_alive: bool) -> None:
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                "Content-Type: application/json",
+                f"Content-Length: {len(body)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if etag:
+            head.append(f"ETag: {etag}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
+
+    async def run(self, host: str = "127.0.0.1", port: int = 8765) -> None:
+        server = await asyncio.start_server(self.serve_connection, host, port)
+        watcher = asyncio.create_task(self.watch_catalog())
+        print(f"Serving {len(self.index.records)} profiles on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve profile lookups over HTTP")
+    parser.add_argument("--data", default="data/profile_data.json")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache-size", type=int, default=4096)
+    parser.add_argument("--reload-interval", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    service = ProfileService(args.data, args.cache_size, args.reload_interval)
+    try:
+        asyncio.run(service.run(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Structured progress events for generation runs.
+
+generate_all emits one event per step to a ProgressEvents stream, which
+hands it to every sink:
+
+  run_started       total, categories, output_dir
+  category_started  category, count
+  profile_done      category, sku, designation, file, seconds, cloned
+  profile_failed    category, sku, designation, seconds, error
+  profile_skipped   category, sku, designation, reason
+  clone_failed      category, sku, designation, source, error (then drawn)
+  category_done     category, done, failed, seconds
+  publishing        pending (copies still queued for the share)
+  published         library (the live library folder)
+  run_finished      created, failed, cloned, seconds, error (None unless the
+                    run stopped early: no SolidWorks, an exception, Ctrl+C)
+
+Every event also carries "event", "run" (the run's start time plus a random
+suffix, which tells runs apart in an appended log even when two start in the
+same second), "time" and "elapsed" (seconds since run_started).
+
+Sinks:
+  ConsoleSink       the classic "Created: ..." lines (the default)
+  JsonLinesSink     one JSON object per line, appended and flushed per event
+  SocketSink        JSON datagrams to a local UDP port; never blocks the run
+  TerminalSummary   live status line: done/total, rolling profiles/s, ETA,
+                    failures by category, skips, and a STALLED flag when
+                    nothing has finished for a while
+
+    python -m scripts generate --progress --events output/events.jsonl
+    python scripts/progress_events.py listen --port 8765     # live summary of a run
+    python scripts/progress_events.py summarize output/events.jsonl
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict, IO, List, Optional, Sequence
+
+DEFAULT_PORT = 8765
+# Rolling throughput window, seconds
+RATE_WINDOW = 60.0
+STALL_AFTER = 60.0
+
+
+class ProgressEvents:
+    """Stamps events and fans them out to sinks; a failing sink is dropped,
+    never allowed to stop the run"""
+
+    def __init__(self, sinks: Sequence[Any] = ()):
+        self.sinks = list(sinks)
+        self.run: Optional[str] = None
+        self._start = time.monotonic()
+
+    @classmethod
+    def console(cls) -> "ProgressEvents":
+        return cls([ConsoleSink()])
+
+    def emit(self, event: str, **fields) -> Dict[str, Any]:
+        if event == "run_started":
+            self.run = f"{time.strftime('%Y-%m-%dT%H:%M:%S')}-{uuid.uuid4().hex[:8]}"
+            self._start = time.monotonic()
+        record = {"event": event, "run": self.run, "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                  "elapsed": round(time.monotonic() - self._start, 3)}
+        record.update(fields)
+        for sink in list(self.sinks):
+            try:
+                sink.handle(record)
+            except Exception as e:
+                self.sinks.remove(sink)
+                print(f"Progress sink {type(sink).__name__} disabled: {e}", file=sys.stderr)
+        return record
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+
+class ConsoleSink:
+    """The per-profile lines generate_all has always printed"""
+
+    def __init__(self, stream: IO[str] = None):
+        self.stream = stream
+
+    def handle(self, e: Dict[str, Any]) -> None:
+        kind = e["event"]
+        if kind == "category_started":
+            line = f"Processing {e['category']}..."
+        elif kind == "profile_done":
+            line = f"  Cloned: {e['file']} (from {e['source']})" if e["cloned"] \
+                else f"  Created: {e['file']}"
+        elif kind == "profile_failed":
+            line = f"  Error creating {e['designation']}: {e['error']}"
+        elif kind == "profile_skipped":
+            line = f"  Skipping {e['designation']}: {e['reason']}"
+        elif kind == "clone_failed":
+            line = f"  Clone of {e['designation']} failed, drawing instead: {e['error']}"
+        elif kind == "publishing":
+            line = f"Waiting for {e['pending']} pending copies..."
+        elif kind == "published":
+            line = f"Published library: {e['library']}"
+        elif kind == "run_finished" and e["error"]:
+            line = f"Run stopped: {e['error']}"
+        elif kind == "run_finished" and e["cloned"]:
+            line = f"Cloned {e['cloned']} of {e['created']} profiles from shared cross-sections"
+        else:
+            return
+        print(line, file=self.stream or sys.stdout)
+
+    def close(self) -> None:
+        pass
+
+
+class JsonLinesSink:
+    """Appends each event to a JSON-lines file"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def handle(self, event: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(event) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class SocketSink:
+    """Sends each event as a JSON datagram to host:port. UDP, so a run with
+    nobody listening is not slowed down or stopped."""
+
+    def __init__(self, port: int = DEFAULT_PORT, host: str = "127.0.0.1"):
+        self.address = (host, port)
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+
+    def handle(self, event: Dict[str, Any]) -> None:
+        try:
+            self._sock.sendto(json.dumps(event).encode('utf-8'), self.address)
+        except OSError:
+            pass    # no listener, or its buffer is full
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+def _duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    return f"{seconds // 60}m{seconds % 60:02d}s"
+
+
+class TerminalSummary:
+    """Live one-line summary, redrawn every `interval` seconds by a background
+    thread so a stall shows even when no events arrive. On a terminal the line
+    is rewritten in place; otherwise a line is printed every `interval`."""
+
+    def __init__(self, stream: IO[str] = None, interval: Optional[float] = None,
+                 window: float = RATE_WINDOW, stall_after: float = STALL_AFTER):
+        self.stream = stream or sys.stderr
+        self.tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self.interval = interval if interval is not None else (1.0 if self.tty else 30.0)
+        self.window = window
+        self.stall_after = stall_after
+        self._lock = threading.Lock()
+        self._finished = deque()        # monotonic times of finished profiles
+        self._reset(0)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._refresh, name="progress-summary",
+                                        daemon=True)
+        self._thread.start()
+
+    def _reset(self, total: int) -> None:
+        self.total = total
+        self.done = 0
+        self.skipped = 0
+        self.failed: Dict[str, int] = {}
+        self.category = ""
+        self._finished.clear()
+        self._started = self._last = time.monotonic()
+        self._active = total > 0
+
+    def handle(self, e: Dict[str, Any]) -> None:
+        with self._lock:
+            kind = e["event"]
+            now = time.monotonic()
+            if kind == "run_started":
+                self._reset(e["total"])
+            elif kind == "category_started":
+                self.category = e["category"]
+            elif kind == "profile_skipped":
+                # Skips take no time; counting them would inflate the rate
+                self.skipped += 1
+                self._last = now
+            elif kind in ("profile_done", "profile_failed"):
+                self.done += 1
+                self._finished.append(now)
+                self._last = now
+                if kind == "profile_failed":
+                    self.failed[e["category"]] = self.failed.get(e["category"], 0) + 1
+            elif kind == "publishing":
+                # Copies finishing is not generation progress; no stall flag
+                self.category = "publishing"
+                self._active = False
+            elif kind == "run_finished":
+                self._active = False
+        if kind == "run_finished":
+            self._draw(final=True)
+
+    def rate(self, now: Optional[float] = None) -> float:
+        """Profiles built (or failed) per second over the last `window` seconds"""
+        now = time.monotonic() if now is None else now
+        while self._finished and self._finished[0] < now - self.window:
+            self._finished.popleft()
+        span = min(self.window, now - self._started)
+        return len(self._finished) / span if span > 0 else 0.0
+
+    def line(self) -> str:
+        with self._lock:
+            now = time.monotonic()
+            rate = self.rate(now)
+            progress = self.done + self.skipped
+            remaining = self.total - progress
+            eta = remaining / rate if rate > 0 else None
+            pct = 100.0 * progress / self.total if self.total else 100.0
+            text = (f"[{progress}/{self.total} {pct:5.1f}%] {rate:5.2f} profiles/s  "
+                    f"ETA {_duration(eta if remaining else 0)}")
+            failures = sum(self.failed.values())
+            if failures:
+                worst = sorted(self.failed.items(), key=lambda kv: -kv[1])[:3]
+                text += f"  failed {failures} (" + ", ".join(f"{c} {n}" for c, n in worst) + ")"
+            if self.skipped:
+                text += f"  skipped {self.skipped}"
+            if self.category:
+                text += f"  {self.category}"
+            idle = now - self._last
+            if self._active and idle >= self.stall_after:
+                text += f"  STALLED {_duration(idle)}"
+            return text
+
+    def _draw(self, final: bool = False) -> None:
+        text = self.line()
+        if self.tty:
+            self.stream.write("\r" + text + "\033[K" + ("\n" if final else ""))
+        else:
+            self.stream.write(text + "\n")
+        self.stream.flush()
+
+    def _refresh(self) -> None:
+        while not self._stop.wait(self.interval):
+            if self._active:
+                self._draw()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def listen(port: int = DEFAULT_PORT, host: str = "127.0.0.1", raw: bool = False) -> None:
+    """Show the events a SocketSink sends, as a live summary or raw JSON lines"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((host, port))
+    summary = None if raw else TerminalSummary(sys.stdout)
+    try:
+        while True:
+            data, _ = sock.recvfrom(65536)
+            if summary is None:
+                print(data.decode('utf-8'), flush=True)
+            else:
+                summary.handle(json.loads(data))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if summary is not None:
+            summary.close()
+        sock.close()
+
+
+def summarize(path: str) -> List[Dict[str, Any]]:
+    """Per-run, per-category throughput from a JSON-lines event log, for
+    capacity planning: profiles, failures, mean and p95 seconds per profile"""
+    runs: Dict[str, Dict[str, Any]] = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            e = json.loads(line)
+            run = runs.setdefault(e["run"], {"run": e["run"], "seconds": None, "error": None,
+                                             "categories": {}})
+            if e["event"] == "run_finished":
+                run["seconds"] = e["seconds"]
+                run["error"] = e.get("error")
+            elif e["event"] in ("profile_done", "profile_failed"):
+                cat = run["categories"].setdefault(e["category"],
+                                                   {"done": 0, "failed": 0, "cloned": 0,
+                                                    "durations": []})
+                if e["event"] == "profile_failed":
+                    cat["failed"] += 1
+                else:
+                    cat["done"] += 1
+                    cat["cloned"] += bool(e.get("cloned"))
+                cat["durations"].append(e["seconds"])
+
+    out = []
+    for run in runs.values():
+        for name, cat in run["categories"].items():
+            durations = sorted(cat.pop("durations"))
+            cat["mean_seconds"] = round(sum(durations) / len(durations), 3)
+            cat["p95_seconds"] = round(durations[min(len(durations) - 1,
+                                                     int(0.95 * len(durations)))], 3)
+        out.append(run)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch or summarize generation progress events")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("listen", help="live summary of a run sending to --events-port")
+    p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p.add_argument("--raw", action="store_true", help="print the events as JSON lines")
+    p = sub.add_parser("summarize", help="throughput per run and category from an event log")
+    p.add_argument("log")
+    args = parser.parse_args(argv)
+
+    if args.command == "listen":
+        listen(args.port, raw=args.raw)
+        return 0
+
+    for run in summarize(args.log):
+        total = sum(c["done"] + c["failed"] for c in run["categories"].values())
+        rate = f", {total / run['seconds']:.2f} profiles/s" if run["seconds"] else ""
+        print(f"Run {run['run']}: {total} profiles in {_duration(run['seconds'])}{rate}"
+              + (f" (stopped: {run['error']})" if run["error"] else ""))
+        for name, cat in sorted(run["categories"].items()):
+            print(f"  {name:<34} {cat['done']:>5} done {cat['failed']:>4} failed "
+                  f"{cat['cloned']:>5} cloned  mean {cat['mean_seconds']:.2f}s "
+                  f"p95 {cat['p95_seconds']:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
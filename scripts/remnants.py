@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Remnant inventory: match cut lists to offcuts before buying new stock.
+
+Drops are recorded by SKU and length. Per SKU the inventory keeps remnant
+lengths in a sorted list, so a best-fit lookup (shortest remnant at least
+as long as the cut) is a binary search even with tens of thousands of
+pieces on the racks.
+
+Planning a cut list goes SKU by SKU, longest cut first. Each cut takes the
+best-fitting remnant, and what is left of that remnant goes back into the
+pool for the shorter cuts. Cuts no remnant can cover are packed best-fit
+into new sticks of the catalog length, which are priced at the catalog
+`price` (per stick). With --commit the used remnants leave the inventory and
+leftovers at least --min-length long are added back as new remnants.
+
+    python scripts/remnants.py add 01806 96.5 --location "rack 3"
+    python scripts/remnants.py plan cutlist.json --kerf 0.125 --commit
+    python scripts/remnants.py list --sku 01806
+
+A cut list is JSON: [{"sku": "01806", "length_in": 42, "qty": 4}, ...]
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from profile_records import ProfileRecord, load_catalog
+
+DEFAULT_INVENTORY = "data/remnants.json"
+DEFAULT_KERF = 0.125
+# Leftovers shorter than this are scrap, not remnants
+DEFAULT_MIN_LENGTH = 12.0
+
+
+class Remnant(NamedTuple):
+    id: int
+    sku: str
+    length_in: float
+    location: str
+    added: str
+
+
+class Cut(NamedTuple):
+    sku: str
+    length_in: float
+    source: str         # "remnant" or "new"
+    source_id: int      # remnant id, or new stick number within the SKU
+
+
+class Plan(NamedTuple):
+    cuts: List[Cut]
+    used: List[int]                           # remnant ids consumed
+    leftovers: List[Tuple[str, float]]        # (sku, length) kept as remnants
+    buy: Dict[str, Dict[str, Any]]            # sku -> sticks, stick length, price
+    unfillable: List[Tuple[str, float]]       # cuts longer than a new stick
+
+    @property
+    def cost(self) -> float:
+        return round(sum(b['cost'] for b in self.buy.values()), 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"cuts": [c._asdict() for c in self.cuts], "used_remnants": self.used,
+                "leftovers": [{"sku": s, "length_in": l} for s, l in self.leftovers],
+                "buy": self.buy, "cost": self.cost,
+                "unfillable": [{"sku": s, "length_in": l} for s, l in self.unfillable]}
+
+
+class RemnantInventory:
+    """Remnants by id, plus per-SKU (length, id) lists kept sorted"""
+
+    def __init__(self, path: Optional[str] = DEFAULT_INVENTORY):
+        self.path = path
+        self.remnants: Dict[int, Remnant] = {}
+        self._by_sku: Dict[str, List[Tuple[float, int]]] = {}
+        self._next_id = 1
+        if path and os.path.exists(path):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            self._next_id = data.get("next_id", 1)
+            for item in data.get("remnants", []):
+                self._insert(Remnant(**item))
+
+    def _insert(self, remnant: Remnant) -> None:
+        self.remnants[remnant.id] = remnant
+        insort(self._by_sku.setdefault(remnant.sku, []), (remnant.length_in, remnant.id))
+        self._next_id = max(self._next_id, remnant.id + 1)
+
+    def __len__(self) -> int:
+        return len(self.remnants)
+
+    def save(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump({"next_id": self._next_id,
+                       "remnants": [r._asdict() for r in sorted(self.remnants.values())]},
+                      f, indent=1)
+        os.replace(tmp, self.path)
+
+    def add(self, sku: str, length_in: float, location: str = "") -> Remnant:
+        if length_in <= 0:
+            raise ValueError(f"remnant length must be positive, got {length_in}")
+        remnant = Remnant(self._next_id, sku, float(length_in), location,
+                          time.strftime("%Y-%m-%dT%H:%M:%S"))
+        self._insert(remnant)
+        return remnant
+
+    def remove(self, remnant_id: int) -> Remnant:
+        remnant = self.remnants.pop(remnant_id)
+        lengths = self._by_sku[remnant.sku]
+        del lengths[bisect_left(lengths, (remnant.length_in, remnant.id))]
+        if not lengths:
+            del self._by_sku[remnant.sku]
+        return remnant
+
+    def lengths(self, sku: str) -> List[Tuple[float, int]]:
+        """(length, id) for sku, shortest first"""
+        return list(self._by_sku.get(sku, ()))
+
+    def best_fit(self, sku: str, length_in: float) -> Optional[Remnant]:
+        """Shortest remnant of sku at least length_in long"""
+        lengths = self._by_sku.get(sku, ())
+        pos = bisect_left(lengths, (length_in, -math.inf))
+        return self.remnants[lengths[pos][1]] if pos < len(lengths) else None
+
+    def plan(self, cuts: Iterable[Tuple[str, float]], catalog: Dict[str, ProfileRecord],
+             kerf: float = DEFAULT_KERF, min_length: float = DEFAULT_MIN_LENGTH) -> Plan:
+        """Assign (sku, length) cuts to remnants first, then to new sticks.
+        The inventory itself is not changed; see apply()."""
+        by_sku: Dict[str, List[float]] = {}
+        for sku, length in cuts:
+            by_sku.setdefault(sku, []).append(float(length))
+
+        out_cuts: List[Cut] = []
+        used: List[int] = []
+        leftovers: List[Tuple[str, float]] = []
+        buy: Dict[str, Dict[str, Any]] = {}
+        unfillable: List[Tuple[str, float]] = []
+
+        for sku in sorted(by_sku):
+            pieces = sorted(by_sku[sku], reverse=True)
+            # Working pool: (length, remnant id); offcuts re-enter with negative ids
+            pool = list(self._by_sku.get(sku, ()))
+            offcut_of: Dict[int, int] = {}
+            uncovered: List[float] = []
+            for piece in pieces:
+                # The last cut off a piece may run past its end, so a
+                # remnant only needs to be as long as the cut
+                pos = bisect_left(pool, (piece, -math.inf))
+                if pos == len(pool):
+                    uncovered.append(piece)
+                    continue
+                length, rid = pool.pop(pos)
+                origin = offcut_of.get(rid, rid)
+                if rid > 0:
+                    used.append(rid)
+                out_cuts.append(Cut(sku, piece, "remnant", origin))
+                rest = round(max(0.0, length - piece - kerf), 4)
+                if rest > 0:
+                    tag = -len(offcut_of) - 1
+                    offcut_of[tag] = origin
+                    insort(pool, (rest, tag))
+            leftovers += [(sku, length) for length, rid in pool
+                          if rid < 0 and length >= min_length]
+
+            if uncovered:
+                record = catalog.get(sku)
+                if record is None:
+                    unfillable += [(sku, piece) for piece in uncovered]
+                    continue
+                sticks = self._pack(sku, uncovered, float(record.length_inches), kerf,
+                                    out_cuts, unfillable)
+                leftovers += [(sku, rest) for rest in sticks if rest >= min_length]
+                if sticks:
+                    buy[sku] = {"designation": record.designation, "sticks": len(sticks),
+                                "stick_length_in": record.length_inches,
+                                "price": record.price,
+                                "cost": round(len(sticks) * record.price, 2)}
+        return Plan(out_cuts, used, leftovers, buy, unfillable)
+
+    @staticmethod
+    def _pack(sku: str, pieces: List[float], stick: float, kerf: float,
+              out_cuts: List[Cut], unfillable: List[Tuple[str, float]]) -> List[float]:
+        """Best-fit decreasing into new sticks; returns what is left of each"""
+        open_sticks: List[Tuple[float, int]] = []   # (remaining, stick number), sorted
+        remaining: List[float] = []
+        for piece in pieces:
+            if piece > stick:
+                unfillable.append((sku, piece))
+                continue
+            pos = bisect_left(open_sticks, (piece, -math.inf))
+            if pos < len(open_sticks):
+                rest, number = open_sticks.pop(pos)
+            else:
+                number = len(remaining)
+                rest = stick
+                remaining.append(stick)
+            out_cuts.append(Cut(sku, piece, "new", number + 1))
+            rest = round(max(0.0, rest - piece - kerf), 4)
+            remaining[number] = rest
+            if rest > 0:
+                insort(open_sticks, (rest, number))
+        return remaining
+
+    def apply(self, plan: Plan, location: str = "") -> List[Remnant]:
+        """Take the used remnants out and put the leftovers in; returns the new ones"""
+        for rid in plan.used:
+            self.remove(rid)
+        return [self.add(sku, length, location) for sku, length in plan.leftovers]
+
+
+def read_cut_list(path: str) -> List[Tuple[str, float]]:
+    with open(path, 'r') as f:
+        items = json.load(f)
+    cuts = []
+    for item in items:
+        cuts += [(str(item['sku']), float(item['length_in']))] * int(item.get('qty', 1))
+    return cuts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Remnant inventory and cut list planning")
+    parser.add_argument("--inventory", default=DEFAULT_INVENTORY)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("add", help="record remnants")
+    p.add_argument("sku")
+    p.add_argument("length", type=float, help="inches")
+    p.add_argument("--qty", type=int, default=1)
+    p.add_argument("--location", default="")
+    p = sub.add_parser("remove", help="take remnants off the racks by id")
+    p.add_argument("ids", type=int, nargs='+')
+    p = sub.add_parser("list", help="print remnants as JSON lines")
+    p.add_argument("--sku")
+    p = sub.add_parser("plan", help="cover a cut list from remnants, then new stock")
+    p.add_argument("cut_list")
+    p.add_argument("--data", default="data/profile_data.json")
+    p.add_argument("--kerf", type=float, default=DEFAULT_KERF)
+    p.add_argument("--min-length", type=float, default=DEFAULT_MIN_LENGTH,
+                   help="shortest leftover kept as a remnant")
+    p.add_argument("--commit", action="store_true",
+                   help="update the inventory with used remnants and leftovers")
+    p.add_argument("--location", default="", help="rack for leftovers when committing")
+    args = parser.parse_args(argv)
+
+    inventory = RemnantInventory(args.inventory)
+    if args.command == "add":
+        for _ in range(args.qty):
+            print(json.dumps(inventory.add(args.sku, args.length, args.location)._asdict()))
+        inventory.save()
+    elif args.command == "remove":
+        for rid in args.ids:
+            try:
+                inventory.remove(rid)
+            except KeyError:
+                print(f"No remnant {rid}")
+                return 1
+        inventory.save()
+    elif args.command == "list":
+        for remnant in sorted(inventory.remnants.values(), key=lambda r: (r.sku, r.length_in)):
+            if args.sku is None or remnant.sku == args.sku:
+                print(json.dumps(remnant._asdict()))
+    else:
+        catalog = {r.sku: r for r in load_catalog(args.data).records()}
+        plan = inventory.plan(read_cut_list(args.cut_list), catalog, args.kerf, args.min_length)
+        print(json.dumps(plan.to_dict(), indent=2))
+        from_stock = sum(1 for c in plan.cuts if c.source == "remnant")
+        print(f"{from_stock} of {len(plan.cuts)} cuts from {len(plan.used)} remnants; "
+              f"buy {sum(b['sticks'] for b in plan.buy.values())} sticks for ${plan.cost:,.2f}",
+              file=sys.stderr)
+        if plan.unfillable:
+            print(f"{len(plan.unfillable)} cuts longer than any stick or for unknown SKUs",
+                  file=sys.stderr)
+        if args.commit:
+            inventory.apply(plan, args.location)
+            inventory.save()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
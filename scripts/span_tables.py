@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Precomputed span and load capacity tables.
+
+Section properties (A, Ix, Sx, r_min) are computed from the catalog
+dimensions with square-corner approximations (fillets and corner radii are
+ignored). Ix and Sx are about the strong axis: beams and channels on their
+depth, rectangular tubes with the long side vertical, angles about the
+horizontal geometric axis. With `yield_psi` and `modulus_psi` from the
+materials table, the engine evaluates, as NumPy grids over spans x profiles:
+
+  * allowable uniform load for bending, simply supported and fully braced:
+    M = Fy * Sx / 1.67 (ASD), w = 8 M / L^2
+  * uniform load at the L/240 and L/360 deflection limits:
+    w = 384 E I / (5 L^3 * limit)
+  * allowable axial compression for an unbraced length, AISC 360 E3
+    flexural buckling with K = 1, P = Fcr * Ae / 1.67
+
+Local buckling follows AISC 360-16 (square-corner flat widths, HSS walls
+b = B - 3t). In compression, slender walls, legs, flanges and webs use the
+E7 effective width, so Ae < A. In bending:
+  * HSS compression flanges past 1.40 sqrt(E/Fy) use the F7 effective width
+    (Fy * Se).
+  * Angle legs are reduced per F10.3.
+  * I-shape and channel flanges are reduced per F3 (noncompact and slender).
+Sections whose webs are slender in bending are left out of the bending
+grid (NaN). The per-profile `slender` column marks sections with any
+element slender in uniform compression at Fy.
+
+The formulas are AISC 360-16 ASD (Omega = 1.67) and cover carbon steel
+only: the steel_* materials (A36, A500 Gr. B, A992). Aluminum is designed to
+the Aluminum Design Manual, and stainless to AISC Design Guide 27, which
+use other buckling curves and safety factors. Their grids are still
+computed, but `covered` is False for them, and queries leave them out
+unless asked for (--all-materials).
+
+Uniform loads are net of member self weight, in lb/ft. Grids are cached as
+.npz keyed by a hash of the catalog file and the span grid, so interactive
+queries ("what fits a 12 ft span at 500 plf") are table lookups.
+"""
+
+import argparse
+import hashlib
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from profile_records import (AngleRecord, BeamRecord, ChannelRecord, ProfileRecord,
+                             RectangularTubeRecord, SquareTubeRecord, load_catalog)
+
+OMEGA_BENDING = 1.67
+OMEGA_COMPRESSION = 1.67
+DEFAULT_SPANS_FT = np.arange(1.0, 40.5, 0.5)
+DEFLECTION_LIMITS = (240, 360)
+TABLE_FORMAT = 3
+# Material keys the AISC 360 steel formulas apply to
+COVERED_MATERIAL_PREFIX = 'steel_'
+
+
+def _column(records: List[ProfileRecord], name: str) -> np.ndarray:
+    return np.array([getattr(r, name) for r in records], dtype=np.float64)
+
+
+def _tube_properties(width, height, t):
+    """Hollow rectangle with wall t, bending about its strong axis: the
+    longer side is the depth h, whichever way the catalog lists the sides"""
+    b, h = np.minimum(width, height), np.maximum(width, height)
+    bi, hi = b - 2 * t, h - 2 * t
+    area = b * h - bi * hi
+    ix = (b * h ** 3 - bi * hi ** 3) / 12
+    iy = (h * b ** 3 - hi * bi ** 3) / 12
+    return area, ix, ix / (h / 2), np.minimum(ix, iy)
+
+
+def _angle_properties(a, b, t):
+    """Horizontal leg a, vertical leg b, thickness t, heel at the origin.
+    Bending about the horizontal geometric axis; buckling about the minor
+    principal axis."""
+    # Horizontal leg a x t and vertical leg t x (b - t)
+    a1, x1, y1 = a * t, a / 2, t / 2
+    a2, x2, y2 = t * (b - t), t / 2, t + (b - t) / 2
+    area = a1 + a2
+    xc = (a1 * x1 + a2 * x2) / area
+    yc = (a1 * y1 + a2 * y2) / area
+    ix = (a * t ** 3 / 12 + a1 * (y1 - yc) ** 2
+          + t * (b - t) ** 3 / 12 + a2 * (y2 - yc) ** 2)
+    iy = (t * a ** 3 / 12 + a1 * (x1 - xc) ** 2
+          + (b - t) * t ** 3 / 12 + a2 * (x2 - xc) ** 2)
+    ixy = a1 * (x1 - xc) * (y1 - yc) + a2 * (x2 - xc) * (y2 - yc)
+    i_min = (ix + iy) / 2 - np.sqrt(((ix - iy) / 2) ** 2 + ixy ** 2)
+    sx = ix / np.maximum(yc, b - yc)
+    return area, ix, sx, i_min
+
+
+def _i_shape_properties(d, bf, tw, tf):
+    """Doubly symmetric I (W and S shapes), strong axis bending"""
+    hw = d - 2 * tf
+    area = 2 * bf * tf + hw * tw
+    ix = (bf * d ** 3 - (bf - tw) * hw ** 3) / 12
+    iy = 2 * tf * bf ** 3 / 12 + hw * tw ** 3 / 12
+    return area, ix, ix / (d / 2), np.minimum(ix, iy)
+
+
+def _channel_properties(d, bf, tw, tf):
+    """Channel, strong axis bending; weak axis about its own centroid"""
+    hw = d - 2 * tf
+    af, aw = bf * tf, hw * tw
+    area = 2 * af + aw
+    ix = (bf * d ** 3 - (bf - tw) * hw ** 3) / 12
+    xc = (2 * af * bf / 2 + aw * tw / 2) / area
+    iy = (2 * (tf * bf ** 3 / 12 + af * (bf / 2 - xc) ** 2)
+          + hw * tw ** 3 / 12 + aw * (tw / 2 - xc) ** 2)
+    return area, ix, ix / (d / 2), np.minimum(ix, iy)
+
+
+def section_properties(records: List[ProfileRecord]) -> Dict[str, np.ndarray]:
+    """Vectorised A, Ix, Sx and r_min for records in the given order"""
+    n = len(records)
+    props = {key: np.zeros(n) for key in ('area', 'ix', 'sx', 'i_min')}
+
+    groups: Dict[type, List[int]] = {}
+    for i, record in enumerate(records):
+        groups.setdefault(type(record), []).append(i)
+
+    for cls, idx in groups.items():
+        subset = [records[i] for i in idx]
+        if cls is AngleRecord:
+            values = _angle_properties(_column(subset, 'leg_a_in'), _column(subset, 'leg_b_in'),
+                                       _column(subset, 'thickness_in'))
+        elif cls in (SquareTubeRecord, RectangularTubeRecord):
+            values = _tube_properties(_column(subset, 'outer_width_in'),
+                                      _column(subset, 'outer_height_in'),
+                                      _column(subset, 'wall_thickness_in'))
+        elif cls in (BeamRecord, ChannelRecord):
+            shape = _i_shape_properties if cls is BeamRecord else _channel_properties
+            values = shape(_column(subset, 'depth_in'), _column(subset, 'flange_width_in'),
+                           _column(subset, 'web_thickness_in'),
+                           _column(subset, 'flange_thickness_in'))
+        else:
+            raise TypeError(f"no section properties for {cls.__name__}")
+        for key, value in zip(('area', 'ix', 'sx', 'i_min'), values):
+            props[key][idx] = value
+
+    props['r_min'] = np.sqrt(props['i_min'] / props['area'])
+    return props
+
+
+def _elements(records: List[ProfileRecord]) -> Dict[str, np.ndarray]:
+    """Plate elements for local buckling, as (2, n) arrays: width, thickness,
+    count in the section, and the AISC Table B4.1a lambda_r coefficient with
+    the Table E7.1 c1, c2 for each. Also the flexure inputs per profile."""
+    n = len(records)
+    el = {key: np.zeros((2, n)) for key in ('width', 'thick', 'count', 'lam_r', 'c1', 'c2')}
+    flex = {key: np.zeros(n) for key in ('flange_w', 'flange_t', 'web_h', 'web_t')}
+    kind = np.empty(n, dtype=object)
+
+    for i, r in enumerate(records):
+        if isinstance(r, AngleRecord):
+            # Unstiffened legs; the vertical leg b takes the bending stress
+            legs = (r.leg_a_in, r.leg_b_in)
+            rows = [(leg, r.thickness_in, 1, 0.45, 0.22, 1.49) for leg in legs]
+            kind[i] = 'angle'
+            flex['flange_w'][i], flex['flange_t'][i] = r.leg_b_in, r.thickness_in
+        elif isinstance(r, (SquareTubeRecord, RectangularTubeRecord)):
+            t = r.wall_thickness_in
+            short = min(r.outer_width_in, r.outer_height_in) - 3 * t
+            long = max(r.outer_width_in, r.outer_height_in) - 3 * t
+            rows = [(short, t, 2, 1.40, 0.20, 1.38), (long, t, 2, 1.40, 0.20, 1.38)]
+            kind[i] = 'tube'
+            flex['flange_w'][i], flex['flange_t'][i] = short, t
+            flex['web_h'][i], flex['web_t'][i] = long, t
+        else:
+            # Flange halves of an I (4), whole flanges of a channel (2); web
+            channel = isinstance(r, ChannelRecord)
+            b = r.flange_width_in if channel else r.flange_width_in / 2
+            h = r.depth_in - 2 * r.flange_thickness_in
+            rows = [(b, r.flange_thickness_in, 2 if channel else 4, 0.56, 0.22, 1.49),
+                    (h, r.web_thickness_in, 1, 1.49, 0.18, 1.31)]
+            kind[i] = 'channel' if channel else 'i_shape'
+            flex['flange_w'][i], flex['flange_t'][i] = b, r.flange_thickness_in
+            flex['web_h'][i], flex['web_t'][i] = h, r.web_thickness_in
+        for j, row in enumerate(rows):
+            for key, value in zip(('width', 'thick', 'count', 'lam_r', 'c1', 'c2'), row):
+                el[key][j, i] = value
+    el.update(flex)
+    el['kind'] = kind
+    return el
+
+
+def _effective_area(area, el, fy, e, fcr):
+    """AISC 360-16 E7: gross area less the ineffective width of each slender
+    element at the stress fcr (n_spans, n)"""
+    ae = np.broadcast_to(area, fcr.shape).copy()
+    for j in range(2):
+        w, t = el['width'][j], el['thick'][j]
+        lam = w / t
+        lam_r = el['lam_r'][j] * np.sqrt(e / fy)
+        ratio = np.sqrt((el['c2'][j] * lam_r / lam) ** 2 * fy / fcr)     # sqrt(Fel / Fcr)
+        be = np.minimum(w, w * (1 - el['c1'][j] * ratio) * ratio)
+        slender = lam > lam_r * np.sqrt(fy / fcr)
+        ae -= np.where(slender, el['count'][j] * (w - be) * t, 0.0)
+    return ae
+
+
+def _bending_strength(props, el, fy, e):
+    """Nominal moment with local buckling, on the Fy * Sx basis the tables use
+    (compact sections keep Fy * Sx; plastic reserve is not counted)"""
+    sx, ix = props['sx'], props['ix']
+    root = np.sqrt(e / fy)
+    lam = el['flange_w'] / el['flange_t']
+    kind = el['kind']
+    mn = fy * sx
+
+    # HSS (F7-2 and F7-3): effective compression flange width
+    tube = kind == 'tube'
+    if tube.any():
+        t = el['flange_t']
+        be = np.minimum(el['flange_w'], 1.92 * t * root * (1 - 0.38 / lam * root))
+        lost = np.where(tube & (lam > 1.40 * root), (el['flange_w'] - be) * t, 0.0)
+        h = el['web_h'] + 3 * t                 # outer depth
+        area = props['area']
+        y = (area * h / 2 - lost * (h - t / 2)) / (area - lost)
+        i_eff = ix + area * (h / 2 - y) ** 2 - lost * (h - t / 2 - y) ** 2
+        mn = np.where(lost > 0, fy * i_eff / (h - y), mn)
+
+    # Angles (F10-6, F10-7): leg local buckling
+    angle = kind == 'angle'
+    factor = np.where(lam <= 0.54 * root, 1.0,
+                      np.where(lam <= 0.91 * root,
+                               np.minimum(1.0, 2.43 - 1.72 * lam / root),
+                               0.71 * e / (lam ** 2 * fy)))
+    mn = np.where(angle, mn * factor, mn)
+
+    # I-shapes and channels (F3): flange local buckling
+    shape = (kind == 'i_shape') | (kind == 'channel')
+    if shape.any():
+        lam_p, lam_r = 0.38 * root, 1.0 * root
+        d = el['web_h'] + 2 * el['flange_t']
+        bf = np.where(kind == 'channel', el['flange_w'], 2 * el['flange_w'])
+        zx = bf * el['flange_t'] * (d - el['flange_t']) + el['web_t'] * el['web_h'] ** 2 / 4
+        mp = fy * zx
+        noncompact = mp - (mp - 0.7 * fy * sx) * (lam - lam_p) / (lam_r - lam_p)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            kc = np.clip(4 / np.sqrt(el['web_h'] / el['web_t']), 0.35, 0.76)
+            slender = 0.9 * e * kc * sx / lam ** 2
+        reduced = np.where(lam <= lam_r, np.minimum(mn, noncompact), slender)
+        mn = np.where(shape & (lam > lam_p), reduced, mn)
+
+    # Webs slender in flexure are outside the F3/F7 cases used here
+    with np.errstate(invalid='ignore', divide='ignore'):
+        web_lam = np.where(el['web_t'] > 0, el['web_h'] / el['web_t'], 0.0)
+    return np.where(web_lam > 5.70 * root, np.nan, mn)
+
+
+def compute_tables(records: List[ProfileRecord], materials: Dict[str, Dict],
+                   spans_ft: np.ndarray = DEFAULT_SPANS_FT) -> Dict[str, np.ndarray]:
+    """(n_spans, n_profiles) capacity grids plus the per-profile columns"""
+    props = section_properties(records)
+    fy = np.array([materials[r.material]['yield_psi'] for r in records], dtype=np.float64)
+    e = np.array([materials[r.material]['modulus_psi'] for r in records], dtype=np.float64)
+    self_weight = _column(records, 'weight_per_ft')
+
+    span_in = (np.asarray(spans_ft, dtype=np.float64) * 12.0)[:, np.newaxis]
+
+    el = _elements(records)
+
+    # Bending: lb/in -> lb/ft, less self weight
+    m_allow = _bending_strength(props, el, fy, e) / OMEGA_BENDING
+    tables = {'w_bending': 8 * m_allow / span_in ** 2 * 12 - self_weight}
+    for limit in DEFLECTION_LIMITS:
+        w = 384 * e * props['ix'] / (5 * span_in ** 3 * limit) * 12 - self_weight
+        tables[f'w_l{limit}'] = w
+
+    # Axial: AISC 360 E3 flexural buckling, unbraced length = span
+    slenderness = span_in / props['r_min']
+    fe = np.pi ** 2 * e / slenderness ** 2
+    inelastic = slenderness <= 4.71 * np.sqrt(e / fy)
+    fcr = np.where(inelastic, 0.658 ** (fy / fe) * fy, 0.877 * fe)
+    tables['p_axial'] = fcr * _effective_area(props['area'], el, fy, e, fcr) / OMEGA_COMPRESSION
+    tables['slenderness'] = slenderness
+    lam = el['width'] / el['thick']
+    tables['slender'] = (lam > el['lam_r'] * np.sqrt(e / fy)).any(axis=0)
+    tables['covered'] = np.array([r.material.startswith(COVERED_MATERIAL_PREFIX)
+                                  for r in records])
+
+    tables.update({
+        'spans_ft': np.asarray(spans_ft, dtype=np.float64),
+        'skus': np.array([r.sku for r in records]),
+        'designations': np.array([r.designation for r in records]),
+        'categories': np.array([r.category for r in records]),
+        'weight_per_ft': self_weight,
+        'area': props['area'], 'ix': props['ix'], 'sx': props['sx'], 'r_min': props['r_min'],
+    })
+    return tables
+
+
+class SpanTables:
+    """Cached capacity grids with table-lookup queries"""
+
+    def __init__(self, tables: Dict[str, np.ndarray]):
+        self.tables = tables
+        self.spans_ft = tables['spans_ft']
+
+    @classmethod
+    def load(cls, data_path: str = "data/profile_data.json",
+             cache_dir: Optional[str] = "data/cache",
+             spans_ft: np.ndarray = DEFAULT_SPANS_FT) -> "SpanTables":
+        """Load tables for this catalog version from cache, computing them on a miss"""
+        spans_ft = np.asarray(spans_ft, dtype=np.float64)
+        key = hashlib.sha1()
+        with open(data_path, 'rb') as f:
+            key.update(f.read())
+        key.update(spans_ft.tobytes())
+        key.update(f"format={TABLE_FORMAT}".encode())
+        cache_path = os.path.join(cache_dir, f"span_tables-{key.hexdigest()[:16]}.npz") if cache_dir else None
+
+        if cache_path and os.path.exists(cache_path):
+            with np.load(cache_path, allow_pickle=False) as npz:
+                return cls({name: npz[name] for name in npz.files})
+
+        catalog = load_catalog(data_path)
+        tables = compute_tables(catalog.records(), catalog.materials, spans_ft)
+        if cache_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = cache_path + '.tmp.npz'
+            np.savez_compressed(tmp, **tables)
+            os.replace(tmp, cache_path)
+        return cls(tables)
+
+    def _span_row(self, span_ft: float) -> int:
+        """Row for the smallest tabulated span >= span_ft (conservative)"""
+        row = int(np.searchsorted(self.spans_ft, span_ft - 1e-9))
+        if row >= len(self.spans_ft):
+            raise ValueError(f"span {span_ft} ft is beyond the table ({self.spans_ft[-1]} ft)")
+        return row
+
+    def _select(self, ok: np.ndarray, category: Optional[str], all_materials: bool,
+                limit: int) -> np.ndarray:
+        """Lightest `limit` indices passing ok and the category/material filters"""
+        t = self.tables
+        if category is not None:
+            ok &= t['categories'] == category
+        if not all_materials:
+            ok &= t['covered']
+        idx = np.flatnonzero(ok)
+        return idx[np.argsort(t['weight_per_ft'][idx], kind='stable')][:limit]
+
+    def _row(self, i: int) -> Dict:
+        t = self.tables
+        return {"sku": str(t['skus'][i]), "designation": str(t['designations'][i]),
+                "category": str(t['categories'][i]),
+                "weight_per_ft": float(t['weight_per_ft'][i]),
+                "slender": bool(t['slender'][i])}
+
+    def beams_for(self, span_ft: float, load_plf: float, deflection: Optional[int] = 360,
+                  category: Optional[str] = None, limit: int = 10,
+                  all_materials: bool = False) -> List[Dict]:
+        """Lightest members carrying load_plf (net of self weight) over span_ft.
+        Only steel unless all_materials (see the module docstring)."""
+        t = self.tables
+        row = self._span_row(span_ft)
+        capacity = t['w_bending'][row]
+        if deflection is not None:
+            capacity = np.minimum(capacity, t[f'w_l{deflection}'][row])
+        idx = self._select(capacity >= load_plf, category, all_materials, limit)
+        return [dict(self._row(i), capacity_plf=round(float(capacity[i]), 1)) for i in idx]
+
+    def columns_for(self, height_ft: float, load_lb: float,
+                    category: Optional[str] = None, limit: int = 10,
+                    all_materials: bool = False) -> List[Dict]:
+        """Lightest members carrying an axial load over an unbraced height.
+        Only steel unless all_materials (see the module docstring)."""
+        t = self.tables
+        row = self._span_row(height_ft)
+        capacity = t['p_axial'][row]
+        idx = self._select(capacity >= load_lb, category, all_materials, limit)
+        return [dict(self._row(i), capacity_lb=round(float(capacity[i]), 0),
+                     kl_r=round(float(t['slenderness'][row, i]), 1)) for i in idx]
+
+
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--data", default="data/profile_data.json")
+    common.add_argument("--cache-dir", default="data/cache")
+    common.add_argument("--category")
+    common.add_argument("--limit", type=int, default=10)
+    common.add_argument("--all-materials", action="store_true",
+                        help="include aluminum and stainless (steel formulas, not their specs)")
+
+    parser = argparse.ArgumentParser(description="Span and load capacity lookups")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("beam", parents=[common],
+                       help="members for a uniform load over a simple span")
+    p.add_argument("span_ft", type=float)
+    p.add_argument("load_plf", type=float)
+    p.add_argument("--deflection", type=int, choices=DEFLECTION_LIMITS + (0,), default=360,
+                   help="L/x deflection limit, 0 for strength only")
+
+    p = sub.add_parser("column", parents=[common],
+                       help="members for an axial load over an unbraced height")
+    p.add_argument("height_ft", type=float)
+    p.add_argument("load_lb", type=float)
+
+    args = parser.parse_args(argv)
+    tables = SpanTables.load(args.data, args.cache_dir)
+    length = args.span_ft if args.command == "beam" else args.height_ft
+    if length > tables.spans_ft[-1]:
+        parser.error(f"{length} ft is beyond the tabulated spans (max {tables.spans_ft[-1]:g} ft)")
+
+    if args.command == "beam":
+        rows = tables.beams_for(args.span_ft, args.load_plf, args.deflection or None,
+                                args.category, args.limit, args.all_materials)
+        unit = "capacity_plf"
+    else:
+        rows = tables.columns_for(args.height_ft, args.load_lb, args.category, args.limit,
+                                  args.all_materials)
+        unit = "capacity_lb"
+    for row in rows:
+        print(f"{row['designation']:<20} {row['sku']:>6}  {row['weight_per_ft']:>8.2f} lb/ft"
+              f"  {row[unit]:>12,.0f} {unit.split('_')[1]}"
+              + ("  (slender elements)" if row['slender'] else ""))
+    if not rows:
+        print("No profile in the catalog meets that requirement")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Static, sharded catalog for tablets and the web estimator.
+
+Instead of downloading the whole profile_data.json, a client fetches:
+
+  1. manifest.json - small, fixed name, revalidated on every session. Lists
+     the shards and holds the SKU index as runs of sorted SKUs that live in
+     the same shard ([first_sku, shard], ...), so finding a SKU's shard is a
+     binary search over a few dozen entries.
+  2. the shard - one category (family + material), split every
+     --max-records records, minified as {"fields": [...], "rows": [[...]]}.
+
+Every other file name carries a content hash (steel_angle.3f2a9c1b7d4e.json)
+and can be served with a year-long immutable cache. Each file is also written
+pre-compressed as .gz, and as .br when the brotli package is installed.
+dims.<hash>.json holds, per category, the key dimensions sorted ascending
+with the SKU and shard of each row, for size lookups without the shards.
+
+The manifest is replaced last and atomically; hashed files referenced by the
+previous manifest are kept so clients mid-session can still fetch them.
+
+    python scripts/static_catalog.py build --out output/static
+    python scripts/static_catalog.py lookup 00230 --out output/static
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from profile_records import CatalogError, parse_catalog, record_class
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+# Key dimensions for the sorted lookup index, by record family
+DIMENSION_KEYS = {
+    'angle': ('leg_a_in', 'leg_b_in', 'thickness_in'),
+    'square_tube': ('outer_dim_in', 'wall_thickness_in'),
+    'rectangular_tube': ('outer_width_in', 'outer_height_in', 'wall_thickness_in'),
+    'beam': ('depth_in', 'weight_per_ft'),
+    'channel': ('depth_in', 'weight_per_ft'),
+}
+_HASHED = re.compile(r'^[\w.-]+\.[0-9a-f]{12}\.json(\.gz|\.br)?$')
+
+
+def minify(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(',', ':'), sort_keys=True,
+                      ensure_ascii=False).encode('utf-8')
+
+
+def _write(path: str, payload: bytes) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+
+def write_encoded(out_dir: str, name: str, payload: bytes) -> Dict[str, int]:
+    """Write name plus .gz (and .br) copies; sizes by encoding.
+    Hashed names are immutable, so existing files are left alone."""
+    path = os.path.join(out_dir, name)
+    encodings = [('identity', path, lambda b: b),
+                 ('gzip', path + ".gz", lambda b: gzip.compress(b, 9, mtime=0))]
+    if brotli is not None:
+        encodings.append(('br', path + ".br", lambda b: brotli.compress(b, quality=11)))
+
+    sizes = {}
+    immutable = _HASHED.match(name) is not None
+    for encoding, target, encode in encodings:
+        if immutable and os.path.exists(target):
+            sizes[encoding] = os.path.getsize(target)
+            continue
+        data = encode(payload)
+        _write(target, data)
+        sizes[encoding] = len(data)
+    return sizes
+
+
+def hashed_name(stem: str, payload: bytes) -> str:
+    return f"{stem}.{hashlib.sha256(payload).hexdigest()[:12]}.json"
+
+
+def _shard_payload(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    fields = sorted({key for item in items for key in item})
+    return {"fields": fields, "rows": [[item.get(f) for f in fields] for item in items]}
+
+
+def sku_runs(sku_shards: Sequence[Tuple[str, int]]) -> List[List[Any]]:
+    """Collapse (sku, shard) pairs into [first_sku, shard] runs in SKU order"""
+    runs: List[List[Any]] = []
+    for sku, shard in sorted(sku_shards):
+        if not runs or runs[-1][1] != shard:
+            runs.append([sku, shard])
+    return runs
+
+
+def build_static(data: Dict[str, Any], out_dir: str, max_records: int = 2000) -> Dict[str, Any]:
+    """Write shards, dimension index and manifest for a decoded catalog.
+    Returns the manifest."""
+    catalog = parse_catalog(data)
+    if catalog.problems:
+        raise CatalogError(catalog.problems)
+    os.makedirs(out_dir, exist_ok=True)
+    valid = {r.sku for r in catalog.records()}
+
+    shards: List[Dict[str, Any]] = []
+    sku_shards: List[Tuple[str, int]] = []
+    dims: Dict[str, Dict[str, Any]] = {}
+    for category in sorted(data.get('profiles', {})):
+        items = sorted((p for p in data['profiles'][category] if p.get('sku') in valid),
+                       key=lambda p: p['sku'])
+        if not items:
+            continue
+        family = record_class(category).FAMILY
+        keys = DIMENSION_KEYS[family]
+        rows = []
+        chunks = [items[i:i + max_records] for i in range(0, len(items), max_records)]
+        for part, chunk in enumerate(chunks):
+            payload = minify(_shard_payload(chunk))
+            stem = category if len(chunks) == 1 else f"{category}-{part + 1}"
+            name = hashed_name(stem, payload)
+            index = len(shards)
+            shards.append({
+                "file": name, "category": category, "family": family,
+                "materials": sorted({p['material'] for p in chunk}),
+                "records": len(chunk), "first_sku": chunk[0]['sku'], "last_sku": chunk[-1]['sku'],
+                "bytes": write_encoded(out_dir, name, payload),
+            })
+            for item in chunk:
+                sku_shards.append((item['sku'], index))
+                rows.append([item[k] for k in keys] + [item['sku'], index])
+        rows.sort(key=lambda row: row[:len(keys)] + [row[-2]])
+        dims[category] = {"fields": list(keys) + ["sku", "shard"], "rows": rows}
+
+    dims_payload = minify(dims)
+    dims_name = hashed_name("dims", dims_payload)
+    dims_sizes = write_encoded(out_dir, dims_name, dims_payload)
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "catalog": data.get('metadata', {}),
+        "materials": catalog.materials,
+        "shards": shards,
+        "skus": sku_runs(sku_shards),
+        "dimensions": {"file": dims_name, "bytes": dims_sizes},
+        "encodings": ["gzip"] + (["br"] if brotli is not None else []),
+    }
+    manifest["version"] = hashlib.sha256(minify(manifest)).hexdigest()[:12]
+
+    previous = read_manifest(out_dir)
+    write_encoded(out_dir, MANIFEST, minify(manifest))
+    prune(out_dir, [manifest] + ([previous] if previous else []))
+    return manifest
+
+
+def _referenced(manifest: Dict[str, Any]) -> List[str]:
+    return [s['file'] for s in manifest.get('shards', [])] + [manifest['dimensions']['file']]
+
+
+def prune(out_dir: str, keep: Sequence[Dict[str, Any]]) -> int:
+    """Delete hashed files not referenced by any manifest in keep"""
+    live = {name for manifest in keep for name in _referenced(manifest)}
+    removed = 0
+    for name in os.listdir(out_dir):
+        match = _HASHED.match(name)
+        if match and name[:len(name) - len(match.group(1) or '')] not in live:
+            os.remove(os.path.join(out_dir, name))
+            removed += 1
+    return removed
+
+
+def read_manifest(out_dir: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(out_dir, MANIFEST), 'rb') as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def shard_for(manifest: Dict[str, Any], sku: str) -> Optional[int]:
+    """Shard index that would hold sku (the client side of the SKU index)"""
+    runs = manifest['skus']
+    pos = bisect_right([run[0] for run in runs], sku) - 1
+    if pos < 0:
+        return None
+    shard = runs[pos][1]
+    return shard if sku <= manifest['shards'][shard]['last_sku'] else None
+
+
+def lookup(out_dir: str, sku: str) -> Optional[Dict[str, Any]]:
+    """Find one record with the same two reads a static client makes"""
+    manifest = read_manifest(out_dir)
+    if manifest is None:
+        raise FileNotFoundError(os.path.join(out_dir, MANIFEST))
+    shard = shard_for(manifest, sku)
+    if shard is None:
+        return None
+    info = manifest['shards'][shard]
+    with open(os.path.join(out_dir, info['file']), 'rb') as f:
+        payload = json.loads(f.read())
+    sku_col = payload['fields'].index('sku')
+    for row in payload['rows']:
+        if row[sku_col] == sku:
+            record = {k: v for k, v in zip(payload['fields'], row) if v is not None}
+            return dict(record, category=info['category'])
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the static sharded catalog")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build", help="write shards, indexes and manifest")
+    p.add_argument("--data", default="data/profile_data.json")
+    p.add_argument("--out", default="output/static")
+    p.add_argument("--max-records", type=int, default=2000, help="records per shard")
+    p = sub.add_parser("lookup", help="find SKUs the way a client would")
+    p.add_argument("skus", nargs='+')
+    p.add_argument("--out", default="output/static")
+    args = parser.parse_args(argv)
+
+    if args.command == "lookup":
+        for sku in args.skus:
+            print(json.dumps({"sku": sku, "record": lookup(args.out, sku)}))
+        return 0
+
+    with open(args.data, 'r') as f:
+        data = json.load(f)
+    try:
+        manifest = build_static(data, args.out, args.max_records)
+    except CatalogError as e:
+        print(e)
+        return 1
+    total = {}
+    for shard in manifest['shards']:
+        for encoding, size in shard['bytes'].items():
+            total[encoding] = total.get(encoding, 0) + size
+    sizes = ", ".join(f"{enc} {size / 1024:.1f} KB" for enc, size in total.items())
+    print(f"{len(manifest['shards'])} shards ({sizes}), "
+          f"{len(manifest['skus'])} SKU runs, version {manifest['version']} in {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
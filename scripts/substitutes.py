@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Nearest-substitute search over profile geometry and section properties.
+
+Each family (angles, tubes, I-shapes, channels) gets a KD-tree over a
+feature vector of its dimensions and section properties. The features are
+log-scaled (so ratios count, not inches) and z-scored within the family.
+A query returns the k nearest records that satisfy hard constraints:
+
+  * same material (by default)
+  * equal or better strength: Sx and area not below the original (by default)
+  * optional: no thinner wall, depth/width limits, any FIELD=LO:HI range
+
+The tree is plain NumPy: nodes are arrays of bounding boxes over contiguous
+slices of a permutation, searched best-first, with the constraint mask
+applied inside the leaves.
+
+    python scripts/substitutes.py 00230 00600 --k 3 --no-thinner
+    python scripts/substitutes.py --bom bom.json --max-depth 8
+"""
+
+import argparse
+import heapq
+import json
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from library_index import key_dimensions
+from profile_records import (AngleRecord, BeamRecord, Catalog, ChannelRecord, ProfileRecord,
+                             RectangularTubeRecord, SquareTubeRecord, load_catalog)
+from span_tables import section_properties
+
+FAMILY_OF = {AngleRecord: 'angle', SquareTubeRecord: 'tube', RectangularTubeRecord: 'tube',
+             BeamRecord: 'i_shape', ChannelRecord: 'channel'}
+
+# Columns used as the search vector for each family
+FEATURES = {
+    'angle': ('depth_in', 'width_in', 'wall_in', 'area', 'sx', 'r_min'),
+    'tube': ('depth_in', 'width_in', 'wall_in', 'area', 'ix', 'sx', 'r_min'),
+    'i_shape': ('depth_in', 'width_in', 'web_in', 'wall_in', 'area', 'ix', 'sx'),
+    'channel': ('depth_in', 'width_in', 'web_in', 'wall_in', 'area', 'ix', 'sx'),
+}
+# Checked against the original record when stronger=True
+STRENGTH_COLUMNS = ('sx', 'area')
+
+
+class KDTree:
+    """Static KD-tree over an (n, d) array; leaves hold up to leaf_size points"""
+
+    def __init__(self, points: np.ndarray, leaf_size: int = 16):
+        self.points = np.asarray(points, dtype=np.float64)
+        n, d = self.points.shape
+        self.perm = np.arange(n)
+        starts: List[int] = []
+        ends: List[int] = []
+        children: List[Tuple[int, int]] = []
+        lo: List[np.ndarray] = []
+        hi: List[np.ndarray] = []
+
+        def build(start: int, end: int) -> int:
+            node = len(starts)
+            block = self.points[self.perm[start:end]]
+            starts.append(start)
+            ends.append(end)
+            children.append((-1, -1))
+            lo.append(block.min(axis=0) if end > start else np.zeros(d))
+            hi.append(block.max(axis=0) if end > start else np.zeros(d))
+            if end - start > leaf_size:
+                axis = int(np.argmax(hi[node] - lo[node]))
+                order = np.argsort(block[:, axis], kind='stable')
+                self.perm[start:end] = self.perm[start:end][order]
+                mid = (start + end) // 2
+                left = build(start, mid)
+                right = build(mid, end)
+                children[node] = (left, right)
+            return node
+
+        build(0, n)
+        self.starts = np.array(starts)
+        self.ends = np.array(ends)
+        self.children = np.array(children)
+        self.lo = np.array(lo).reshape(-1, d)
+        self.hi = np.array(hi).reshape(-1, d)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _box_distance(self, node: int, x: np.ndarray) -> float:
+        gap = np.maximum(0.0, np.maximum(self.lo[node] - x, x - self.hi[node]))
+        return float(gap @ gap)
+
+    def query(self, x: np.ndarray, k: int = 1,
+              mask: Optional[np.ndarray] = None) -> List[Tuple[float, int]]:
+        """k nearest (distance, index) pairs to x among points where mask is
+        True, nearest first"""
+        x = np.asarray(x, dtype=np.float64)
+        best: List[Tuple[float, int]] = []   # max-heap via negated distances
+        frontier = [(self._box_distance(0, x), 0)] if len(self) else []
+        while frontier:
+            bound, node = heapq.heappop(frontier)
+            if len(best) == k and bound >= -best[0][0]:
+                break
+            left, right = self.children[node]
+            if left >= 0:
+                for child in (left, right):
+                    heapq.heappush(frontier, (self._box_distance(child, x), child))
+                continue
+            idx = self.perm[self.starts[node]:self.ends[node]]
+            if mask is not None:
+                idx = idx[mask[idx]]
+            if not len(idx):
+                continue
+            diff = self.points[idx] - x
+            for dist, i in zip(np.einsum('ij,ij->i', diff, diff), idx):
+                if len(best) < k:
+                    heapq.heappush(best, (-dist, int(i)))
+                elif dist < -best[0][0]:
+                    heapq.heapreplace(best, (-dist, int(i)))
+        return sorted((float(np.sqrt(-d)), i) for d, i in best)
+
+
+class _FamilyIndex:
+    def __init__(self, records: List[ProfileRecord], columns: Dict[str, np.ndarray],
+                 features: Sequence[str], leaf_size: int):
+        self.records = records
+        self.columns = columns
+        raw = np.log(np.column_stack([columns[f] for f in features]))
+        self.mean = raw.mean(axis=0)
+        std = raw.std(axis=0)
+        self.scale = np.where(std > 0, std, 1.0)
+        self.vectors = (raw - self.mean) / self.scale
+        self.tree = KDTree(self.vectors, leaf_size)
+
+
+class SubstituteIndex:
+    """Per-family KD-trees for constrained nearest-equivalent lookups"""
+
+    def __init__(self, catalog: Catalog, leaf_size: int = 16):
+        groups: Dict[str, List[ProfileRecord]] = {}
+        for record in catalog.records():
+            family = FAMILY_OF.get(type(record))
+            if family is not None:
+                groups.setdefault(family, []).append(record)
+
+        self.families: Dict[str, _FamilyIndex] = {}
+        self.locate: Dict[str, Tuple[str, int]] = {}
+        for family, records in groups.items():
+            props = section_properties(records)
+            dims = np.array([key_dimensions(r) for r in records], dtype=np.float64)
+            # Angles and tubes have one wall thickness, which is also the web
+            web = np.array([getattr(r, 'web_thickness_in', wall)
+                            for r, wall in zip(records, dims[:, 2])], dtype=np.float64)
+            columns = dict(props)
+            columns.update({
+                'depth_in': dims[:, 0], 'width_in': dims[:, 1],
+                'wall_in': dims[:, 2], 'web_in': web,
+                'weight_per_ft': np.array([r.weight_per_ft for r in records], dtype=np.float64),
+                'price': np.array([r.price for r in records], dtype=np.float64),
+            })
+            columns['material'] = np.array([r.material for r in records])
+            self.families[family] = _FamilyIndex(records, columns, FEATURES[family], leaf_size)
+            for i, record in enumerate(records):
+                self.locate[record.sku] = (family, i)
+
+    def _mask(self, index: _FamilyIndex, i: int, same_material: bool, stronger: bool,
+              no_thinner: bool, max_depth: Optional[float], max_width: Optional[float],
+              ranges: Sequence[Tuple[str, Optional[float], Optional[float]]]) -> np.ndarray:
+        cols = index.columns
+        mask = np.ones(len(index.records), dtype=bool)
+        mask[i] = False
+        if same_material:
+            mask &= cols['material'] == cols['material'][i]
+        if stronger:
+            for name in STRENGTH_COLUMNS:
+                # Tolerance for values rounded in the catalog
+                mask &= cols[name] >= cols[name][i] * (1 - 1e-9)
+        if no_thinner:
+            mask &= cols['wall_in'] >= cols['wall_in'][i] - 1e-9
+        if max_depth is not None:
+            mask &= cols['depth_in'] <= max_depth
+        if max_width is not None:
+            mask &= cols['width_in'] <= max_width
+        for field, lo, hi in ranges:
+            if field in cols:
+                values = cols[field]
+            else:
+                values = np.array([getattr(r, field, np.nan) for r in index.records],
+                                  dtype=np.float64)
+            if lo is not None:
+                mask &= values >= lo
+            if hi is not None:
+                mask &= values <= hi
+        return mask
+
+    def substitutes(self, sku: str, k: int = 5, same_material: bool = True,
+                    stronger: bool = True, no_thinner: bool = False,
+                    max_depth: Optional[float] = None, max_width: Optional[float] = None,
+                    ranges: Sequence[Tuple[str, Optional[float], Optional[float]]] = ()
+                    ) -> List[Dict]:
+        """Nearest k records to sku in its family that pass every constraint"""
+        if sku not in self.locate:
+            raise KeyError(f"unknown SKU {sku}")
+        family, i = self.locate[sku]
+        index = self.families[family]
+        mask = self._mask(index, i, same_material, stronger, no_thinner,
+                          max_depth, max_width, ranges)
+        cols = index.columns
+        results = []
+        for distance, j in index.tree.query(index.vectors[i], k, mask):
+            record = index.records[j]
+            results.append({
+                "sku": record.sku, "designation": record.designation,
+                "category": record.category, "distance": round(distance, 4),
+                "sx_ratio": round(float(cols['sx'][j] / cols['sx'][i]), 3),
+                "weight_ratio": round(float(cols['weight_per_ft'][j] / cols['weight_per_ft'][i]), 3),
+                "price": record.price,
+            })
+        return results
+
+    def substitutes_for(self, skus: Iterable[str], k: int = 5, **constraints) -> Dict[str, List[Dict]]:
+        """Batch lookup for a bill of materials; unknown SKUs map to []"""
+        return {sku: self.substitutes(sku, k, **constraints) if sku in self.locate else []
+                for sku in dict.fromkeys(skus)}
+
+
+def main(argv=None):
+    from profile_cli import parse_range
+
+    parser = argparse.ArgumentParser(description="Find the closest equivalent profiles")
+    parser.add_argument("skus", nargs='*', help="SKUs to replace")
+    parser.add_argument("--bom", help="JSON list of SKUs or {sku: quantity}")
+    parser.add_argument("--data", default="data/profile_data.json")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--any-material", action="store_true")
+    parser.add_argument("--any-strength", action="store_true",
+                        help="allow lower Sx or area than the original")
+    parser.add_argument("--no-thinner", action="store_true", help="wall at least the original's")
+    parser.add_argument("--max-depth", type=float)
+    parser.add_argument("--max-width", type=float)
+    parser.add_argument("--range", action="append", type=parse_range, metavar="FIELD=LO:HI")
+    args = parser.parse_args(argv)
+
+    skus = list(args.skus)
+    if args.bom:
+        with open(args.bom, 'r') as f:
+            skus += list(json.load(f))
+    if not skus:
+        parser.error("give SKUs or --bom")
+
+    index = SubstituteIndex(load_catalog(args.data))
+    results = index.substitutes_for(skus, args.k, same_material=not args.any_material,
+                                    stronger=not args.any_strength, no_thinner=args.no_thinner,
+                                    max_depth=args.max_depth, max_width=args.max_width,
+                                    ranges=args.range or ())
+    for sku, matches in results.items():
+        print(json.dumps({"sku": sku, "substitutes": matches}))
+
+
+if __name__ == "__main__":
+    main()
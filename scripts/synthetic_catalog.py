@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Synthetic catalogs at vendor-merge scale (50k-500k records) for benchmarks.
+
+Records are drawn from the real catalog's own distributions: categories in
+their real proportions, each record bootstrapped from a real record of the
+same category with its sizes jittered (log-normal, snapped to the catalog's
+1/8" steps), walls and thicknesses picked from the category's real values,
+and cost per pound perturbed around the real one. Area, weight and price are
+recomputed from the new geometry and the material density, and the derived
+radii come from the catalog's geometry rules, so every record validates and
+looks like a plausible size from another vendor.
+
+Designations are unique within a category and material: a record whose
+designation is taken is resampled a few times, and once the category's sizes
+run out (small categories saturate well before 50k records) it is kept with
+a variant mark, "L2x2x1/4 #2", as a merged catalog would list a second
+vendor's size.
+
+    python scripts/synthetic_catalog.py 50000 --out data/cache/synthetic-50k.json
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+from catalog_diff import write_canonical
+from designation_search import format_inches
+from geometry_rules import apply_rules
+from profile_records import record_class
+
+# Log-normal sigma for size jitter
+SIZE_SPREAD = 0.25
+PRICE_SPREAD = 0.08
+STEP = 0.125
+# Draws per record before a taken designation gets a variant mark
+RESAMPLES = 3
+# Defaults resolve against the repository, not the working directory
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TEMPLATE = os.path.join(REPO_ROOT, "data", "profile_data.json")
+
+
+def _snap(value: float, step: float = STEP, low: float = STEP) -> float:
+    return max(low, round(value / step) * step)
+
+
+def _last_dim(designation: str) -> str:
+    """Thickness or wall token of an L/HSS designation, without material suffix"""
+    base = designation.rsplit('-', 1)[0] if designation[-3:] in ('-AL', '-SS') else designation
+    return base.rsplit('x', 1)[-1]
+
+
+def _suffix(designation: str) -> str:
+    return designation[-3:] if designation[-3:] in ('-AL', '-SS') else ''
+
+
+class _CategoryModel:
+    """Sampling state for one real category"""
+
+    def __init__(self, category: str, items: List[Dict[str, Any]], density: Dict[str, float]):
+        self.category = category
+        self.items = items
+        self.family = record_class(category).FAMILY
+        self.density = density
+        wall_field = 'thickness_in' if self.family == 'angle' else 'wall_thickness_in'
+        self.walls: List[Tuple[float, str]] = []
+        if self.family in ('angle', 'square_tube', 'rectangular_tube'):
+            seen = {}
+            for p in items:
+                seen.setdefault(p[wall_field], _last_dim(p['designation']))
+            self.walls = sorted(seen.items())
+            self.wall_weights = [sum(1 for p in items if p[wall_field] == w) for w, _ in self.walls]
+
+    def _wall(self, rng: random.Random, limit: float) -> Tuple[float, str]:
+        choices = [(w, text, n) for (w, text), n in zip(self.walls, self.wall_weights) if w <= limit]
+        if not choices:
+            return self.walls[0]
+        w, text, _ = rng.choices(choices, weights=[n for _, _, n in choices])[0]
+        return w, text
+
+    def sample(self, rng: random.Random) -> Dict[str, Any]:
+        base = rng.choice(self.items)
+        jitter: Callable[[], float] = lambda: math.exp(rng.gauss(0.0, SIZE_SPREAD))
+        build = {'angle': self._angle, 'square_tube': self._tube,
+                 'rectangular_tube': self._tube}.get(self.family, self._shape)
+        profile, area = build(base, rng, jitter)
+
+        weight = area * self.density[base['material']] * 12
+        cost_per_lb = round(base['cost_per_lb'] * math.exp(rng.gauss(0.0, PRICE_SPREAD)), 2)
+        length = base['length_inches']
+        profile.update({
+            "area_in2": round(area, 3),
+            "weight_per_ft": round(weight, 3),
+            "length_inches": length,
+            "cost_per_lb": cost_per_lb,
+            "price": round(weight * length / 12 * cost_per_lb, 2),
+            "material": base['material'],
+        })
+        return profile
+
+    def _angle(self, base, rng, jitter):
+        a = _snap(base['leg_a_in'] * jitter())
+        b = a if base['leg_a_in'] == base['leg_b_in'] else _snap(base['leg_b_in'] * jitter())
+        a, b = max(a, b), min(a, b)
+        t, t_text = self._wall(rng, b / 3)
+        suffix = _suffix(base['designation'])
+        return {
+            "designation": f"L{format_inches(a)}x{format_inches(b)}x{t_text}{suffix}",
+            "size": f'{format_inches(a)}" x {format_inches(b)}"',
+            "leg_a_in": a, "leg_b_in": b, "thickness_in": t,
+        }, (a + b - t) * t
+
+    def _tube(self, base, rng, jitter):
+        square = self.family == 'square_tube'
+        width = _snap((base['outer_dim_in'] if square else base['outer_width_in']) * jitter())
+        height = width if square else _snap(base['outer_height_in'] * jitter())
+        t, t_text = self._wall(rng, min(width, height) / 5)
+        suffix = _suffix(base['designation'])
+        profile = {
+            "designation": f"HSS{format_inches(width)}x{format_inches(height)}x{t_text}{suffix}",
+            "size": f'{format_inches(width)}" x {format_inches(height)}"',
+            "wall_thickness_in": t,
+        }
+        if square:
+            profile["outer_dim_in"] = width
+        else:
+            profile.update({"outer_width_in": width, "outer_height_in": height})
+        return profile, 2 * t * (width + height - 2 * t)
+
+    def _shape(self, base, rng, jitter):
+        # Beams and channels scale as a whole so proportions stay realistic
+        s = jitter()
+        depth = _snap(base['depth_in'] * s)
+        tf = round(base['flange_thickness_in'] * s, 3)
+        tw = round(base['web_thickness_in'] * s, 3)
+        bf = round(base['flange_width_in'] * s, 3)
+        area = 2 * bf * tf + (depth - 2 * tf) * tw
+        weight = area * self.density[base['material']] * 12
+        # Nominal depth in the name, as in W12x58
+        prefix = re.match(r'[A-Z]+', base['designation']).group()
+        designation = f"{prefix}{round(depth)}x{round(weight, 1):g}"
+        profile = {
+            "designation": designation, "size": designation,
+            "depth_in": depth, "flange_width_in": bf,
+            "web_thickness_in": tw, "flange_thickness_in": tf,
+            "k_dimension_in": round(tf + (base['k_dimension_in'] - base['flange_thickness_in']) * s, 3),
+        }
+        if base.get('flange_slope_degrees') is not None:
+            profile["flange_slope_degrees"] = base['flange_slope_degrees']
+        return profile, area
+
+
+def synthesize(template: Dict[str, Any], size: int, seed: int = 0) -> Dict[str, Any]:
+    """Catalog of `size` records sampled from the template catalog"""
+    rng = random.Random(seed)
+    density = {k: v['density_lb_in3'] for k, v in template['materials'].items()}
+    models = [_CategoryModel(category, items, density)
+              for category, items in sorted(template['profiles'].items())
+              if items and record_class(category) is not None]
+    real_total = sum(len(m.items) for m in models)
+
+    profiles: Dict[str, List[Dict[str, Any]]] = {}
+    sku = 0
+    remaining = size
+    for pos, model in enumerate(models):
+        count = remaining if pos == len(models) - 1 else round(size * len(model.items) / real_total)
+        count = min(count, remaining)
+        remaining -= count
+        items = profiles[model.category] = []
+        taken: Dict[Tuple[str, str], int] = {}
+        for _ in range(count):
+            sku += 1
+            for _ in range(RESAMPLES):
+                record = model.sample(rng)
+                key = (record["material"], record["designation"])
+                if key not in taken:
+                    break
+            taken[key] = taken.get(key, 0) + 1
+            if taken[key] > 1:
+                record["designation"] += f" #{taken[key]}"
+            record["sku"] = f"{sku:07d}"
+            items.append(record)
+
+    data = {
+        "metadata": dict(template.get('metadata', {}), total_profiles=size,
+                         notes=f"Synthetic catalog (seed {seed}) sampled from "
+                               f"{real_total} real records"),
+        "geometry_standards": template.get('geometry_standards', {}),
+        "materials": template['materials'],
+        "profiles": profiles,
+    }
+    apply_rules(data)
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic catalog of a given size")
+    parser.add_argument("size", type=int)
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+
+    with open(args.template, 'r') as f:
+        template = json.load(f)
+    write_canonical(synthesize(template, args.size, args.seed), args.out)
+    print(f"Wrote {args.size} synthetic records to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
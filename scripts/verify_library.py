@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Read-back verification of a generated .sldlfp library against the catalog.
+
+Every catalog record with a builder is expected at
+<library>/<category>/<profile_filename>. A pool of readers opens the files
+read-only, and for each one reads back the sketch region area and all custom
+properties. These are compared with:
+
+  * the area of the exact outline from profile_geometry (tight tolerance;
+    catches wrong sketches such as a rectangular tube drawn square)
+  * the catalog area_in2 (loose tolerance; the catalog uses square corners)
+  * profile_properties(record), the properties generate_all writes
+    (numbers within a tolerance, text exactly; missing and unexpected names)
+
+Readers come from an injectable factory. The default, SolidWorksReader,
+starts its own SolidWorks process per worker (DispatchEx), so N workers read
+N files at once. Any object with read(path) -> (properties, area_in2) and
+close() works, which is how the check runs without SolidWorks.
+
+    python scripts/verify_library.py --library output --workers 4
+    python scripts/verify_library.py --library S:/weldment-profiles/library --sku 01806
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, Queue
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from generate_profiles import profile_properties
+from profile_geometry import outline_area, profile_outline
+from profile_records import ProfileRecord, load_catalog, profile_filename
+
+IN2_PER_M2 = 1 / 0.0254 ** 2
+
+SW_DOC_PART = 1
+SW_OPEN_SILENT_READONLY = 1 | 2     # swOpenDocOptions_Silent | _ReadOnly
+
+# Relative tolerances
+OUTLINE_TOLERANCE = 0.005
+CATALOG_AREA_TOLERANCE = 0.15
+PROPERTY_TOLERANCE = 1e-6
+
+
+class SolidWorksReader:
+    """Reads one file at a time through a private SolidWorks instance"""
+
+    def __init__(self):
+        import pythoncom
+        import win32com.client
+
+        pythoncom.CoInitialize()
+        self._pythoncom = pythoncom
+        self._client = win32com.client
+        # DispatchEx starts a separate process, so readers work in parallel
+        self.sw_app = win32com.client.DispatchEx("SldWorks.Application")
+        self.sw_app.Visible = False
+
+    def _long_ref(self):
+        return self._client.VARIANT(self._pythoncom.VT_BYREF | self._pythoncom.VT_I4, 0)
+
+    def read(self, path: str) -> Tuple[Dict[str, str], Optional[float]]:
+        errors, warnings = self._long_ref(), self._long_ref()
+        model = self.sw_app.OpenDoc6(path, SW_DOC_PART, SW_OPEN_SILENT_READONLY, "",
+                                     errors, warnings)
+        if model is None:
+            raise IOError(f"could not open (error {errors.value})")
+        try:
+            cpm = model.Extension.CustomPropertyManager("")
+            props = {name: cpm.Get(name) for name in (cpm.GetNames() or ())}
+            return props, self._sketch_area(model)
+        finally:
+            self.sw_app.CloseDoc(model.GetTitle())
+
+    def _sketch_area(self, model) -> Optional[float]:
+        feature = model.FirstFeature()
+        while feature is not None:
+            if feature.GetTypeName2() == "ProfileFeature":
+                sketch = feature.GetSpecificFeature2()
+                sections = self._client.VARIANT(
+                    self._pythoncom.VT_ARRAY | self._pythoncom.VT_DISPATCH, [sketch])
+                result = model.Extension.GetSectionProperties2(sections)
+                # [0] status (0 = success), [1] area in m^2
+                if result and result[0] == 0:
+                    return result[1] * IN2_PER_M2
+                return None
+            feature = feature.GetNextFeature()
+        return None
+
+    def close(self) -> None:
+        try:
+            self.sw_app.ExitApp()
+        finally:
+            self._pythoncom.CoUninitialize()
+
+
+def _same(expected: str, actual: str) -> bool:
+    if expected == actual:
+        return True
+    try:
+        a, b = float(expected), float(actual)
+    except (TypeError, ValueError):
+        return False
+    return abs(a - b) <= PROPERTY_TOLERANCE * max(1.0, abs(a))
+
+
+def compare(record: ProfileRecord, props: Dict[str, str], area: Optional[float],
+            outline_tol: float = OUTLINE_TOLERANCE,
+            catalog_tol: float = CATALOG_AREA_TOLERANCE) -> List[str]:
+    """Problems found in one file's read-back, empty if it matches"""
+    problems = []
+    expected = profile_properties(record)
+    for name, value in expected.items():
+        if name not in props:
+            problems.append(f"property {name} missing")
+        elif not _same(value, props[name]):
+            problems.append(f"property {name} is {props[name]!r}, catalog {value!r}")
+    for name in sorted(set(props) - set(expected)):
+        problems.append(f"unexpected property {name}")
+
+    if area is None:
+        problems.append("no sketch region")
+        return problems
+    exact = outline_area(profile_outline(record))
+    if abs(area - exact) > outline_tol * exact:
+        problems.append(f"sketch area {area:.4f} in2, outline {exact:.4f} in2")
+    if abs(area - record.area_in2) > catalog_tol * record.area_in2:
+        problems.append(f"sketch area {area:.4f} in2, catalog area_in2 {record.area_in2}")
+    return problems
+
+
+class LibraryVerifier:
+    """Runs compare() over a library with a pool of readers, one per thread.
+    A reader is opened, used and closed on the same worker thread, since a
+    COM object belongs to the apartment of the thread that created it."""
+
+    def __init__(self, library_root: str, reader_factory: Callable[[], Any] = SolidWorksReader,
+                 workers: int = 4, outline_tol: float = OUTLINE_TOLERANCE,
+                 catalog_tol: float = CATALOG_AREA_TOLERANCE):
+        self.library_root = library_root
+        self.reader_factory = reader_factory
+        self.workers = max(1, workers)
+        self.outline_tol = outline_tol
+        self.catalog_tol = catalog_tol
+
+    def _worker(self, jobs: "Queue[Tuple[int, Tuple[ProfileRecord, str]]]",
+                results: List[Optional[Dict[str, Any]]]) -> None:
+        """Check jobs until the queue is empty, then close this thread's reader"""
+        reader = None
+        try:
+            while True:
+                try:
+                    pos, (record, rel_path) = jobs.get_nowait()
+                except Empty:
+                    return
+                start = time.monotonic()
+                try:
+                    if reader is None:
+                        reader = self.reader_factory()
+                    props, area = reader.read(os.path.join(self.library_root, rel_path))
+                    problems = compare(record, props, area, self.outline_tol, self.catalog_tol)
+                except Exception as e:
+                    problems = [f"read failed: {e}"]
+                results[pos] = {"sku": record.sku, "designation": record.designation,
+                                "path": rel_path, "problems": problems,
+                                "seconds": round(time.monotonic() - start, 3)}
+        finally:
+            if reader is not None:
+                try:
+                    reader.close()
+                except Exception as e:
+                    print(f"Could not close {type(reader).__name__}: {e}", file=sys.stderr)
+
+    def verify(self, records: List[ProfileRecord]) -> Dict[str, Any]:
+        """Check every record that has a builder; returns the report"""
+        start = time.monotonic()
+        missing, jobs = [], []
+        for record in records:
+            if profile_outline(record) is None:
+                continue
+            rel_path = f"{record.category}/{profile_filename(record.designation)}"
+            if os.path.exists(os.path.join(self.library_root, rel_path)):
+                jobs.append((record, rel_path))
+            else:
+                missing.append({"sku": record.sku, "designation": record.designation,
+                                "path": rel_path})
+
+        queue: "Queue[Tuple[int, Tuple[ProfileRecord, str]]]" = Queue()
+        for item in enumerate(jobs):
+            queue.put(item)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="verify") as pool:
+            workers = [pool.submit(self._worker, queue, results)
+                       for _ in range(min(self.workers, len(jobs)))]
+            for worker in workers:
+                worker.result()
+
+        mismatches = [r for r in results if r["problems"]]
+        return {
+            "library": self.library_root,
+            "checked": len(results), "ok": len(results) - len(mismatches),
+            "mismatched": len(mismatches), "missing_files": len(missing),
+            "workers": self.workers, "seconds": round(time.monotonic() - start, 2),
+            "mismatches": mismatches, "missing": missing,
+        }
+
+
+def main(argv=None):
+    from profile_cli import select_profiles
+
+    parser = argparse.ArgumentParser(description="Verify generated profiles against the catalog")
+    parser.add_argument("--library", default="output", help="library root folder")
+    parser.add_argument("--data", default="data/profile_data.json")
+    parser.add_argument("--category", action="append", metavar="PATTERN")
+    parser.add_argument("--sku", action="append")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--outline-tolerance", type=float, default=OUTLINE_TOLERANCE)
+    parser.add_argument("--area-tolerance", type=float, default=CATALOG_AREA_TOLERANCE)
+    parser.add_argument("--report", default="output/verify_report.json")
+    args = parser.parse_args(argv)
+
+    selection = select_profiles(load_catalog(args.data).by_category, args.category,
+                                skus=args.sku)
+    records = [r for items in selection.values() for r in items]
+    verifier = LibraryVerifier(args.library, workers=args.workers,
+                               outline_tol=args.outline_tolerance,
+                               catalog_tol=args.area_tolerance)
+    report = verifier.verify(records)
+
+    os.makedirs(os.path.dirname(args.report) or '.', exist_ok=True)
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+    for item in report["mismatches"]:
+        print(f"{item['path']}: " + "; ".join(item["problems"]))
+    print(f"{report['checked']} checked, {report['mismatched']} mismatched, "
+          f"{report['missing_files']} missing in {report['seconds']}s "
+          f"with {report['workers']} workers; report in {args.report}")
+    return 1 if report["mismatched"] or report["missing_files"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
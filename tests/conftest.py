@@ -0,0 +1,24 @@
+import json
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(REPO_ROOT, "data", "profile_data.json")
+
+# The scripts import each other as top-level modules
+sys.path.insert(0, os.path.join(REPO_ROOT, "scripts"))
+
+
+@pytest.fixture(scope="session")
+def catalog():
+    from profile_records import load_catalog
+    return load_catalog(DATA_PATH)
+
+
+@pytest.fixture
+def catalog_data():
+    """A fresh decoded copy of profile_data.json, free to modify"""
+    with open(DATA_PATH, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,76 @@
+import copy
+import random
+
+from catalog_diff import changed_skus, diff_catalogs, dumps_canonical, main, write_canonical
+
+
+def _shuffled(data, seed=1):
+    rng = random.Random(seed)
+    categories = list(data["profiles"].items())
+    rng.shuffle(categories)
+    profiles = {}
+    for category, items in categories:
+        items = [dict(reversed(list(p.items()))) for p in items]
+        rng.shuffle(items)
+        profiles[category] = items
+    return dict(reversed(list(dict(data, profiles=profiles).items())))
+
+
+def test_canonical_output_ignores_order(catalog_data):
+    assert dumps_canonical(_shuffled(catalog_data)) == dumps_canonical(catalog_data)
+    assert dumps_canonical(_shuffled(catalog_data, seed=2)).encode() == \
+        dumps_canonical(catalog_data).encode()
+
+
+def test_canonical_file_round_trips(tmp_path, catalog_data):
+    path = tmp_path / "catalog.json"
+    write_canonical(_shuffled(catalog_data), str(path))
+    assert path.read_bytes() == dumps_canonical(catalog_data).encode("utf-8")
+    assert main(["canonical", str(path), "--check"]) == 0
+    path.write_text(path.read_text().replace("\n", "\n ", 1))
+    assert main(["canonical", str(path), "--check"]) == 1
+
+
+def test_identical_catalogs_have_no_changes(catalog_data):
+    diff = diff_catalogs(catalog_data, _shuffled(catalog_data))
+    assert diff["summary"] == {"added": 0, "removed": 0, "changed": 0,
+                               "unchanged": sum(map(len, catalog_data["profiles"].values()))}
+    assert diff["sections"] == {}
+
+
+def test_diff_joins_records_by_sku(catalog_data):
+    new = copy.deepcopy(catalog_data)
+    tubes = new["profiles"]["steel_square_tube"]
+    old_price = tubes[0]["price"]
+    tubes[0]["price"] = old_price + 1.5
+    removed = tubes.pop(1)
+    moved = new["profiles"]["steel_rectangular_tube"].pop(0)
+    new["profiles"]["steel_square_tube"].append(moved)
+    added = dict(tubes[2], sku="99999", designation="HSS9x9x9")
+    new["profiles"]["steel_square_tube"].append(added)
+    new["materials"]["steel_a36"]["density_lb_in3"] = 0.3
+
+    diff = diff_catalogs(catalog_data, _shuffled(new))
+    assert diff["summary"]["added"] == 1 and diff["summary"]["removed"] == 1
+    assert [e["sku"] for e in diff["added"]] == ["99999"]
+    assert diff["removed"] == [{"sku": removed["sku"], "category": "steel_square_tube",
+                                "record": removed}]
+
+    changed = {e["sku"]: e["fields"] for e in diff["changed"]}
+    assert set(changed) == {tubes[0]["sku"], moved["sku"]}
+    assert changed[tubes[0]["sku"]] == {"price": {"old": old_price, "new": old_price + 1.5,
+                                                  "delta": 1.5}}
+    assert changed[moved["sku"]] == {"category": {"old": "steel_rectangular_tube",
+                                                  "new": "steel_square_tube"}}
+    assert list(diff["sections"]) == ["materials"]
+    assert changed_skus(diff) == sorted(["99999", tubes[0]["sku"], moved["sku"]])
+
+
+def test_added_and_removed_fields_are_reported(catalog_data):
+    new = copy.deepcopy(catalog_data)
+    record = new["profiles"]["steel_equal_leg_angle"][0]
+    record["finish"] = "galvanized"
+    del record["cost_per_lb"]
+    [change] = diff_catalogs(catalog_data, new)["changed"]
+    assert change["fields"]["finish"] == {"old": None, "new": "galvanized"}
+    assert change["fields"]["cost_per_lb"]["new"] is None
@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from catalog_diff import write_canonical
+from catalog_watch import CatalogWatchDaemon, PollingWatcher, _write_json_atomic
+from profile_records import profile_filename
+
+
+class FakeGenerator:
+    """Writes a stub file per record; designations starting FAIL fail"""
+
+    def __init__(self):
+        self.calls = []
+
+    def generate_all(self, output_dir, profiles=None, publisher=None):
+        self.calls.append(sorted(r.sku for items in profiles.values() for r in items))
+        created, failed = [], {}
+        for category, items in profiles.items():
+            for record in items:
+                if record.designation.startswith("FAIL"):
+                    failed[record.sku] = "boom"
+                    continue
+                path = os.path.join(output_dir, category, profile_filename(record.designation))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w") as f:
+                    f.write(record.sku)
+                created.append(path)
+        return {"created": created, "failed": failed, "cloned": 0}
+
+
+@pytest.fixture
+def small_catalog(catalog_data):
+    keep = ("steel_square_tube", "steel_equal_leg_angle")
+    catalog_data["profiles"] = {c: catalog_data["profiles"][c][:5] for c in keep}
+    return catalog_data
+
+
+def _daemon(tmp_path, data, **kwargs):
+    path = str(tmp_path / "catalog.json")
+    write_canonical(data, path)
+    kwargs.setdefault("generator", FakeGenerator())
+    return CatalogWatchDaemon(path, str(tmp_path / "out"),
+                              state_path=str(tmp_path / "state.json"),
+                              metrics_path=str(tmp_path / "metrics.json"), **kwargs)
+
+
+def _run_pending(daemon):
+    daemon.run_batch(*daemon._take_batch())
+
+
+def test_concurrent_atomic_writes_do_not_collide(tmp_path):
+    path = str(tmp_path / "metrics.json")
+    errors = []
+
+    def writer(n):
+        try:
+            for i in range(50):
+                _write_json_atomic(path, {"writer": n, "i": i})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert os.listdir(tmp_path) == ["metrics.json"]
+    with open(path) as f:
+        assert json.load(f)["i"] == 49
+
+
+def test_scan_queues_changes_and_stale_files(tmp_path, small_catalog):
+    daemon = _daemon(tmp_path, small_catalog)
+    daemon._load_baseline(full=False)
+    assert daemon.scan() == 0         # first start: the library matches the catalog
+
+    tubes = small_catalog["profiles"]["steel_square_tube"]
+    tubes[0]["price"] += 1
+    old_name = tubes[1]["designation"]
+    tubes[1]["designation"] = "HSS9x9x9"
+    removed = small_catalog["profiles"]["steel_equal_leg_angle"].pop(0)
+    write_canonical(small_catalog, daemon.data_path)
+
+    assert daemon.scan() == 2
+    assert sorted(daemon._pending) == sorted([tubes[0]["sku"], tubes[1]["sku"]])
+    assert sorted(daemon._stale) == sorted([("steel_square_tube", old_name),
+                                            ("steel_equal_leg_angle", removed["designation"])])
+    assert daemon.scan() == 0         # same bytes again: nothing new
+
+    out = tmp_path / "out"
+    for category, designation in daemon._stale:
+        stale_file = out / category / profile_filename(designation)
+        stale_file.parent.mkdir(parents=True, exist_ok=True)
+        stale_file.write_text("old")
+    _run_pending(daemon)
+    assert daemon.generator.calls == [sorted([tubes[0]["sku"], tubes[1]["sku"]])]
+    assert (out / "steel_square_tube" / profile_filename("HSS9x9x9")).exists()
+    assert not (out / "steel_square_tube" / profile_filename(old_name)).exists()
+    assert not (out / "steel_equal_leg_angle" / profile_filename(removed["designation"])).exists()
+    assert daemon.stats["removed"] == 2 and daemon.queue_depth == 0
+    with open(daemon.metrics_path) as f:
+        assert json.load(f)["generated"] == 2
+
+
+def test_failed_records_are_left_out_of_the_state_and_retried(tmp_path, small_catalog):
+    daemon = _daemon(tmp_path, small_catalog)
+    daemon._load_baseline(full=False)
+    tubes = small_catalog["profiles"]["steel_square_tube"]
+    tubes[0]["designation"] = "FAIL1"
+    write_canonical(small_catalog, daemon.data_path)
+    daemon.scan()
+    _run_pending(daemon)
+    assert daemon.metrics()["failed_skus"] == [tubes[0]["sku"]]
+    with open(daemon.state_path) as f:
+        saved = json.load(f)
+    assert tubes[0]["sku"] not in {p["sku"] for p in saved["profiles"]["steel_square_tube"]}
+
+    # A restart resumes from the saved state and queues the failed record again
+    restarted = _daemon(tmp_path, small_catalog)
+    restarted._load_baseline(full=False)
+    assert restarted.scan() == 1
+    assert list(restarted._pending) == [tubes[0]["sku"]]
+
+
+def test_full_start_queues_everything(tmp_path, small_catalog):
+    daemon = _daemon(tmp_path, small_catalog)
+    daemon._load_baseline(full=True)
+    assert daemon.scan() == 10
+
+
+def test_debounce_waits_for_a_burst_to_go_quiet(tmp_path, small_catalog):
+    daemon = _daemon(tmp_path, small_catalog, debounce=0.3, max_delay=5.0)
+    watcher = PollingWatcher(daemon.data_path, interval=0.01)
+    last_write = []
+
+    def burst():
+        for i in range(5):
+            small_catalog["metadata"]["notes"] = f"save {i}"
+            write_canonical(small_catalog, daemon.data_path)
+            last_write.append(time.monotonic())
+            time.sleep(0.1)
+
+    writer = threading.Thread(target=burst)
+    writer.start()
+    assert daemon._wait_for_change(watcher)
+    returned = time.monotonic()
+    writer.join()
+    assert returned - last_write[-1] >= 0.25
+
+
+def test_max_delay_caps_a_continuous_burst(tmp_path, small_catalog):
+    daemon = _daemon(tmp_path, small_catalog, debounce=0.3, max_delay=0.5)
+    watcher = PollingWatcher(daemon.data_path, interval=0.01)
+    stop = threading.Event()
+
+    def keep_saving():
+        i = 0
+        while not stop.is_set():
+            i += 1
+            small_catalog["metadata"]["notes"] = f"save {i}"
+            write_canonical(small_catalog, daemon.data_path)
+            time.sleep(0.05)
+
+    writer = threading.Thread(target=keep_saving)
+    writer.start()
+    try:
+        start = time.monotonic()
+        assert daemon._wait_for_change(watcher)
+        assert time.monotonic() - start < 1.5
+    finally:
+        stop.set()
+        writer.join()
+
+
+def test_run_regenerates_a_saved_change(tmp_path, small_catalog):
+    daemon = _daemon(tmp_path, small_catalog, debounce=0.1, poll_interval=0.02)
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not os.path.exists(daemon.state_path) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        small_catalog["profiles"]["steel_square_tube"][2]["price"] += 5
+        write_canonical(small_catalog, daemon.data_path)
+        while not daemon.stats["batches"] and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        daemon.stop()
+        thread.join()
+    assert daemon.generator.calls == [[small_catalog["profiles"]["steel_square_tube"][2]["sku"]]]
@@ -0,0 +1,93 @@
+import pytest
+
+from designation_search import (DesignationIndex, format_inches, normalize_designation,
+                                parse_designation, prefix_distance)
+
+
+@pytest.fixture(scope="module")
+def index(catalog):
+    return DesignationIndex.from_catalog(catalog)
+
+
+def test_catalog_designations_round_trip(catalog):
+    for record in catalog.records():
+        parsed = parse_designation(record.designation)
+        assert parsed is not None, record.designation
+        assert parsed.canonical == record.designation
+        assert parse_designation(parsed.canonical) == parsed
+
+
+@pytest.mark.parametrize("text, canonical", [
+    ("L2x2x1/4", "L2x2x1/4"),
+    ("2x2x1/4 angle", "L2x2x1/4"),
+    ("L2x2x.25", "L2x2x1/4"),
+    ("w8 31", "W8x31"),
+    ("W 8 x 31", "W8x31"),
+    ("8x31 wide flange", "W8x31"),
+    ("HSS1 1/2x1 1/2x14ga-SS", "HSS1 1/2x1 1/2x14ga-SS"),
+    ("hss 1.5 x 1.5 x 14 gauge stainless", "HSS1 1/2x1 1/2x14ga-SS"),
+    ("1-1/4 x 3/4 x 1/8 stainless angle", "L1 1/4x3/4x1/8-SS"),
+    ("L3x3x1/4 aluminum", "L3x3x1/4-AL"),
+    ("c6 8.2", "C6x8.2"),
+])
+def test_typed_designations_normalize(text, canonical):
+    assert normalize_designation(text) == canonical
+
+
+@pytest.mark.parametrize("text", ["2x2x1/4", "L2x2", "W8", "HSS2x2x0", "angle", "L2x2x1/4 blue"])
+def test_incomplete_or_unknown_text_does_not_parse(text):
+    assert parse_designation(text) is None
+
+
+def test_format_inches_round_trips_sixty_fourths():
+    for n in range(1, 64 * 12):
+        text = format_inches(n / 64)
+        assert parse_designation(f"L{text}x{text}x{text}").dims == (n / 64,) * 3
+    assert format_inches(1.25) == "1 1/4"
+    assert format_inches(0.3) == "0.3"
+
+
+def test_exact_match_comes_first(index):
+    results = index.search("L2x2x1/4")
+    assert results[0].designation == "L2x2x1/4"
+    assert all(m.distance == 0 for m in results)
+
+
+def test_bare_dimensions_match_every_family(index):
+    found = {m.designation for m in index.search("2x2x1/4")}
+    assert {"L2x2x1/4", "HSS2x2x1/4"} <= found
+
+
+def test_material_words_filter_results(index):
+    results = index.search("2x2x1/4 stainless")
+    assert results and all(m.designation.endswith("-SS") for m in results)
+
+
+def test_prefix_and_sku_search(index, catalog):
+    assert [m.designation for m in index.search("W8x3")] == ["W8x31", "W8x35"]
+    record = catalog.records()[7]
+    assert index.search(record.sku)[0].item is record
+
+
+def test_typos_fall_back_to_fuzzy_matches(index):
+    results = index.search("W8x3l")
+    assert results[0].designation == "W8x31"
+    assert results[0].distance == 1
+    assert index.search("W8x3l", fuzzy=False) == []
+
+
+def test_cached_results_cannot_be_changed_by_callers(catalog):
+    index = DesignationIndex.from_catalog(catalog)
+    first = index.search("W8x3")
+    first.clear()
+    again = index.search("W8x3")
+    assert [m.designation for m in again] == ["W8x31", "W8x35"]
+    again.pop()
+    assert len(index.search("W8x3")) == 2
+
+
+def test_prefix_distance():
+    assert prefix_distance("w8x31", "w8x31", 2) == 0
+    assert prefix_distance("w8x3", "w8x31", 2) == 0
+    assert prefix_distance("w8x3l", "w8x31", 2) == 1
+    assert prefix_distance("hss", "w8x31", 2) == 3
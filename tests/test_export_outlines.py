@@ -0,0 +1,21 @@
+from export_outlines import outline_to_dxf
+from profile_geometry import Arc, profile_outline
+
+
+def _pairs(dxf):
+    lines = dxf.splitlines()
+    return list(zip(lines[::2], lines[1::2]))
+
+
+def test_dxf_is_plain_r12(catalog):
+    record = next(r for r in catalog.records() if r.designation == "HSS2x2x1/8")
+    loops = profile_outline(record)
+    pairs = _pairs(outline_to_dxf(loops))
+    header = pairs[:pairs.index(("0", "ENDSEC"))]
+    assert header == [("0", "SECTION"), ("2", "HEADER"), ("9", "$ACADVER"), ("1", "AC1009")]
+    assert pairs[-1] == ("0", "EOF")
+
+    entities = [value for code, value in pairs if code == "0"]
+    arcs = sum(isinstance(ent, Arc) for loop in loops for ent in loop)
+    assert entities.count("ARC") == arcs
+    assert entities.count("LINE") == sum(len(loop) for loop in loops) - arcs
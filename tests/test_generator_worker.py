@@ -0,0 +1,158 @@
+import asyncio
+import json
+import socket
+import threading
+
+import pytest
+
+from conftest import DATA_PATH
+from generator_worker import JobQueue, WorkerServer, request
+
+
+class FakeGenerator:
+    """generate_all stand-in; blocks each call until released when gated"""
+
+    def __init__(self, gated=False):
+        self.calls = []
+        self.entered = threading.Semaphore(0)
+        self.gate = threading.Semaphore(0)
+        self.gated = gated
+
+    def generate_all(self, output_dir, profiles):
+        self.calls.append([r.sku for items in profiles.values() for r in items])
+        self.entered.release()
+        if self.gated:
+            assert self.gate.acquire(timeout=10)
+        return {"created": [], "failed": {}, "cloned": 0}
+
+
+def _serve(loop, task):
+    try:
+        loop.run_until_complete(task)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        loop.close()
+
+
+def _wait_done(port, job):
+    for _ in range(500):
+        reply = request({"op": "status", "job": job["job"]}, port=port)
+        if reply["status"] not in ("queued", "running"):
+            return reply
+        threading.Event().wait(0.01)
+    raise AssertionError(f"job {job['job']} did not finish")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def worker(tmp_path):
+    """Start a worker on a loopback port; yields a function making it"""
+    running = []
+
+    def start(generator, chunk_size=25):
+        queue = JobQueue(generator, DATA_PATH, str(tmp_path), chunk_size)
+        server = WorkerServer(queue)
+        port = _free_port()
+        loop = asyncio.new_event_loop()
+        task = loop.create_task(server.run("127.0.0.1", port))
+        thread = threading.Thread(target=_serve, args=(loop, task), daemon=True)
+        thread.start()
+        running.append((loop, task, thread, generator))
+        for _ in range(200):
+            try:
+                request({"op": "ping"}, port=port, timeout=5)
+                break
+            except ConnectionError:
+                threading.Event().wait(0.01)
+        return port
+
+    yield start
+    for loop, task, thread, generator in running:
+        generator.gated = False
+        for _ in range(10):
+            generator.gate.release()
+        loop.call_soon_threadsafe(task.cancel)
+        thread.join(10)
+
+
+def _skus(catalog, count):
+    return [r.sku for r in catalog.records()[:count]]
+
+
+def test_submit_and_wait(worker, catalog):
+    generator = FakeGenerator()
+    port = worker(generator)
+    skus = _skus(catalog, 3)
+    reply = request({"op": "submit", "skus": skus + ["no-such-sku"], "wait": True},
+                    port=port, timeout=10)
+    assert reply["ok"] and reply["status"] == "done"
+    assert sorted(reply["files"]) == sorted(skus)
+    assert reply["failed"] == {"no-such-sku": "unknown SKU"}
+    assert generator.calls == [skus]
+
+    assert request({"op": "status", "job": reply["job"]}, port=port)["status"] == "done"
+    stats = request({"op": "stats"}, port=port)
+    assert (stats["batches"], stats["generated"], stats["failed"]) == (1, 3, 1)
+    assert stats["queued_jobs"] == 0
+
+
+def test_priorities_and_chunks(worker, catalog):
+    generator = FakeGenerator(gated=True)
+    port = worker(generator, chunk_size=2)
+    skus = _skus(catalog, 9)
+    first = request({"op": "submit", "skus": skus[:1]}, port=port)
+    assert generator.entered.acquire(timeout=10)
+
+    # Queued while the first batch holds the generator
+    bulk = request({"op": "submit", "skus": skus[1:6], "priority": "bulk"}, port=port)
+    normal = request({"op": "submit", "skus": skus[6:7]}, port=port)
+    urgent = request({"op": "submit", "skus": skus[7:9], "priority": "interactive"},
+                     port=port)
+    stats = request({"op": "stats"}, port=port)
+    assert stats["queued_by_priority"] == {"bulk": 5, "normal": 1, "interactive": 2}
+    assert request({"op": "status", "job": first["job"]}, port=port)["status"] == "running"
+
+    generator.gated = False
+    generator.gate.release()
+    for job in (first, bulk, normal, urgent):
+        assert _wait_done(port, job)["status"] == "done"
+    assert generator.calls == [skus[:1], skus[7:9], skus[6:7], skus[1:3], skus[3:5], skus[5:6]]
+
+
+def test_cancel_drops_unstarted_skus(worker, catalog):
+    generator = FakeGenerator(gated=True)
+    port = worker(generator)
+    skus = _skus(catalog, 4)
+    request({"op": "submit", "skus": skus[:1]}, port=port)
+    assert generator.entered.acquire(timeout=10)
+    queued = request({"op": "submit", "skus": skus[1:]}, port=port)
+    reply = request({"op": "cancel", "job": queued["job"]}, port=port)
+    assert reply["ok"] and reply["status"] == "cancelled"
+    assert not request({"op": "cancel", "job": queued["job"]}, port=port)["ok"]
+
+    generator.gated = False
+    generator.gate.release()
+    request({"op": "submit", "skus": skus[:1], "wait": True}, port=port, timeout=10)
+    assert generator.calls == [skus[:1], skus[:1]]
+
+
+def test_rejects_bad_requests(worker):
+    port = worker(FakeGenerator())
+    assert request({"op": "submit", "skus": []}, port=port)["error"].startswith("submit needs")
+    assert "priority" in request({"op": "submit", "skus": ["1"], "priority": "now"},
+                                 port=port)["error"]
+    assert request({"op": "status", "job": "j999"}, port=port)["error"] == "unknown job j999"
+    assert request({"op": "reboot"}, port=port)["error"] == "unknown op 'reboot'"
+
+    with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+        sock.sendall(b"not json\n[1, 2]\n")
+        with sock.makefile("rb") as replies:
+            for _ in range(2):
+                reply = json.loads(replies.readline())
+                assert not reply["ok"] and reply["error"].startswith("invalid request")
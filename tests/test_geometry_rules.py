@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from geometry_rules import Rule, RuleError, apply_rules, compile_standards
+
+
+def _data(rules, items, applies_to=("*tube*",)):
+    return {"geometry_standards": {"tubes": {"applies_to": list(applies_to), "rules": rules}},
+            "profiles": {"steel_square_tube": items, "steel_wide_flange": [{"depth_in": 8.0}]}}
+
+
+def test_rule_collects_names_and_evaluates_columns():
+    rule = Rule("corner", "max(2 * wall, 0.1) + where(wall > 0.2, 1, 0)")
+    assert rule.names == ("wall",)
+    result = rule({"wall": np.array([0.01, 0.25])}, 2)
+    np.testing.assert_allclose(result, [0.1, 1.5])
+
+
+def test_constant_rules_broadcast():
+    np.testing.assert_allclose(Rule("r", "0.25")({}, 3), [0.25, 0.25, 0.25])
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os')",
+    "wall.real",
+    "[wall]",
+    "'text'",
+    "True",
+    "open(wall)",
+    "round(wall, ndigits=2)",
+    "lambda: 1",
+    "wall if wall else 1",
+    "2 *",
+])
+def test_disallowed_expressions_are_rejected(expression):
+    with pytest.raises(RuleError):
+        Rule("x", expression)
+
+
+def test_compile_standards_orders_rules_by_dependency():
+    [standard] = compile_standards({"tubes": {"rules": {"a": "b + 1", "b": "c * 2", "c": "t"}},
+                                    "prose_only": {"description": "no rules"}})
+    assert [rule.field for rule in standard.rules] == ["c", "b", "a"]
+    assert standard.applies_to == ("tubes",)
+
+
+def test_circular_rules_are_rejected():
+    with pytest.raises(RuleError, match="tubes.*circular"):
+        compile_standards({"tubes": {"rules": {"a": "b", "b": "a"}}})
+
+
+def test_apply_rules_fills_covered_categories_only():
+    items = [{"wall_thickness_in": 0.25, "corner_radius_outer_in": 0.0},
+             {"wall_thickness_in": 0.125, "corner_radius_outer_in": 0.25}]
+    data = _data({"corner_radius_outer_in": "2 * wall_thickness_in"}, items)
+    assert apply_rules(data) == {"steel_square_tube.corner_radius_outer_in": 1}
+    assert [i["corner_radius_outer_in"] for i in items] == [0.5, 0.25]
+    assert data["profiles"]["steel_wide_flange"] == [{"depth_in": 8.0}]
+
+
+def test_overrides_and_missing_inputs_keep_their_values():
+    items = [{"wall_thickness_in": 0.25, "corner_radius_outer_in": 0.3,
+              "overrides": {"corner_radius_outer_in": 0.3}},
+             {"corner_radius_outer_in": 0.7},
+             {"wall_thickness_in": 0.5}]
+    data = _data({"corner_radius_outer_in": "2 * wall_thickness_in",
+                  "corner_radius_inner_in": "corner_radius_outer_in / 2"}, items)
+    apply_rules(data)
+    assert items[0]["corner_radius_outer_in"] == 0.3
+    assert items[0]["corner_radius_inner_in"] == 0.15      # derived from the override
+    assert items[1] == {"corner_radius_outer_in": 0.7}
+    assert items[2]["corner_radius_outer_in"] == 1.0
+
+
+def test_catalog_is_consistent_with_its_rules(catalog_data):
+    assert compile_standards(catalog_data["geometry_standards"])
+    assert apply_rules(catalog_data) == {}
@@ -0,0 +1,89 @@
+import os
+import sqlite3
+
+import pytest
+
+from library_index import INDEX_NAME, finish_run, open_for_run, open_library
+from library_publisher import LibraryPublisher, sha256_file
+from profile_records import profile_filename
+
+
+@pytest.fixture
+def records(catalog):
+    by_designation = {r.designation: r for r in catalog.records()}
+    return [by_designation[d] for d in
+            ("L2x2x1/4", "L4x4x1/4", "HSS2x2x1/8", "HSS3x2x1/4", "W8x31")]
+
+
+def _rel_path(record):
+    return f"{record.category}/{profile_filename(record.designation)}"
+
+
+def _save(folder, record, text=None):
+    """Stand-in for a saved .sldlfp; returns (rel_path, file path)"""
+    rel_path = _rel_path(record)
+    path = os.path.join(folder, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text or record.designation)
+    return rel_path, path
+
+
+def test_local_run_records_and_queries(tmp_path, records):
+    out = str(tmp_path)
+    index = open_for_run(out)
+    for record in records:
+        rel_path, path = _save(out, record)
+        index.record(rel_path, record, path)
+    finish_run(index)
+
+    with open_library(out) as library:
+        assert len(library) == len(records)
+        tube = library.get(records[3].sku)
+        assert tube["path"] == _rel_path(records[3])
+        assert (tube["depth_in"], tube["width_in"], tube["thickness_in"]) == (3.0, 2.0, 0.25)
+        assert tube["dimensions"]["wall_thickness_in"] == 0.25
+        assert tube["sha256"] == sha256_file(os.path.join(out, tube["path"]))
+        assert [r["sku"] for r in library.find(designation="w8 31")] == [records[4].sku]
+        angles = library.find(family="angle", ranges=[("depth_in", 3, None)])
+        assert [r["designation"] for r in angles] == ["L4x4x1/4"]
+        assert [r["family"] for r in library.find()][:2] == ["angle", "angle"]
+        with pytest.raises(ValueError):
+            library.find(ranges=[("sku", 1, 2)])
+        with pytest.raises(sqlite3.OperationalError):
+            library.remove([tube["path"]])
+
+    with pytest.raises(FileNotFoundError):
+        open_library(str(tmp_path / "missing"))
+
+
+def _publish_run(share, saved, removed=(), version=1):
+    publisher = LibraryPublisher(str(share), workers=2)
+    index = open_for_run(publisher.scratch_dir, publisher)
+    for record in saved:
+        rel_path, path = _save(publisher.scratch_dir, record, f"{record.designation} v{version}")
+        index.record(rel_path, record, path)
+        publisher.submit(path, rel_path)
+    for record in removed:
+        publisher.remove(_rel_path(record))
+    finish_run(index, publisher)
+    return publisher.publish()
+
+
+def test_subset_run_seeds_from_the_live_index(tmp_path, records):
+    live = _publish_run(tmp_path, records)
+    with open_library(live) as library:
+        first = {row["sku"]: row for row in library.find()}
+    assert set(first) == {r.sku for r in records}
+
+    # Regenerate one profile and drop another; the rest come from the live index
+    changed, dropped = records[1], records[2]
+    assert _publish_run(tmp_path, [changed], removed=[dropped], version=2) == live
+    assert os.path.exists(os.path.join(live, INDEX_NAME))
+    with open_library(live) as library:
+        rows = {row["sku"]: row for row in library.find()}
+    assert set(rows) == {r.sku for r in records} - {dropped.sku}
+    assert rows[changed.sku]["sha256"] == sha256_file(os.path.join(live, _rel_path(changed)))
+    assert rows[changed.sku]["sha256"] != first[changed.sku]["sha256"]
+    assert rows[records[0].sku] == first[records[0].sku]
+    assert not os.path.exists(os.path.join(live, _rel_path(dropped)))
@@ -0,0 +1,78 @@
+import json
+import os
+
+import pytest
+
+from library_publisher import LibraryPublisher, PublishError
+
+
+def _scratch_file(publisher, rel_path, text):
+    path = publisher.scratch_path(rel_path)
+    with open(path, "w") as f:
+        f.write(text)
+    return path
+
+
+def _publish(share, files, **kwargs):
+    publisher = LibraryPublisher(str(share), workers=2, **kwargs)
+    for rel_path, text in files.items():
+        publisher.submit(_scratch_file(publisher, rel_path, text), rel_path)
+    return publisher, publisher.publish()
+
+
+def _read(root, rel_path):
+    with open(os.path.join(root, rel_path)) as f:
+        return f.read()
+
+
+def test_publish_swaps_in_a_complete_library(tmp_path):
+    publisher, live = _publish(tmp_path, {"a/1.sldlfp": "one", "a/2.sldlfp": "two"})
+    assert sorted(os.listdir(tmp_path)) == ["library"]
+    assert _read(live, "a/2.sldlfp") == "two"
+    with open(os.path.join(live, "manifest.json")) as f:
+        assert sorted(json.load(f)["files"]) == ["a/1.sldlfp", "a/2.sldlfp"]
+    assert not os.path.exists(publisher.scratch_dir)
+
+
+def test_subset_publish_links_the_files_it_did_not_replace(tmp_path):
+    _, live = _publish(tmp_path, {"a/1.sldlfp": "one", "a/2.sldlfp": "two", "a/3.sldlfp": "x"})
+    before = os.stat(os.path.join(live, "a/2.sldlfp")).st_ino
+    publisher = LibraryPublisher(str(tmp_path), workers=2)
+    publisher.submit(_scratch_file(publisher, "a/1.sldlfp", "ONE"), "a/1.sldlfp")
+    publisher.remove("a/3.sldlfp")
+    publisher.publish()
+    assert sorted(os.listdir(os.path.join(live, "a"))) == ["1.sldlfp", "2.sldlfp"]
+    assert _read(live, "a/1.sldlfp") == "ONE"
+    assert os.stat(os.path.join(live, "a/2.sldlfp")).st_ino == before
+
+
+def test_incremental_publish_touches_only_its_files(tmp_path):
+    _, live = _publish(tmp_path, {"a/1.sldlfp": "one", "a/2.sldlfp": "two", "a/3.sldlfp": "x"})
+    before = os.stat(os.path.join(live, "a/2.sldlfp")).st_ino
+    publisher = LibraryPublisher(str(tmp_path), workers=2, incremental=True)
+    publisher.submit(_scratch_file(publisher, "a/1.sldlfp", "ONE"), "a/1.sldlfp")
+    publisher.remove("a/3.sldlfp")
+    publisher.publish()
+    assert sorted(os.listdir(os.path.join(live, "a"))) == ["1.sldlfp", "2.sldlfp"]
+    assert _read(live, "a/1.sldlfp") == "ONE"
+    assert os.stat(os.path.join(live, "a/2.sldlfp")).st_ino == before
+    with open(os.path.join(live, "manifest.json")) as f:
+        assert sorted(json.load(f)["files"]) == ["a/1.sldlfp", "a/2.sldlfp"]
+
+
+def test_failed_publish_then_abort_leaves_nothing_behind(tmp_path):
+    _, live = _publish(tmp_path, {"a/1.sldlfp": "one"})
+    publisher = LibraryPublisher(str(tmp_path), workers=2)
+    publisher.submit(_scratch_file(publisher, "a/1.sldlfp", ""), "a/1.sldlfp")
+    with pytest.raises(PublishError, match="empty"):
+        publisher.publish()
+    publisher.abort()
+    assert sorted(os.listdir(tmp_path)) == ["library"]
+    assert not os.path.exists(publisher.scratch_dir)
+    assert _read(live, "a/1.sldlfp") == "one"
+
+
+def test_abort_after_publish_is_a_no_op(tmp_path):
+    publisher, live = _publish(tmp_path, {"a/1.sldlfp": "one"})
+    publisher.abort()
+    assert _read(live, "a/1.sldlfp") == "one"
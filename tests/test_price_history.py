@@ -0,0 +1,62 @@
+import datetime
+import os
+
+import pytest
+
+from price_history import PriceHistory
+from profile_records import parse_catalog
+
+
+def _repriced(catalog_data, factor):
+    for items in catalog_data["profiles"].values():
+        for profile in items:
+            profile["price"] = round(profile["price"] * factor, 2)
+    return parse_catalog(catalog_data)
+
+
+def test_queries_do_not_create_the_store(tmp_path):
+    root = str(tmp_path / "history")
+    history = PriceHistory(root)
+    assert history.price_on("00230", "2024-01-01") is None
+    assert history.family_trend("stainless_angle_304") == []
+    assert not os.path.exists(root)
+
+
+def test_append_and_query_round_trip(tmp_path, catalog, catalog_data):
+    root = str(tmp_path / "history")
+    history = PriceHistory(root)
+    history.append_snapshot("2024-01-05", catalog)
+    history.append_snapshot(datetime.date(2024, 2, 5), _repriced(catalog_data, 1.1))
+
+    record = catalog.records()[0]
+    reopened = PriceHistory(root)
+    assert reopened.dates == ["2024-01-05", "2024-02-05"]
+    first = reopened.price_on(record.sku, "2024-01-05")
+    assert first["as_of"] == "2024-01-05"
+    assert first["price"] == pytest.approx(record.price)
+    assert first["cost_per_lb"] == pytest.approx(record.cost_per_lb)
+    assert first["weight_per_ft"] == pytest.approx(record.weight_per_ft, abs=5e-4)
+    # Between scrapes the earlier one is in effect; dates in other ISO forms work
+    assert reopened.price_on(record.sku, "20240204")["as_of"] == "2024-01-05"
+    later = reopened.price_on(record.sku, "2024-02-05T09:30:00")
+    assert later["price"] == pytest.approx(round(record.price * 1.1, 2))
+
+    trend = reopened.family_trend(record.category, start="2024-01-05", end="2024-12-31")
+    assert [point["date"] for point in trend] == reopened.dates
+    assert trend[1]["avg_price"] > trend[0]["avg_price"]
+    movers = reopened.largest_movers("2024-01-05", "2024-02-05", top=3)
+    assert len(movers) == 3 and all(m["pct"] == pytest.approx(10, abs=0.5) for m in movers)
+
+
+def test_out_of_range_dates(tmp_path, catalog):
+    history = PriceHistory(str(tmp_path))
+    history.append_snapshot("2024-01-05", catalog)
+    sku = catalog.records()[0].sku
+    assert history.price_on(sku, "2024-01-04") is None
+    assert history.price_on(sku, "2030-01-01")["as_of"] == "2024-01-05"
+    assert history.price_on("no-such-sku", "2024-01-05") is None
+    assert history.largest_movers("2023-01-01", "2024-01-05") == []
+    with pytest.raises(ValueError):
+        history.append_snapshot("2024-01-05", catalog)
+    with pytest.raises(ValueError):
+        history.price_on(sku, "5 Jan 2024")
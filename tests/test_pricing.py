@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from pricing import MATERIAL_GROUPS, PricingEngine, material_group, parse_sweep
+
+
+@pytest.fixture(scope="module")
+def engine(catalog):
+    return PricingEngine(catalog)
+
+
+def test_default_rates_reproduce_the_catalog(engine):
+    assert engine.calibration_errors() == {}
+
+
+def test_calibration_errors_report_drift(catalog):
+    drifted = PricingEngine(catalog, rates_per_lb={"steel_equal_leg_angle": 1.30})
+    errors = drifted.calibration_errors()
+    skus = {r.sku for r in catalog.by_category["steel_equal_leg_angle"]}
+    assert set(errors) == skus
+    sku = next(iter(errors))
+    assert errors[sku]["engine"] == pytest.approx(errors[sku]["catalog"] / 0.6, rel=0.02)
+
+
+def test_recompute_matches_the_formulas(engine, catalog):
+    record = catalog.records()[0]
+    row = engine.recompute()[record.sku]
+    density = catalog.materials[record.material]["density_lb_in3"]
+    weight = record.area_in2 * density * 12
+    assert row["weight_per_ft"] == pytest.approx(weight, abs=1e-3)
+    assert row["price"] == pytest.approx(record.price, rel=0.01)
+    assert row["cost_per_lb"] == pytest.approx(row["price"] / (weight * record.length_inches / 12),
+                                               abs=0.01)
+
+
+def test_stock_length_override_scales_the_price(catalog, engine):
+    category = "steel_square_tube"
+    longer = PricingEngine(catalog, stock_lengths_in={category: 480})
+    i = engine.sku_index[catalog.by_category[category][0].sku]
+    assert longer.base_prices()[i] == pytest.approx(
+        engine.base_prices()[i] * 480 / engine.length_in[i])
+
+
+def test_missing_rate_is_an_error(catalog, monkeypatch):
+    import pricing
+    rates = dict(pricing.DEFAULT_RATES_PER_LB)
+    del rates["steel_i_beam"]
+    monkeypatch.setattr(pricing, "DEFAULT_RATES_PER_LB", rates)
+    with pytest.raises(KeyError, match="steel_i_beam"):
+        PricingEngine(catalog)
+
+
+def test_price_matrix_scales_only_the_indexed_group(engine):
+    index = np.array([0.5, 1.0, 2.0])
+    prices = engine.price_matrix(index, group="steel")
+    assert prices.shape == (3, len(engine))
+    steel = engine.group_index == MATERIAL_GROUPS.index("steel")
+    base = engine.base_prices()
+    np.testing.assert_allclose(prices[:, steel], np.outer(index, base[steel]))
+    np.testing.assert_allclose(prices[:, ~steel], np.tile(base[~steel], (3, 1)))
+
+
+def test_bom_costs_match_the_price_matrix(engine):
+    bom = {engine.skus[0]: 2, engine.skus[-1]: 3, engine.skus[1]: 1}
+    index = np.array([[0.9, 1.1, 1.0], [1.2, 0.8, 1.5]])
+    prices = engine.price_matrix(index)
+    expected = sum(n * prices[:, engine.sku_index[sku]] for sku, n in bom.items())
+    np.testing.assert_allclose(engine.bom_costs(bom, index), expected)
+
+
+def test_index_shape_must_match_groups(engine):
+    with pytest.raises(ValueError):
+        engine.index_factors(np.ones((4, 2)))
+
+
+def test_material_group_and_sweep():
+    assert material_group("stainless_304") == "stainless"
+    with pytest.raises(ValueError):
+        material_group("brass_360")
+    np.testing.assert_allclose(parse_sweep("0.8:1.2:5"), [0.8, 0.9, 1.0, 1.1, 1.2])
+    np.testing.assert_allclose(parse_sweep("0.9,1.1"), [0.9, 1.1])
@@ -0,0 +1,72 @@
+import math
+
+import pytest
+
+from profile_geometry import (Arc, angle_outline, arc_angles, geometry_key, loop_area,
+                              outline_area, outline_bounds, profile_outline, tube_outline)
+
+
+def _close(a, b):
+    return math.isclose(a[0], b[0], abs_tol=1e-9) and math.isclose(a[1], b[1], abs_tol=1e-9)
+
+
+def test_every_outline_is_made_of_closed_loops(catalog):
+    drawn = 0
+    for record in catalog.records():
+        loops = profile_outline(record)
+        if loops is None:
+            continue
+        drawn += 1
+        for loop in loops:
+            for ent, nxt in zip(loop, loop[1:] + loop[:1]):
+                assert _close((ent.x2, ent.y2), (nxt.x1, nxt.y1)), record.designation
+    assert drawn
+
+
+def test_beams_and_channels_have_no_outline(catalog):
+    for category in ("steel_wide_flange", "steel_c_channel"):
+        record = catalog.by_category[category][0]
+        assert profile_outline(record) is None
+        assert geometry_key(record) is None
+
+
+def test_angle_area_includes_the_fillet():
+    a, b, t, r = 3.0, 2.0, 0.25, 0.25
+    [loop] = angle_outline(a, b, t, r)
+    expected = (a + b - t) * t + (1 - math.pi / 4) * r * r
+    assert loop_area(loop) == pytest.approx(expected)      # drawn counter-clockwise
+    assert outline_area([loop]) == pytest.approx(expected)
+
+
+def test_tube_area_subtracts_the_cutout():
+    w, h, t, ro, ri = 4.0, 2.0, 0.25, 0.5, 0.25
+    expected = (w * h - (4 - math.pi) * ro ** 2) - ((w - 2 * t) * (h - 2 * t)
+                                                   - (4 - math.pi) * ri ** 2)
+    assert outline_area(tube_outline(w, h, t, ro, ri)) == pytest.approx(expected)
+    assert outline_bounds(tube_outline(w, h, t, ro, ri)) == (-2.0, -1.0, 2.0, 1.0)
+
+
+def test_outline_area_is_close_to_the_catalog_area(catalog):
+    for record in catalog.records():
+        loops = profile_outline(record)
+        if loops is not None:
+            assert outline_area(loops) == pytest.approx(record.area_in2, rel=0.15), \
+                record.designation
+
+
+def test_arc_angles_are_counter_clockwise():
+    ccw = Arc(0, 0, 1, 0, 0, 1, 1)
+    cw = Arc(0, 0, 0, 1, 1, 0, -1)
+    assert arc_angles(ccw) == pytest.approx((1.0, 0.0, 90.0))
+    assert arc_angles(cw) == pytest.approx((1.0, 0.0, 90.0))
+
+
+def test_geometry_key_ignores_material(catalog):
+    keys = {}
+    for record in catalog.records():
+        key = geometry_key(record)
+        if key is not None:
+            assert key[0] == record.FAMILY
+            keys.setdefault(key, set()).add(record.material)
+    # Grades of one size share a key, so some keys cover several materials
+    assert any(len(materials) > 1 for materials in keys.values())
@@ -0,0 +1,105 @@
+import asyncio
+import json
+from urllib.parse import quote
+
+import pytest
+
+from conftest import DATA_PATH
+from profile_service import ProfileService
+
+
+@pytest.fixture
+def service():
+    return ProfileService(DATA_PATH, cache_size=4)
+
+
+def _json(response):
+    status, body, _ = response
+    return status, json.loads(body)
+
+
+def test_routes(service):
+    record = service.index.records[0]
+    sku, designation = str(record["sku"]), record["designation"]
+
+    status, health = _json(service.handle("GET", "/health", b""))
+    assert status == 200 and health["profiles"] == len(service.index.records)
+    assert _json(service.handle("GET", f"/profiles/{sku}", b"")) == (200, record)
+    status, found = _json(service.handle("GET", f"/designations/{quote(designation.upper(), safe='')}", b""))
+    assert status == 200 and found["sku"] == record["sku"]
+    assert service.handle("GET", "/profiles/no-such-sku", b"")[0] == 404
+    assert service.handle("GET", "/nowhere", b"")[0] == 404
+    assert service.handle("DELETE", "/profiles/1", b"")[0] == 405
+
+    status, page = _json(service.handle(
+        "GET", f"/search?category={record['category']}&limit=2&offset=1", b""))
+    assert status == 200
+    assert page["total"] == len(service.index.by_category[record["category"]])
+    assert len(page["results"]) == 2
+    assert service.handle("GET", "/search?min=1", b"")[0] == 400
+    assert service.handle("GET", "/search?limit=-1", b"")[0] == 400
+
+    status, batch = _json(service.handle(
+        "POST", "/batch", json.dumps({"skus": [sku, "none"]}).encode()))
+    assert status == 200 and batch["skus"] == {sku: record, "none": None}
+    assert service.handle("POST", "/batch", b"{not json")[0] == 400
+    assert service.handle("POST", "/batch", b'{"skus": [1]}')[0] == 400
+
+
+def test_batch_cache_keys_on_body(service):
+    first = json.dumps({"skus": [str(r["sku"]) for r in service.index.records[:2]]}).encode()
+    second = json.dumps({"skus": [str(service.index.records[5]["sku"])]}).encode()
+    a = service.handle("POST", "/batch", first)
+    b = service.handle("POST", "/batch", second)
+    assert a != b
+    assert service.handle("POST", "/batch", first) is a
+    assert service.cache.hits == 1
+    # The key holds a fixed-size digest, not the body
+    assert all(len(key[1]) < 100 for key in service.cache._entries)
+
+
+def test_cache_is_lru_and_skips_errors(service):
+    skus = [str(r["sku"]) for r in service.index.records[:5]]
+    for sku in skus[:4]:
+        service.handle("GET", f"/profiles/{sku}", b"")
+    service.handle("GET", f"/profiles/{skus[0]}", b"")      # now most recent
+    service.handle("GET", f"/profiles/{skus[4]}", b"")      # evicts skus[1]
+    assert len(service.cache) == 4
+    cached = {key[1].split()[1] for key in service.cache._entries}
+    assert cached == {f"/profiles/{s}" for s in (skus[0], skus[2], skus[3], skus[4])}
+
+    service.handle("GET", "/search?limit=x", b"")
+    assert len(service.cache) == 4 and not any("limit=x" in k[1] for k in service.cache._entries)
+
+
+def test_etag_depends_on_body(service):
+    a, b = (str(r["sku"]) for r in service.index.records[:2])
+    etag = service.handle("GET", f"/profiles/{a}", b"")[2]
+    service.cache.clear()
+    assert service.handle("GET", f"/profiles/{a}", b"")[2] == etag
+    assert service.handle("GET", f"/profiles/{b}", b"")[2] != etag
+
+
+def test_if_none_match_returns_304(service):
+    sku = str(service.index.records[0]["sku"])
+
+    async def exchange():
+        server = await asyncio.start_server(service.serve_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            responses, extra = [], ""
+            for _ in range(2):
+                writer.write(f"GET /profiles/{sku} HTTP/1.1\r\n{extra}\r\n".encode())
+                head = (await reader.readuntil(b"\r\n\r\n")).decode()
+                headers = dict(line.split(": ", 1) for line in head.split("\r\n")[1:] if line)
+                body = await reader.readexactly(int(headers["Content-Length"]))
+                responses.append((head.split()[1], body))
+                extra = f"If-None-Match: {headers['ETag']}\r\nConnection: close\r\n"
+            writer.close()
+            return responses
+
+    (first, body), (second, empty) = asyncio.run(exchange())
+    assert (first, second) == ("200", "304")
+    assert json.loads(body)["sku"] == service.index.records[0]["sku"]
+    assert empty == b""
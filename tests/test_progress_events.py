@@ -0,0 +1,49 @@
+import io
+import json
+
+from progress_events import JsonLinesSink, ProgressEvents, TerminalSummary, summarize
+
+
+def test_skips_count_toward_progress_but_not_rate():
+    summary = TerminalSummary(io.StringIO(), interval=60)
+    try:
+        events = ProgressEvents([summary])
+        events.emit("run_started", total=4, categories=1, output_dir="out")
+        info = {"category": "c", "designation": "d"}
+        events.emit("profile_done", **info, sku="1", file="f", seconds=0.1, cloned=False)
+        events.emit("profile_skipped", **info, sku="2", reason="no builder")
+        events.emit("profile_skipped", **info, sku="3", reason="no builder")
+        assert (summary.done, summary.skipped) == (1, 2)
+        assert len(summary._finished) == 1
+        line = summary.line()
+        assert line.startswith("[3/4  75.0%]")
+        assert "skipped 2" in line
+    finally:
+        summary.close()
+
+
+def test_run_finished_records_error(tmp_path):
+    log = str(tmp_path / "events.jsonl")
+    events = ProgressEvents([JsonLinesSink(log)])
+    events.emit("run_started", total=1, categories=1, output_dir="out")
+    events.emit("run_finished", created=0, failed=0, cloned=0, seconds=0.5,
+                error="Failed to connect to SolidWorks")
+    events.close()
+    with open(log) as f:
+        assert [json.loads(line)["event"] for line in f] == ["run_started", "run_finished"]
+    [run] = summarize(log)
+    assert run["seconds"] == 0.5
+    assert run["error"] == "Failed to connect to SolidWorks"
+
+
+def test_runs_started_in_the_same_second_stay_apart(tmp_path):
+    log = str(tmp_path / "events.jsonl")
+    for created in (1, 2):
+        events = ProgressEvents([JsonLinesSink(log)])
+        events.emit("run_started", total=created, categories=1, output_dir="out")
+        events.emit("run_finished", created=created, failed=0, cloned=0, seconds=0.1,
+                    error=None)
+        events.close()
+    runs = summarize(log)
+    assert len(runs) == 2
+    assert runs[0]["run"] != runs[1]["run"]
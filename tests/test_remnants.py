@@ -0,0 +1,93 @@
+import pytest
+
+from remnants import Cut, RemnantInventory, read_cut_list
+
+
+@pytest.fixture
+def records(catalog):
+    return {r.sku: r for r in catalog.records()}
+
+
+@pytest.fixture
+def tube(catalog):
+    return catalog.by_category["steel_square_tube"][0]
+
+
+@pytest.fixture
+def inventory(tube):
+    inv = RemnantInventory(None)
+    for length in (100, 30, 50):
+        inv.add(tube.sku, length, "rack 1")
+    return inv
+
+
+def test_best_fit_is_the_shortest_long_enough_remnant(inventory, tube):
+    assert inventory.best_fit(tube.sku, 31).length_in == 50
+    assert inventory.best_fit(tube.sku, 30).length_in == 30
+    assert inventory.best_fit(tube.sku, 101) is None
+    assert inventory.best_fit("no-such-sku", 1) is None
+
+
+def test_add_and_remove_keep_lengths_sorted(inventory, tube):
+    assert [length for length, _ in inventory.lengths(tube.sku)] == [30, 50, 100]
+    fifty = inventory.best_fit(tube.sku, 50)
+    inventory.remove(fifty.id)
+    assert [length for length, _ in inventory.lengths(tube.sku)] == [30, 100]
+    with pytest.raises(ValueError):
+        inventory.add(tube.sku, 0)
+
+
+def test_plan_uses_remnants_best_fit_and_reuses_offcuts(inventory, tube, records):
+    ids = {r.length_in: r.id for r in inventory.remnants.values()}
+    plan = inventory.plan([(tube.sku, 45), (tube.sku, 20), (tube.sku, 45), (tube.sku, 50)],
+                          records, kerf=0.125)
+    # Longest first: 50 takes the 50, 45 the 100, the next 45 its 54.875
+    # offcut, and 20 the 30
+    assert plan.cuts == [Cut(tube.sku, 50, "remnant", ids[50]),
+                         Cut(tube.sku, 45, "remnant", ids[100]),
+                         Cut(tube.sku, 45, "remnant", ids[100]),
+                         Cut(tube.sku, 20, "remnant", ids[30])]
+    assert sorted(plan.used) == sorted(ids.values())
+    assert plan.leftovers == []         # 9.75 and 9.875 are scrap
+    assert plan.buy == {} and plan.cost == 0
+    assert len(inventory) == 3          # planning does not change the inventory
+
+
+def test_uncovered_cuts_are_packed_into_new_sticks(tube, records):
+    inv = RemnantInventory(None)
+    stick = tube.length_inches
+    pieces = [stick * 0.6, stick * 0.6, stick * 0.3, stick * 0.3]
+    plan = inv.plan([(tube.sku, p) for p in pieces], records, kerf=0.0, min_length=1.0)
+    assert [c.source for c in plan.cuts] == ["new"] * 4
+    # Best fit decreasing: each 0.6 stick takes one 0.3 piece
+    assert sorted(c.source_id for c in plan.cuts) == [1, 1, 2, 2]
+    assert plan.buy[tube.sku]["sticks"] == 2
+    assert plan.cost == round(2 * tube.price, 2)
+    assert [round(length, 4) for _, length in plan.leftovers] == [round(stick * 0.1, 4)] * 2
+
+
+def test_cuts_that_cannot_be_filled(tube, records):
+    inv = RemnantInventory(None)
+    plan = inv.plan([(tube.sku, tube.length_inches + 1), ("no-such-sku", 10)], records)
+    assert sorted(plan.unfillable) == sorted([(tube.sku, tube.length_inches + 1),
+                                              ("no-such-sku", 10)])
+    assert plan.cuts == [] and plan.buy == {}
+
+
+def test_apply_and_save_round_trip(tmp_path, tube, records):
+    path = str(tmp_path / "remnants.json")
+    inv = RemnantInventory(path)
+    inv.add(tube.sku, 100)
+    plan = inv.plan([(tube.sku, 40)], records, kerf=0.125)
+    [added] = inv.apply(plan, "rack 2")
+    assert added.length_in == pytest.approx(59.875)
+    inv.save()
+    reloaded = RemnantInventory(path)
+    assert list(reloaded.remnants.values()) == [added]
+    assert reloaded.add(tube.sku, 10).id == added.id + 1
+
+
+def test_read_cut_list_expands_quantities(tmp_path):
+    path = tmp_path / "cuts.json"
+    path.write_text('[{"sku": "01806", "length_in": 42, "qty": 2}, {"sku": 1, "length_in": 5}]')
+    assert read_cut_list(str(path)) == [("01806", 42.0), ("01806", 42.0), ("1", 5.0)]
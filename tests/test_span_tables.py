@@ -0,0 +1,144 @@
+# Span table checks against the AISC Steel Construction Manual (15th ed.)
+# and AISC 360-16 equations worked by hand. Manual properties include the
+# fillets and corner radii the tables leave out, so those comparisons allow 3%;
+# hand calculations on the tables' own square-corner geometry allow 0.5%.
+
+import copy
+
+import numpy as np
+import pytest
+
+from span_tables import OMEGA_BENDING, compute_tables, section_properties
+
+
+@pytest.fixture(scope="module")
+def shapes(catalog):
+    return {r.designation: r for r in catalog.records()}
+
+
+def _variant(record, **dims):
+    variant = copy.copy(record)
+    for name, value in dims.items():
+        setattr(variant, name, value)
+    return variant
+
+
+def _tables(catalog, record, span_ft):
+    return compute_tables([record], catalog.materials, np.array([span_ft]))
+
+
+def _axial_kips(catalog, record, span_ft):
+    return _tables(catalog, record, span_ft)['p_axial'][0, 0] / 1000
+
+
+def _nominal_moment_kip_in(catalog, record):
+    """Mn backed out of the bending grid at a 10 ft span"""
+    t = _tables(catalog, record, 10.0)
+    w_plf = t['w_bending'][0, 0] + record.weight_per_ft
+    return w_plf / 12 * 120.0 ** 2 / 8 * OMEGA_BENDING / 1000
+
+
+# Manual Tables 1-1, 1-5 and 1-7: A, Ix, Sx, r about the buckling axis
+MANUAL_PROPERTIES = [
+    ("W8x31", 9.13, 110, 27.5, 2.02),
+    ("W12x65", 19.1, 533, 88.0, 3.02),
+    ("W14x90", 26.5, 999, 143, 3.70),
+    ("C8x11.5", 3.37, 32.5, 8.14, None),     # tapered flanges: r_y not comparable
+    ("L4x4x1/4", 1.93, 3.00, 1.03, None),
+]
+
+
+@pytest.mark.parametrize("designation, area, ix, sx, r", MANUAL_PROPERTIES)
+def test_section_properties_match_manual(shapes, designation, area, ix, sx, r):
+    props = section_properties([shapes[designation]])
+    assert props['area'][0] == pytest.approx(area, rel=0.03)
+    assert props['ix'][0] == pytest.approx(ix, rel=0.03)
+    assert props['sx'][0] == pytest.approx(sx, rel=0.03)
+    if r is not None:
+        assert props['r_min'][0] == pytest.approx(r, rel=0.03)
+
+
+@pytest.mark.parametrize("designation, span_ft, expected", [
+    # E3 with the Manual's A and r_y, Fy = 50 ksi:
+    # W8x31, Lc/r = 120 / 2.02 = 59.4, Fe = 81.1 ksi, Fcr = 38.6 ksi
+    ("W8x31", 10.0, 211.2),
+    # W14x90, Lc/r = 240 / 3.70 = 64.9, Fe = 68.0 ksi, Fcr = 36.8 ksi
+    ("W14x90", 20.0, 583.3),
+])
+def test_e3_flexural_buckling(catalog, shapes, designation, span_ft, expected):
+    assert _axial_kips(catalog, shapes[designation], span_ft) == pytest.approx(expected, rel=0.03)
+
+
+def test_e3_squash_load_at_zero_slenderness(catalog, shapes):
+    record = shapes["W14x90"]
+    props = section_properties([record])
+    # Fcr -> Fy as Lc -> 0: Manual Table 4-1a lists 793 kips at Lc = 0
+    assert _axial_kips(catalog, record, 0.01) == pytest.approx(
+        props['area'][0] * 50 / 1.67, rel=1e-4)
+    assert props['area'][0] * 50 / 1.67 == pytest.approx(793, rel=0.03)
+
+
+def test_e7_slender_hss_walls(catalog, shapes):
+    # HSS6x6x0.12, Fy = 46 ksi, Lc = 8 ft: A = 2.822, r = 2.401, Fcr = 41.31 ksi.
+    # b/t = (6 - 3 x 0.12) / 0.12 = 47.0 > 1.40 sqrt(E/Fy) sqrt(Fy/Fcr) = 37.1,
+    # so each wall is slender: Fel = (1.38 x 35.15 / 47.0)^2 Fy, be = 4.805 in,
+    # Ae = 2.822 - 4 (5.64 - 4.805) 0.12 = 2.421 in2, Pn / 1.67 = 59.9 kips
+    record = shapes["HSS6x6x11ga"]
+    assert record.wall_thickness_in == 0.12
+    t = _tables(catalog, record, 8.0)
+    assert t['slender'][0]
+    assert t['p_axial'][0, 0] / 1000 == pytest.approx(59.90, rel=0.005)
+    # A compact wall of the same size keeps the gross area
+    thick = _variant(record, wall_thickness_in=0.375)
+    gross = section_properties([thick])['area'][0]
+    t = _tables(catalog, thick, 0.01)
+    assert not t['slender'][0]
+    assert t['p_axial'][0, 0] == pytest.approx(gross * 46000 / 1.67, rel=1e-4)
+
+
+def test_f7_hss_effective_flange(catalog, shapes):
+    # Same HSS in bending: b/t = 47.0 > 1.40 sqrt(E/Fy) = 35.2, so F7-4 gives
+    # be = 1.92 t sqrt(E/Fy) (1 - 0.38 / (b/t) sqrt(E/Fy)) = 4.611 in.
+    # Dropping (5.64 - 4.611) 0.12 in2 from the compression flange moves the
+    # neutral axis to 2.865 in above the tension face; Ie = 15.15 in4, so
+    # Mn = Fy Se = 46 x 15.15 / (6 - 2.865) = 222.4 kip-in (Fy Sx = 249.5)
+    assert _nominal_moment_kip_in(catalog, shapes["HSS6x6x11ga"]) == pytest.approx(
+        222.4, rel=0.005)
+    # A wall under the limit keeps Fy Sx
+    record = _variant(shapes["HSS6x6x11ga"], wall_thickness_in=0.25)
+    sx = section_properties([record])['sx'][0]
+    assert _nominal_moment_kip_in(catalog, record) == pytest.approx(46 * sx, rel=1e-6)
+
+
+@pytest.mark.parametrize("thickness, factor", [
+    (0.25, 1.0),            # b/t = 16.0 <= 0.91 sqrt(E/Fy) and F10-6 exceeds My
+    (4 / 24.49, 0.9459),    # b/t = 24.49: F10-6, 2.43 - 1.72 (b/t) sqrt(Fy/E)
+    (0.125, 0.5585),        # b/t = 32.0 > 25.8: F10-7, Fcr = 0.71 E / (b/t)^2
+])
+def test_f10_angle_leg_local_buckling(catalog, shapes, thickness, factor):
+    record = _variant(shapes["L4x4x1/4"], thickness_in=thickness)
+    sx = section_properties([record])['sx'][0]
+    assert _nominal_moment_kip_in(catalog, record) == pytest.approx(
+        factor * 36 * sx, rel=0.001)
+
+
+def test_f3_flange_local_buckling(catalog, shapes):
+    # W12x65 has a noncompact flange at Fy = 50 (bf/2tf = 9.92 > 9.15). With
+    # the Manual's Zx = 96.8 and Sx = 88.0, F3-1 gives Mn / 1.67 = 237 kip-ft,
+    # above the Fy Sx basis of the tables, which therefore keep Fy Sx
+    record = shapes["W12x65"]
+    sx = section_properties([record])['sx'][0]
+    mn = _nominal_moment_kip_in(catalog, record)
+    assert mn == pytest.approx(50 * sx, rel=1e-6)
+    assert mn / 12 / 1.67 < 237
+
+    # 12 x 12 x 1/4 plate girder, Fy = 50: bf/2tf = 24.0, just under
+    # lambda_r = 24.08. Sx = 39.80, Zx = 43.52, Mp = 2176 kip-in, and F3-1
+    # gives Mn = 1397 kip-in, 0.702 Fy Sx
+    girder = _variant(record, depth_in=12.0, flange_width_in=12.0,
+                      flange_thickness_in=0.25, web_thickness_in=0.25)
+    assert _nominal_moment_kip_in(catalog, girder) == pytest.approx(1397.4, rel=0.001)
+    # With 14 in flanges bf/2tf = 28.0 is slender: kc = 4 / sqrt(46) = 0.590,
+    # Mn = 0.9 E kc Sx / (bf/2tf)^2 = 0.9 x 29000 x 0.590 x 45.56 / 784 = 894 kip-in
+    girder = _variant(girder, flange_width_in=14.0)
+    assert _nominal_moment_kip_in(catalog, girder) == pytest.approx(894.4, rel=0.001)
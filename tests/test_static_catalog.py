@@ -0,0 +1,80 @@
+import gzip
+import hashlib
+import json
+import os
+
+from static_catalog import MANIFEST, build_static, lookup, read_manifest, shard_for
+
+
+def _records(data):
+    return {p["sku"]: dict(p, category=category)
+            for category, items in data["profiles"].items() for p in items}
+
+
+def _shard_file(manifest, category):
+    return next(s["file"] for s in manifest["shards"] if s["category"] == category)
+
+
+def test_build_then_lookup_round_trip(tmp_path, catalog_data):
+    out = str(tmp_path)
+    manifest = build_static(catalog_data, out, max_records=7)
+    records = _records(catalog_data)
+    assert sum(s["records"] for s in manifest["shards"]) == len(records)
+    assert any(s["file"].split(".")[0].endswith("-2") for s in manifest["shards"])
+
+    for sku, record in records.items():
+        assert lookup(out, sku) == record
+    assert lookup(out, "00000") is None
+    assert lookup(out, "zzzzz") is None
+
+    dims_file = os.path.join(out, manifest["dimensions"]["file"])
+    with open(dims_file, "rb") as f:
+        dims = json.load(f)
+    for category, index in dims.items():
+        skus = [row[-2] for row in index["rows"]]
+        assert sorted(skus) == sorted(p["sku"] for p in catalog_data["profiles"][category])
+        assert all(shard_for(manifest, row[-2]) == row[-1] for row in index["rows"])
+
+
+def test_hashed_names_match_content(tmp_path, catalog_data):
+    out = str(tmp_path)
+    manifest = build_static(catalog_data, out)
+    for name in [s["file"] for s in manifest["shards"]] + [manifest["dimensions"]["file"]]:
+        with open(os.path.join(out, name), "rb") as f:
+            payload = f.read()
+        assert name.split(".")[-2] == hashlib.sha256(payload).hexdigest()[:12]
+        with open(os.path.join(out, name + ".gz"), "rb") as f:
+            assert gzip.decompress(f.read()) == payload
+
+
+def test_shard_hashes_are_stable(tmp_path, catalog_data):
+    first = build_static(catalog_data, str(tmp_path / "a"))
+    again = build_static(json.loads(json.dumps(catalog_data)), str(tmp_path / "b"))
+    assert again["version"] == first["version"]
+    assert [s["file"] for s in again["shards"]] == [s["file"] for s in first["shards"]]
+    assert again["dimensions"] == first["dimensions"]
+
+    # Editing one record renames only its own shard
+    category = "steel_square_tube"
+    catalog_data["profiles"][category][0]["price"] += 1
+    changed = build_static(catalog_data, str(tmp_path / "a"))
+    renamed = {s["category"] for s, t in zip(first["shards"], changed["shards"])
+               if s["file"] != t["file"]}
+    assert renamed == {category}
+    assert changed["version"] != first["version"]
+
+
+def test_rebuild_keeps_previous_version_only(tmp_path, catalog_data):
+    out = str(tmp_path)
+    oldest = build_static(catalog_data, out)
+    catalog_data["profiles"]["steel_square_tube"][0]["price"] += 1
+    previous = build_static(catalog_data, out)
+    catalog_data["profiles"]["steel_square_tube"][0]["price"] += 1
+    current = build_static(catalog_data, out)
+    assert read_manifest(out) == current
+
+    files = set(os.listdir(out))
+    assert {_shard_file(current, "steel_square_tube"),
+            _shard_file(previous, "steel_square_tube")} <= files
+    assert _shard_file(oldest, "steel_square_tube") not in files
+    assert MANIFEST in files and not any(name.endswith(".tmp") for name in files)
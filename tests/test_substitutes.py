@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from substitutes import KDTree, SubstituteIndex
+
+CONSTRAINTS = [
+    {},
+    {"same_material": False, "stronger": False},
+    {"no_thinner": True},
+    {"max_depth": 6.0, "max_width": 4.0},
+    {"stronger": False, "ranges": [("price", 20.0, 200.0)]},
+]
+
+
+@pytest.fixture(scope="module")
+def index(catalog):
+    return SubstituteIndex(catalog, leaf_size=4)
+
+
+def _brute_force(points, x, k, mask):
+    candidates = np.flatnonzero(mask)
+    distances = np.sqrt(((points[candidates] - x) ** 2).sum(axis=1))
+    order = np.lexsort((candidates, distances))[:k]
+    return distances[order], candidates[order]
+
+
+def _assert_same(found, expected_distances, expected_indices, points, x):
+    distances = [d for d, _ in found]
+    np.testing.assert_allclose(distances, expected_distances, rtol=1e-9, atol=1e-12)
+    # Ties may come back in any order; each index must still be at its distance
+    for distance, i in found:
+        assert np.sqrt(((points[i] - x) ** 2).sum()) == pytest.approx(distance)
+    assert len(found) == len(expected_indices)
+
+
+def test_kdtree_matches_brute_force_on_random_points():
+    rng = np.random.default_rng(0)
+    points = rng.normal(size=(500, 4))
+    tree = KDTree(points, leaf_size=8)
+    for _ in range(50):
+        x = rng.normal(size=4)
+        mask = rng.random(500) < 0.3
+        expected_d, expected_i = _brute_force(points, x, 7, mask)
+        found = tree.query(x, 7, mask)
+        _assert_same(found, expected_d, expected_i, points, x)
+        assert all(mask[i] for _, i in found)
+
+
+@pytest.mark.parametrize("constraints", CONSTRAINTS)
+def test_substitutes_match_brute_force_under_constraints(index, constraints):
+    checked = 0
+    for family in index.families.values():
+        for i in range(0, len(family.records), 7):
+            mask = index._mask(family, i, constraints.get("same_material", True),
+                               constraints.get("stronger", True),
+                               constraints.get("no_thinner", False),
+                               constraints.get("max_depth"), constraints.get("max_width"),
+                               constraints.get("ranges", ()))
+            x = family.vectors[i]
+            expected_d, expected_i = _brute_force(family.vectors, x, 5, mask)
+            found = family.tree.query(x, 5, mask)
+            _assert_same(found, expected_d, expected_i, family.vectors, x)
+            result = index.substitutes(family.records[i].sku, 5, **constraints)
+            assert [r["sku"] for r in result] == [family.records[j].sku for _, j in found]
+            checked += 1
+    assert checked > 50
+
+
+def test_default_constraints_hold(index, catalog):
+    records = {r.sku: r for r in catalog.records()}
+    for sku in ("00230", "00600"):
+        original = records[sku]
+        for match in index.substitutes(sku, 5):
+            assert match["sku"] != sku
+            assert records[match["sku"]].material == original.material
+            assert match["sx_ratio"] >= 1.0
+
+
+def test_unknown_sku(index):
+    with pytest.raises(KeyError):
+        index.substitutes("no-such-sku")
+    assert index.substitutes_for(["no-such-sku"]) == {"no-such-sku": []}
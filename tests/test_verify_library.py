@@ -0,0 +1,126 @@
+import json
+import os
+import threading
+
+import pytest
+
+from generate_profiles import profile_properties
+from profile_geometry import outline_area, profile_outline
+from profile_records import profile_filename
+from verify_library import LibraryVerifier, compare
+
+
+class FakeReader:
+    """Reads files written by write_profile: {"properties": ..., "area": ...}"""
+
+    def read(self, path):
+        with open(path) as f:
+            data = json.load(f)
+        return data["properties"], data["area"]
+
+    def close(self):
+        pass
+
+
+def write_profile(root, record, properties=None, area=None):
+    path = os.path.join(root, record.category, profile_filename(record.designation))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if area is None:
+        area = outline_area(profile_outline(record))
+    with open(path, "w") as f:
+        json.dump({"properties": properties or profile_properties(record), "area": area}, f)
+    return path
+
+
+@pytest.fixture
+def tubes(catalog):
+    return catalog.by_category["steel_rectangular_tube"][:3]
+
+
+def verify(root, records):
+    return LibraryVerifier(str(root), FakeReader, workers=2).verify(records)
+
+
+def test_good_files_pass(tmp_path, tubes):
+    for record in tubes:
+        write_profile(tmp_path, record)
+    report = verify(tmp_path, tubes)
+    assert report["checked"] == 3
+    assert report["ok"] == 3
+    assert report["mismatches"] == [] and report["missing"] == []
+
+
+def test_numeric_properties_compare_within_tolerance(tubes):
+    record = tubes[0]
+    props = profile_properties(record)
+    props["Price"] = f"{float(props['Price']):.10f}"
+    assert compare(record, props, outline_area(profile_outline(record))) == []
+
+
+def test_wrong_missing_and_unexpected_properties(tubes):
+    record = tubes[0]
+    props = profile_properties(record)
+    props["Price"] = "1.00"
+    del props["SKU"]
+    props["Extra"] = "x"
+    problems = compare(record, props, outline_area(profile_outline(record)))
+    assert any(p.startswith("property Price is '1.00'") for p in problems)
+    assert "property SKU missing" in problems
+    assert "unexpected property Extra" in problems
+
+
+def test_area_mismatch(tmp_path, tubes):
+    record = tubes[0]
+    exact = outline_area(profile_outline(record))
+    write_profile(tmp_path, record, area=exact * 1.02)
+    report = verify(tmp_path, [record])
+    assert report["mismatched"] == 1
+    problems = report["mismatches"][0]["problems"]
+    assert len(problems) == 1 and problems[0].startswith("sketch area")
+    assert "outline" in problems[0]
+
+
+def test_missing_sketch_region(tubes):
+    record = tubes[0]
+    assert compare(record, profile_properties(record), None) == ["no sketch region"]
+
+
+def test_unreadable_and_missing_files(tmp_path, tubes):
+    bad = write_profile(tmp_path, tubes[0])
+    with open(bad, "w") as f:
+        f.write("not a part")
+    write_profile(tmp_path, tubes[1])
+    report = verify(tmp_path, tubes)
+    assert report["ok"] == 1
+    assert report["mismatches"][0]["sku"] == tubes[0].sku
+    assert report["mismatches"][0]["problems"][0].startswith("read failed")
+    assert [m["sku"] for m in report["missing"]] == [tubes[2].sku]
+
+
+class ThreadCheckingReader(FakeReader):
+    """Records the thread each reader is opened and closed on"""
+    opened = []
+    closed = []
+
+    def __init__(self):
+        self.thread = threading.get_ident()
+        ThreadCheckingReader.opened.append(self)
+
+    def close(self):
+        ThreadCheckingReader.closed.append((self, threading.get_ident()))
+        if len(ThreadCheckingReader.closed) == 1:
+            raise RuntimeError("ExitApp failed")
+
+
+def test_readers_close_on_their_own_thread(tmp_path, catalog, capsys):
+    records = catalog.by_category["steel_square_tube"][:12]
+    for record in records:
+        write_profile(tmp_path, record)
+    ThreadCheckingReader.opened, ThreadCheckingReader.closed = [], []
+    report = LibraryVerifier(str(tmp_path), ThreadCheckingReader, workers=3).verify(records)
+    assert report["ok"] == 12
+    assert 1 <= len(ThreadCheckingReader.opened) <= 3
+    assert sorted(map(id, ThreadCheckingReader.opened)) == \
+        sorted(id(reader) for reader, _ in ThreadCheckingReader.closed)
+    assert all(reader.thread == thread for reader, thread in ThreadCheckingReader.closed)
+    assert "Could not close ThreadCheckingReader: ExitApp failed" in capsys.readouterr().err